@@ -1,9 +1,13 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pydantic import BaseModel, Field
 from core.context.context_package import ContextPackage, ComplexityLevel
 from core.intent.intent_schema import IntentPackage
-from core.llm.llm_client import LLMClient
+from core.llm.llm_client import LLMClient, failed_call_usage
+from core.llm.model_router import ModelRouter
+from core.context.usage import CallUsage, RoutingDecision
+from core.llm.response_cache import CacheMissError
 from core.llm.prompt_templates import EXECUTOR_SYSTEM_PROMPT, EXECUTOR_USER_PROMPT
+from core.context.register_digest import RegisterDigest, DEFAULT_REGISTER_TOKEN_CAP
 
 # --- 1. DEFINE DUE DILIGENCE SCHEMA ---
 
@@ -35,12 +39,21 @@ class AgentOutput(BaseModel):
 # --- 2. THE EXECUTOR ---
 
 class BaseExecutor:
-    def __init__(self, agent_id: str, intent: IntentPackage):
+    def __init__(self, agent_id: str, intent: IntentPackage, register_token_cap: int = DEFAULT_REGISTER_TOKEN_CAP,
+                 llm: Optional[LLMClient] = None, router: Optional[ModelRouter] = None):
+        """
+        llm: Single client to use (no escalation).
+        router: Fast/strong model cascade, usually shared by the scheduler. Built from env if neither is given.
+        """
         self.agent_id = agent_id
         self.intent = intent
+        self.register_digest = RegisterDigest(register_token_cap)
         
         try:
-            self.llm = LLMClient()
+            if router is None:
+                router = ModelRouter(llm) if llm is not None else ModelRouter.from_env()
+            self.router = router
+            self.llm = router.fast
             self.is_connected = True
         except ValueError:
             print(f"⚠️ [{agent_id}] No API Key found.")
@@ -48,7 +61,50 @@ class BaseExecutor:
         
         self.inherited_lessons: str = "" 
 
-    def run_shift(self, incoming_context: ContextPackage) -> ContextPackage:
+    def run_shift(self, incoming_context: ContextPackage, deadline: Optional[float] = None) -> ContextPackage:
+        """deadline: absolute `time.monotonic()` by which the shift must finish; LLM calls are cancelled past it."""
+        system_prompt, user_prompt = self._build_prompts(incoming_context)
+
+        # 5. Execute
+        if self.is_connected:
+            try:
+                result = self.router.complete(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    response_model=AgentOutput,
+                    deadline=deadline
+                )
+                return self._package(incoming_context, *result)
+            except CacheMissError:
+                raise # Strict replay: a missing recording must stop the run, not be papered over
+            except Exception as e:
+                print(f"   🔥 Brain Failure: {e}")
+                return self._fallback_work(incoming_context, failed_call_usage(e))
+        else:
+            return self._fallback_work(incoming_context)
+
+    async def arun_shift(self, incoming_context: ContextPackage, deadline: Optional[float] = None) -> ContextPackage:
+        """Async `run_shift` for the concurrent scheduler: many shifts can await the LLM at once."""
+        system_prompt, user_prompt = self._build_prompts(incoming_context)
+
+        if self.is_connected:
+            try:
+                result = await self.router.acomplete(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    response_model=AgentOutput,
+                    deadline=deadline
+                )
+                return self._package(incoming_context, *result)
+            except CacheMissError:
+                raise
+            except Exception as e:
+                print(f"   🔥 Brain Failure ({self.agent_id}): {e}")
+                return self._fallback_work(incoming_context, failed_call_usage(e))
+        else:
+            return self._fallback_work(incoming_context)
+
+    def _build_prompts(self, incoming_context: ContextPackage) -> Tuple[str, str]:
         print(f"\n🤖 [{self.agent_id}] Starting Shift {incoming_context.shift_cycle + 1}...")
         
         # 1. Check for Lessons
@@ -60,12 +116,8 @@ class BaseExecutor:
         # 2. Extract Real Docs from Context
         new_docs = incoming_context.task_state.get('new_documents', 'No new documents.')
         
-        # 3. Format Master List
-        master_list_text = ""
-        if incoming_context.cumulative_risk_register:
-            master_list_text = "\n".join([f"- [{r.severity}] {r.category}: {r.description}" for r in incoming_context.cumulative_risk_register])
-        else:
-            master_list_text = "None."
+        # 3. Format Master List (only the findings relevant to these documents + a rollup)
+        master_list_text = self.register_digest.render(incoming_context.cumulative_risk_register, new_docs)
 
         # 4. Prepare User Prompt
         # We inject the Master List into the 'previous_context' section for clarity
@@ -81,37 +133,32 @@ class BaseExecutor:
             previous_context=full_context_str,
             new_documents=new_docs # <--- This now contains ONLY the real PDF text
         )
+        return system_prompt, user_prompt
 
-        # 5. Execute
-        if self.is_connected:
-            try:
-                output = self.llm.get_structured_completion(
-                    system_prompt=system_prompt,
-                    user_prompt=user_prompt,
-                    response_model=AgentOutput
-                )
-                
-                first_decision = output.decisions[0] if output.decisions else 'No decisions'
-                print(f"   🧠 Thought Process: {first_decision}")
-                
-                return ContextPackage(
-                    shift_cycle=incoming_context.shift_cycle + 1,
-                    previous_agent_id=self.agent_id,
-                    task_state=output.task_state.model_dump(), 
-                    decisions=output.decisions,
-                    assumptions=output.assumptions,
-                    open_risks=output.open_risks,
-                    confidence_score=output.confidence_score,
-                    complexity_rating=output.complexity_rating,
-                    intent_hash_reference=self.intent.intent_hash
-                )
-            except Exception as e:
-                print(f"   🔥 Brain Failure: {e}")
-                return self._fallback_work(incoming_context)
-        else:
-            return self._fallback_work(incoming_context)
+    def _package(self, incoming_context: ContextPackage, output: AgentOutput, calls: List[CallUsage], routing: RoutingDecision) -> ContextPackage:
+        first_decision = output.decisions[0] if output.decisions else 'No decisions'
+        print(f"   🧠 [{self.agent_id}] Thought Process: {first_decision}")
+        if routing.reasons:
+            print(f"   🔀 Routing: {routing.summary()}")
+        for usage in calls:
+            print(f"   💸 Cost ({usage.model}): {usage.prompt_tokens:,} in / {usage.response_tokens:,} out tokens | {usage.retries} retries | {usage.wall_seconds:.1f}s | ~${usage.cost_usd:.4f}")
+        
+        return ContextPackage(
+            shift_cycle=incoming_context.shift_cycle + 1,
+            previous_agent_id=self.agent_id,
+            task_state=output.task_state.model_dump(), 
+            decisions=output.decisions,
+            assumptions=output.assumptions,
+            open_risks=output.open_risks,
+            confidence_score=output.confidence_score,
+            complexity_rating=output.complexity_rating,
+            intent_hash_reference=self.intent.intent_hash,
+            usage=calls,
+            routing=routing
+        )
 
-    def _fallback_work(self, ctx: ContextPackage) -> ContextPackage:
+    def _fallback_work(self, ctx: ContextPackage, usage: Optional[CallUsage] = None) -> ContextPackage:
+        """usage: what the failed call spent before giving up, booked like any other call."""
         return ContextPackage(
             shift_cycle=ctx.shift_cycle + 1,
             previous_agent_id=self.agent_id,
@@ -121,5 +168,6 @@ class BaseExecutor:
             open_risks=[],
             confidence_score=0.0, 
             complexity_rating=ComplexityLevel.LOW,
-            intent_hash_reference=self.intent.intent_hash
+            intent_hash_reference=self.intent.intent_hash,
+            usage=[usage] if usage is not None else []
         )
\ No newline at end of file
@@ -1,15 +1,18 @@
-from typing import List
+from typing import List, Optional
 from core.intent.intent_schema import IntentPackage
-from core.context.context_package import ContextPackage, ComplexityLevel
+from core.context.context_package import ContextPackage, ComplexityLevel, Citation
 from core.ledger.ledger_store import AgentLedger
 from core.security.static_analysis import SecurityScanner # <--- NEW
+from core.security.citation_verifier import CitationIndex, CitationReport
 
 class SupervisorAgent:
-    def __init__(self, intent: IntentPackage, ledger: AgentLedger):
+    def __init__(self, intent: IntentPackage, ledger: AgentLedger, citation_index: Optional[CitationIndex] = None):
         self.intent = intent
         self.ledger = ledger
         self.strictness = 0.8 
         self.scanner = SecurityScanner() # <--- NEW
+        self.citation_index = citation_index
+        self.last_citation_report: Optional[CitationReport] = None
 
     def evaluate_handoff(self, context: ContextPackage) -> bool:
         # 0. Check Life
@@ -57,12 +60,36 @@ class SupervisorAgent:
             self.ledger.record_penalty_point("Low Confidence Handoff", shift_id)
             return False
 
-        # --- 3. REWARDS ---
+        # --- 3. CITATION CHECK (The Hallucination Firewall) ---
+        if self.citation_index is not None:
+            report = self.verify_citations(context)
+            self.last_citation_report = report
+            print(f"   🔎 Citations: {report.summary()}")
+            if not report.all_verified:
+                for check in report.failed[:3]:
+                    print(f"   ❌ {check.reason}: {check.document_name} p.{check.page_number} \"{check.verbatim_quote[:60]}\"")
+                self.ledger.record_penalty_point(f"Unverified Citations ({len(report.failed)})", shift_id)
+                return False
+
+        # --- 4. REWARDS ---
         self._calculate_rewards(context, shift_id)
 
         print("   ✅ APPROVE: Handoff accepted.")
         return True
 
+    def verify_citations(self, context: ContextPackage) -> CitationReport:
+        """Checks every citation of the shift's new findings against the page text."""
+        citations = []
+        for risk in context.task_state.get('identified_risks', []):
+            evidence = risk.get('evidence', []) if isinstance(risk, dict) else risk.evidence
+            for ev in evidence:
+                ev = Citation(**ev) if isinstance(ev, dict) else ev
+                # Echoes of the register are dropped by the Orchestrator's dedup, not judged here
+                if "Master Risk Register" in ev.document_name:
+                    continue
+                citations.append(ev)
+        return self.citation_index.verify_all(citations)
+
     def _calculate_rewards(self, context: ContextPackage, shift_id: str):
         self.ledger.complete_successful_shift(shift_id)
         if context.complexity_rating == ComplexityLevel.HIGH:
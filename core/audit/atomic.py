@@ -0,0 +1,11 @@
+import os
+from typing import Union
+
+def write_atomic(filepath: str, data: Union[str, bytes]):
+    """Write-then-rename: readers (and a resumed run) see the old file or the new one, never half of one."""
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, "wb" if isinstance(data, bytes) else "w") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
@@ -0,0 +1,273 @@
+import glob
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+INDEX_BLOCK_EVENTS = 256
+INDEX_SUFFIX = ".idx"
+
+Timestamp = Union[str, datetime]
+
+def segment_paths(path: str) -> List[str]:
+    """Every segment of an audit log, oldest first: sealed `<name>.NNNNNN.jsonl` files, then the live one."""
+    stem, ext = os.path.splitext(path)
+    sealed = sorted(glob.glob(f"{glob.escape(stem)}.[0-9][0-9][0-9][0-9][0-9][0-9]{ext}"))
+    return sealed + ([path] if os.path.exists(path) else [])
+
+def _iso(ts: Optional[Timestamp]) -> Optional[str]:
+    return ts.isoformat() if isinstance(ts, datetime) else ts
+
+class AuditIndex:
+    """
+    Sparse side index of an audit log: `<segment>.idx` holds one JSON line per
+    block of up to `block_events` consecutive events:
+
+        {"offset", "end"}       byte range of the block in the segment
+        {"seq", "count"}        global number of its first event, events in it
+        {"first", "last"}       earliest / latest timestamp in the block
+        {"sources"}             every source that logged in the block
+        {"hi"}                  latest timestamp in the segment up to this block
+        {"late"}                earliest "first" of any block so far that started
+                                before "hi" of the block before it (out of order)
+
+    The AuditWriter appends entries under its process lock as it appends
+    batches, so a time/source query reads only the blocks that can match, and
+    count and tail read the last entry. Lines the index has not seen (a crash
+    between the two writes, a log from before the index) are scanned on the
+    fly by readers and indexed by the next writer.
+
+    Timestamps are nearly monotonic and "hi" only grows, so a range query
+    bisects the index file on "hi" to find its first block and stops at the
+    first block starting past its end, unless the segment's "late" says an
+    out-of-order block could still dip back into the range. The first and last
+    entries bound a whole segment, which is skipped when it cannot match.
+    """
+
+    def __init__(self, path: str, block_events: int = INDEX_BLOCK_EVENTS):
+        self.path = path
+        self.block_events = max(1, block_events)
+
+    # --- WRITE (the caller holds the writer's process lock) ---
+    def append(self, segment: str, offset: int, lines: List[bytes], events: List[Tuple[str, str]]):
+        """Indexes `lines` (with their (timestamp, source)) just written at `offset` of `segment`."""
+        if not lines:
+            return
+        last = self._last_entry(segment, repair=True)
+        seq = last["seq"] + last["count"] if last else self._base_seq(segment)
+        entries = []
+        for start in range(0, len(lines), self.block_events):
+            block = lines[start:start + self.block_events]
+            size = sum(len(line) for line in block)
+            last = _entry(offset, offset + size, seq + start, events[start:start + self.block_events], last)
+            entries.append(last)
+            offset += size
+        with open(segment + INDEX_SUFFIX, "a") as f:
+            f.write("".join(json.dumps(e) + "\n" for e in entries))
+
+    def catch_up(self, segment: str, size: int):
+        """Indexes whatever `segment` holds beyond its last entry (rebuilding an index that is ahead of the data)."""
+        last = self._last_entry(segment, repair=True)
+        indexed = last["end"] if last else 0
+        if indexed > size:
+            os.remove(segment + INDEX_SUFFIX)
+            indexed = 0
+        if indexed < size:
+            lines, events = [], []
+            for line, ts, source in _scan(segment, indexed, size):
+                lines.append(line)
+                events.append((ts, source))
+            self.append(segment, indexed, lines, events)
+
+    def seal(self, segment: str, sealed: str):
+        """Moves the index along with a segment the writer just sealed."""
+        if os.path.exists(segment + INDEX_SUFFIX):
+            os.replace(segment + INDEX_SUFFIX, sealed + INDEX_SUFFIX)
+
+    # --- READ ---
+    def _read_entries(self, segment: str) -> List[Dict[str, Any]]:
+        entries = []
+        if os.path.exists(segment + INDEX_SUFFIX):
+            with open(segment + INDEX_SUFFIX, "r") as f:
+                for line in f:
+                    if line.endswith("\n"): # A torn last line is ignored (and rewritten by the next writer)
+                        entries.append(json.loads(line))
+        return entries
+
+    def _first_entry(self, segment: str) -> Optional[Dict[str, Any]]:
+        path = segment + INDEX_SUFFIX
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            line = f.readline()
+        return json.loads(line) if line.endswith(b"\n") else None
+
+    def _last_entry(self, segment: str, repair: bool = False) -> Optional[Dict[str, Any]]:
+        """Last complete entry, read from the end of the index file. `repair` (writers only) cuts off a torn tail."""
+        path = segment + INDEX_SUFFIX
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb+" if repair else "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            window = 4096
+            while True:
+                start = max(0, size - window)
+                f.seek(start)
+                data = f.read()
+                complete = data[:data.rfind(b"\n") + 1]
+                if repair and len(complete) < len(data): # Torn write: drop it so appends stay line-aligned
+                    f.truncate(start + len(complete))
+                lines = complete.splitlines()
+                if len(lines) >= 2 or start == 0:
+                    return json.loads(lines[-1]) if lines else None
+                window *= 4
+
+    def _end_seq(self, segment: str) -> int:
+        """Global number after the last event of `segment`."""
+        last = self._last_entry(segment)
+        if last is not None and last["end"] == os.path.getsize(segment):
+            return last["seq"] + last["count"]
+        blocks = self.blocks(segment)
+        return blocks[-1]["seq"] + blocks[-1]["count"] if blocks else self._base_seq(segment)
+
+    def _base_seq(self, segment: str) -> int:
+        """Global number of the first event of `segment`: where the segment before it ended."""
+        segments = segment_paths(self.path)
+        earlier = segments[:segments.index(segment)] if segment in segments else segments
+        return self._end_seq(earlier[-1]) if earlier else 0
+
+    def blocks(self, segment: str) -> List[Dict[str, Any]]:
+        """Index entries of a segment, plus in-memory ones for any lines written since."""
+        entries = self._read_entries(segment)
+        indexed = entries[-1]["end"] if entries else 0
+        size = os.path.getsize(segment)
+        if indexed > size:
+            entries, indexed = [], 0
+        if indexed < size:
+            seq = entries[-1]["seq"] + entries[-1]["count"] if entries else self._base_seq(segment)
+            pending: List[Tuple[int, int, str, str]] = []
+            for line, ts, source in _scan(segment, indexed, size):
+                pending.append((indexed, indexed + len(line), ts, source))
+                indexed += len(line)
+            for start in range(0, len(pending), self.block_events):
+                block = pending[start:start + self.block_events]
+                entries.append(_entry(block[0][0], block[-1][1], seq + start, [(ts, source) for *_, ts, source in block],
+                                      entries[-1] if entries else None))
+        return entries
+
+    def _blocks_in_range(self, segment: str, start: Optional[str], end: Optional[str]) -> Iterator[Dict[str, Any]]:
+        """Blocks of `segment` that may hold events in [start, end], reading as few index lines as the timestamps allow."""
+        first, last = self._first_entry(segment), self._last_entry(segment)
+        if (start is None and end is None) or first is None or "hi" not in first or last["end"] != os.path.getsize(segment):
+            yield from self.blocks(segment) # No range, an index from before "hi", or lines not indexed yet
+            return
+        late = last.get("late")
+        earliest = min(first["first"], late) if late is not None else first["first"]
+        if (start is not None and last["hi"] < start) or (end is not None and earliest > end):
+            return # The whole segment is outside the range
+        with open(segment + INDEX_SUFFIX, "rb") as f:
+            f.seek(_bisect_lines(f, lambda block: block["hi"] >= start) if start is not None else 0)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                block = json.loads(line)
+                if end is not None and block["first"] > end and (late is None or late > end):
+                    return # Anything later that starts before `end` would have been recorded as late
+                yield block
+
+    def count(self) -> int:
+        """Events in the whole log, from the last index entry."""
+        segments = segment_paths(self.path)
+        return self._end_seq(segments[-1]) if segments else 0
+
+    def tail(self, n: int = 1) -> List[Dict[str, str]]:
+        """The last `n` events, oldest first, reading blocks back from the end."""
+        events: List[Dict[str, str]] = []
+        for segment in reversed(segment_paths(self.path)):
+            if len(events) >= n:
+                break
+            last = self._last_entry(segment)
+            if last is not None and last["end"] == os.path.getsize(segment) and last["count"] >= n - len(events):
+                blocks = [last] # The usual case: one block read
+            else:
+                blocks = self.blocks(segment)
+            for block in reversed(blocks):
+                events = _read_block(segment, block) + events
+                if len(events) >= n:
+                    break
+        return events[-n:] if n > 0 else []
+
+    def query(self, source: Optional[str] = None, start: Optional[Timestamp] = None, end: Optional[Timestamp] = None,
+              limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """Events from `source` (any if None) with start <= timestamp <= end, in log order."""
+        found: List[Dict[str, str]] = []
+        for event in self.iter_query(source, start, end):
+            found.append(event)
+            if limit is not None and len(found) >= limit:
+                break
+        return found
+
+    def iter_query(self, source: Optional[str] = None, start: Optional[Timestamp] = None,
+                   end: Optional[Timestamp] = None) -> Iterator[Dict[str, str]]:
+        start, end = _iso(start), _iso(end)
+        for segment in segment_paths(self.path):
+            for block in self._blocks_in_range(segment, start, end):
+                if (start is not None and block["last"] < start) or (end is not None and block["first"] > end):
+                    continue
+                if source is not None and source not in block["sources"]:
+                    continue
+                for event in _read_block(segment, block):
+                    if ((source is None or event["source"] == source)
+                            and (start is None or event["timestamp"] >= start) and (end is None or event["timestamp"] <= end)):
+                        yield event
+
+def _entry(offset: int, end: int, seq: int, events: List[Tuple[str, str]], prev: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Index entry for a block; `prev` is the entry before it in the segment (running "hi" / "late")."""
+    stamps = [ts for ts, _ in events]
+    entry = {"offset": offset, "end": end, "seq": seq, "count": len(events),
+             "first": min(stamps), "last": max(stamps), "sources": sorted({source for _, source in events})}
+    if prev is None:
+        entry["hi"] = entry["last"]
+    elif "hi" in prev: # Segments indexed before "hi" existed stay without it (readers scan them)
+        entry["hi"] = max(prev["hi"], entry["last"])
+        late = prev.get("late")
+        if entry["first"] < prev["hi"]:
+            late = entry["first"] if late is None else min(late, entry["first"])
+        if late is not None:
+            entry["late"] = late
+    return entry
+
+def _bisect_lines(f, pred) -> int:
+    """Offset of the first complete JSON line of `f` for which `pred` holds (the end if none); `pred` must be monotonic."""
+    lo, hi = 0, f.seek(0, os.SEEK_END)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        f.seek(max(mid - 1, 0))
+        if mid > 0:
+            f.readline() # Skip to the first line starting at or after mid
+        line_start = f.tell()
+        line = f.readline()
+        if line.endswith(b"\n") and not pred(json.loads(line)):
+            lo = line_start + len(line)
+        else:
+            hi = mid
+    if lo > 0:
+        f.seek(lo - 1)
+        f.readline()
+        return f.tell()
+    return 0
+
+def _scan(segment: str, start: int, end: int) -> Iterator[Tuple[bytes, str, str]]:
+    """(line, timestamp, source) for every complete line in [start, end)."""
+    with open(segment, "rb") as f:
+        f.seek(start)
+        for line in f.read(end - start).splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            event = json.loads(line)
+            yield line, event["timestamp"], event["source"]
+
+def _read_block(segment: str, block: Dict[str, Any]) -> List[Dict[str, str]]:
+    with open(segment, "rb") as f:
+        f.seek(block["offset"])
+        return [json.loads(line) for line in f.read(block["end"] - block["offset"]).splitlines()]
@@ -0,0 +1,166 @@
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from core.audit.audit_index import AuditIndex, segment_paths
+
+try:
+    import fcntl
+except ImportError: # Windows: no cross-process lock, single writer process only
+    fcntl = None
+
+FSYNC_POLICIES = ("event", "batch", "none")
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+class AuditWriter:
+    """
+    Append-only JSONL log written in batches by a background thread.
+
+    1. Batching: `write` queues the line; the thread appends the queue when it
+       reaches `batch_size` events or the oldest has waited `flush_interval`
+       seconds, in one write per segment.
+    2. fsync: "event" writes and fsyncs before `write` returns (no thread),
+       "batch" fsyncs each batch, "none" leaves it to the OS.
+    3. Rotation: before a line would take the live file past
+       `max_segment_bytes`, it is sealed as `<name>.NNNNNN.jsonl` and the rest
+       of the batch goes to a fresh one. Lines are never rewritten; sealed
+       segments are never opened for writing again.
+    4. Several processes: each batch is appended under an exclusive lock on
+       `<name>.lock` (O_APPEND, one write per batch), and a writer reopens the
+       live file when another process has rotated it.
+    5. Index: each batch also appends its entries to the segment's sparse
+       index (see AuditIndex) under the same lock.
+    """
+
+    def __init__(self, path: str, fsync: str = "batch", batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, max_segment_bytes: int = DEFAULT_SEGMENT_BYTES):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown audit fsync policy {fsync!r} (expected one of {', '.join(FSYNC_POLICIES)})")
+        self.path = path = os.path.abspath(path) # The thread may flush after the caller has changed directory
+        self.lock_path = path + ".lock"
+        self.fsync = fsync
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_segment_bytes = max_segment_bytes
+
+        self.index = AuditIndex(path)
+        self._pending: List[Tuple[str, str, str]] = [] # (line, timestamp, source)
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock() # Takes a batch and appends it, so batches land in order
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._fd: Optional[int] = None
+        self._lock_fd: Optional[int] = None
+
+    # --- PRODUCERS ---
+    def write(self, entry: Dict[str, str]):
+        event = (json.dumps(entry) + "\n", entry.get("timestamp", ""), entry.get("source", ""))
+        if self.fsync == "event" or self._closed:
+            with self._io_lock:
+                self._append([event])
+            return
+        with self._cond:
+            self._pending.append(event)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"audit-writer:{self.path}", daemon=True)
+                self._thread.start()
+                atexit.register(self.close) # Flush what is still queued at exit
+            if len(self._pending) in (1, self.batch_size): # Start the interval clock / flush a full batch
+                self._cond.notify()
+
+    def flush(self):
+        """Appends everything queued so far before returning."""
+        with self._io_lock:
+            with self._cond:
+                events, self._pending = self._pending, []
+            if events:
+                self._append(events)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+        with self._io_lock:
+            for fd in (self._fd, self._lock_fd):
+                if fd is not None:
+                    os.close(fd)
+            self._fd = self._lock_fd = None
+
+    # --- BACKGROUND THREAD ---
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    # --- FILE ---
+    @contextmanager
+    def _process_lock(self):
+        if fcntl is None:
+            yield
+            return
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _open(self) -> int:
+        """The live file, reopened if another writer has sealed the one we hold."""
+        if self._fd is not None:
+            try:
+                current = os.stat(self.path).st_ino == os.fstat(self._fd).st_ino
+            except FileNotFoundError:
+                current = False
+            if current:
+                return self._fd
+            os.close(self._fd)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _rotate(self):
+        sealed = segment_paths(self.path)[:-1]
+        number = int(sealed[-1].rsplit(".", 2)[-2]) + 1 if sealed else 1
+        stem, ext = os.path.splitext(self.path)
+        sealed_path = f"{stem}.{number:06d}{ext}"
+        os.rename(self.path, sealed_path)
+        self.index.seal(self.path, sealed_path)
+
+    def _append(self, events: List[Tuple[str, str, str]]):
+        encoded = [line.encode("utf-8") for line, _, _ in events]
+        with self._process_lock():
+            fd = self._open()
+            size = os.fstat(fd).st_size
+            self.index.catch_up(self.path, size)
+            offset, start = size, 0
+            for k, data in enumerate(encoded):
+                if size and size + len(data) > self.max_segment_bytes:
+                    self._write(fd, offset, encoded[start:k], events[start:k])
+                    self._rotate()
+                    fd, size, offset, start = self._open(), 0, 0, k
+                size += len(data)
+            self._write(fd, offset, encoded[start:], events[start:])
+
+    def _write(self, fd: int, offset: int, lines: List[bytes], events: List[Tuple[str, str, str]]):
+        """One write (and at most one fsync) for a run of lines going to the same segment, then its index entries."""
+        data = memoryview(b"".join(lines))
+        while data:
+            data = data[os.write(fd, data):]
+        if lines and self.fsync != "none":
+            os.fsync(fd)
+        self.index.append(self.path, offset, lines, [(ts, source) for _, ts, source in events])
@@ -0,0 +1,168 @@
+import argparse
+import glob
+import gzip
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from core.audit.atomic import write_atomic
+from core.context.context_package import ContextPackage, RiskFinding
+from core.context.risk_register import RiskRegister
+
+DEFAULT_KEYFRAME_INTERVAL = 32
+FORMAT_VERSION = 1
+
+class ContextChain:
+    """
+    Shift contexts as a chain of records, one file per shift.
+
+    1. Keyframe: the full context, register included.
+    2. Delta: the shift's own fields (task_state, decisions, usage, ...) and only
+       the findings appended to its parent's register.
+
+    A shift is written as a delta when its register extends the one saved
+    before it and fewer than `keyframe_interval - 1` deltas follow the last
+    keyframe; otherwise (first save of a run, a retired or consolidated
+    register) it is a keyframe. Reading any shift replays at most
+    `keyframe_interval - 1` deltas onto a keyframe.
+    """
+
+    def __init__(self, chain_dir: str, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL, compress: bool = False):
+        self.chain_dir = chain_dir
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.compress = compress
+        os.makedirs(chain_dir, exist_ok=True)
+        # Last saved (or loaded) shift: (name, register, deltas since its keyframe)
+        self._parent: Optional[Tuple[str, RiskRegister, int]] = None
+
+    # --- FILES ---
+    def _path(self, name: str) -> Optional[str]:
+        for path in (os.path.join(self.chain_dir, name), os.path.join(self.chain_dir, name + ".gz")):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def names(self) -> List[str]:
+        """Saved shifts in order, as `shift_NNNN_<id>.json` names."""
+        paths = glob.glob(os.path.join(self.chain_dir, "shift_*.json")) + glob.glob(os.path.join(self.chain_dir, "shift_*.json.gz"))
+        return sorted(os.path.basename(p)[:-3] if p.endswith(".gz") else os.path.basename(p) for p in paths)
+
+    def _read(self, name: str) -> Dict[str, Any]:
+        path = self._path(name)
+        if path is None:
+            raise FileNotFoundError(f"No saved shift {name} in {self.chain_dir}")
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    # --- WRITE ---
+    def save(self, name: str, context: ContextPackage):
+        register = context.cumulative_risk_register
+        record: Dict[str, Any] = {"format": FORMAT_VERSION}
+        parent = self._parent
+        if parent is not None and parent[2] + 1 < self.keyframe_interval and register.extends(parent[1]):
+            depth = parent[2] + 1
+            record.update(kind="delta", parent=parent[0], depth=depth, register_base=len(parent[1]),
+                          new_findings=[r.model_dump(mode="json") for r in register[len(parent[1]):]],
+                          context=context.model_dump(mode="json", exclude={"cumulative_risk_register"}))
+        else:
+            depth = 0
+            record.update(kind="keyframe", depth=0, context=context.model_dump(mode="json"))
+
+        text = json.dumps(record, separators=(",", ":"))
+        if self.compress:
+            write_atomic(os.path.join(self.chain_dir, name + ".gz"), gzip.compress(text.encode("utf-8")))
+        else:
+            write_atomic(os.path.join(self.chain_dir, name), text)
+        self._parent = (name, register, depth)
+
+    # --- READ ---
+    def load(self, name: str) -> ContextPackage:
+        """Full context of one shift: its keyframe plus the deltas after it."""
+        records = [self._read(name)]
+        while records[-1]["kind"] == "delta":
+            records.append(self._read(records[-1]["parent"]))
+        records.reverse()
+
+        register = RiskRegister(ContextPackage(**records[0]["context"]).cumulative_risk_register)
+        for record in records[1:]:
+            if record["register_base"] != len(register):
+                raise ValueError(f"Context chain is inconsistent at {name}: expected {record['register_base']} findings, rebuilt {len(register)}.")
+            register = register + _findings(record["new_findings"])
+
+        data = dict(records[-1]["context"])
+        data.pop("cumulative_risk_register", None)
+        context = ContextPackage(**data, cumulative_risk_register=register)
+        self._parent = (name, register, records[-1]["depth"])
+        return context
+
+    def iter_contexts(self) -> Iterator[Tuple[str, ContextPackage]]:
+        """Every shift in order, rebuilding each from the previous one where possible (one pass)."""
+        previous: Optional[Tuple[str, RiskRegister]] = None
+        for name in self.names():
+            record = self._read(name)
+            data = dict(record["context"])
+            if record["kind"] == "keyframe":
+                context = ContextPackage(**data)
+            elif previous is not None and previous[0] == record["parent"] and len(previous[1]) == record["register_base"]:
+                context = ContextPackage(**data, cumulative_risk_register=previous[1] + _findings(record["new_findings"]))
+            else:
+                context = self.load(name)
+            previous = (name, context.cumulative_risk_register)
+            yield name, context
+
+    def discard_after(self, shift_cycle: int) -> List[str]:
+        discarded = []
+        for name in self.names():
+            if int(name[6:10]) > shift_cycle:
+                os.remove(self._path(name))
+                discarded.append(name)
+        if self._parent is not None and self._parent[0] in discarded:
+            self._parent = None
+        return discarded
+
+    def import_snapshots(self, snapshot_dir: str) -> List[str]:
+        """
+        Upgrades a storage root written before the chain existed: its full
+        `shift_*.json` snapshots are saved into the chain (as keyframes) under
+        the same names, so checkpoints and incremental runs find them.
+        """
+        imported = []
+        for path in sorted(glob.glob(os.path.join(snapshot_dir, "shift_*.json"))):
+            with open(path, "r") as f:
+                context = ContextPackage(**json.load(f))
+            self._parent = None
+            self.save(os.path.basename(path), context)
+            imported.append(os.path.basename(path))
+        return imported
+
+    def export(self, out_dir: str, latest_only: bool = False) -> List[str]:
+        """
+        Writes full `shift_*.json` snapshots (the pre-chain format) for tools
+        that read storage/contexts/. Existing snapshots of the same shift are replaced.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        names = self.names()
+        if latest_only:
+            contexts = [(names[-1], self.load(names[-1]))] if names else []
+        else:
+            contexts = self.iter_contexts()
+        written = []
+        for name, context in contexts:
+            write_atomic(os.path.join(out_dir, name), context.model_dump_json(indent=2))
+            written.append(name)
+        return written
+
+def _findings(data: List[Dict[str, Any]]) -> List[RiskFinding]:
+    return [RiskFinding(**f) for f in data]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the delta-encoded context chain as full shift snapshots")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--storage", default="storage", help="Engagement storage root")
+    parser.add_argument("--latest", action="store_true", help="Only the latest shift")
+    args = parser.parse_args()
+
+    chain = ContextChain(os.path.join(args.storage, "chain"))
+    out_dir = os.path.join(args.storage, "contexts")
+    written = chain.export(out_dir, latest_only=args.latest)
+    print(f"📤 Exported {len(written)} shifts to {out_dir}")
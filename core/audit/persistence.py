@@ -1,29 +1,90 @@
+import hashlib
 import json
 import os
 from datetime import datetime
-from typing import List, Dict
-from core.context.context_package import ContextPackage
+from typing import Any, List, Dict, Iterator, Optional, Tuple, Union
+from core.audit.atomic import write_atomic
+from core.audit.audit_writer import AuditWriter, DEFAULT_BATCH_SIZE, DEFAULT_FLUSH_INTERVAL, DEFAULT_SEGMENT_BYTES
+from core.audit.context_chain import ContextChain, DEFAULT_KEYFRAME_INTERVAL
+from core.audit.sqlite_store import SQLiteStore, DB_FILENAME
+from core.context.context_package import ContextPackage, RiskFinding
 from core.ledger.ledger_store import AgentLedger
 
+BACKENDS = ("files", "sqlite")
+
 class StateManager:
-    def __init__(self, root_dir="storage"):
+    def __init__(self, root_dir="storage", keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL, compress_contexts: bool = False,
+                 backend: Optional[str] = None, audit_fsync: str = "batch", audit_batch_size: int = DEFAULT_BATCH_SIZE,
+                 audit_flush_interval: float = DEFAULT_FLUSH_INTERVAL, audit_segment_bytes: int = DEFAULT_SEGMENT_BYTES):
+        """
+        keyframe_interval / compress_contexts: Layout of the context chain (see ContextChain).
+        Reading works whatever the chain was written with.
+        backend: "files" (context chain, ledgers/*.json, audit_log.jsonl) or
+                 "sqlite" (everything but the manifest, checkpoint and batch plan in state.db,
+                 see SQLiteStore), for a new storage root. An existing one keeps
+                 the backend it was written with.
+        audit_*: Batching, fsync policy and rotation of audit_log.jsonl on the
+                 file backend (see AuditWriter).
+        """
         self.root_dir = root_dir
         self.ledger_dir = os.path.join(root_dir, "ledgers")
-        self.context_dir = os.path.join(root_dir, "contexts")
+        self.context_dir = os.path.join(root_dir, "contexts") # Full snapshots, written only by `export_contexts`
         self.audit_file = os.path.join(root_dir, "audit_log.jsonl")
-        
+        self.manifest_file = os.path.join(root_dir, "manifest.json")
+        self.checkpoint_file = os.path.join(root_dir, "checkpoint.json")
+        self.batch_plan_file = os.path.join(root_dir, "batch_plan.json")
+        db_path = os.path.join(root_dir, DB_FILENAME)
+
+        legacy = any(os.path.exists(os.path.join(root_dir, name)) for name in ("chain", "contexts", "ledgers", "audit_log.jsonl"))
+        if os.path.exists(db_path):
+            backend = "sqlite"
+        elif legacy or backend is None: # Written by the file backend (or before it had a chain)
+            backend = "files"
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown state backend {backend!r} (expected one of {', '.join(BACKENDS)})")
+        self.backend = backend
+
         # Ensure directories exist
-        os.makedirs(self.ledger_dir, exist_ok=True)
-        os.makedirs(self.context_dir, exist_ok=True)
+        os.makedirs(root_dir, exist_ok=True)
+        self.chain: Optional[ContextChain] = None
+        self.db: Optional[SQLiteStore] = None
+        self.audit: Optional[AuditWriter] = None
+        if backend == "sqlite":
+            self.db = SQLiteStore(db_path)
+        else:
+            os.makedirs(self.ledger_dir, exist_ok=True)
+            self.chain = ContextChain(os.path.join(root_dir, "chain"), keyframe_interval, compress_contexts)
+            if not self.chain.names() and os.path.isdir(self.context_dir):
+                imported = self.chain.import_snapshots(self.context_dir)
+                if imported:
+                    print(f"📦 Upgraded storage: {len(imported)} shift snapshots from {self.context_dir} imported into the context chain.")
+            self.audit = AuditWriter(self.audit_file, audit_fsync, audit_batch_size, audit_flush_interval, audit_segment_bytes)
+
+    _write_atomic = staticmethod(write_atomic)
 
     def save_ledger(self, ledger: AgentLedger):
         """Saves the agent's bank account to disk."""
+        if self.db is not None:
+            return self.db.save_ledger(ledger)
         filepath = os.path.join(self.ledger_dir, f"{ledger.agent_id}.json")
-        with open(filepath, "w") as f:
-            f.write(ledger.model_dump_json(indent=2))
+        self._write_atomic(filepath, ledger.model_dump_json(indent=2))
+
+    def active_agents(self) -> List[str]:
+        """Agents whose ledger is still active (replaced agents keep an inactive ledger)."""
+        if self.db is not None:
+            return self.db.active_agents()
+        agents = []
+        for filename in sorted(os.listdir(self.ledger_dir)):
+            if filename.endswith(".json"):
+                with open(os.path.join(self.ledger_dir, filename), "r") as f:
+                    if json.load(f).get("is_active", True):
+                        agents.append(filename[:-len(".json")])
+        return agents
 
     def load_ledger(self, agent_id: str) -> AgentLedger:
         """Loads the agent's bank account."""
+        if self.db is not None:
+            return self.db.load_ledger(agent_id) or AgentLedger(agent_id=agent_id)
         filepath = os.path.join(self.ledger_dir, f"{agent_id}.json")
         if os.path.exists(filepath):
             with open(filepath, "r") as f:
@@ -31,21 +92,178 @@ class StateManager:
                 return AgentLedger(**data)
         return AgentLedger(agent_id=agent_id) # Return fresh if new
 
-    def save_context(self, context: ContextPackage):
-        """Saves the shift state."""
+    @staticmethod
+    def context_filename(context: ContextPackage) -> str:
         # We save by Shift ID to create a timeline
-        filename = f"shift_{context.shift_cycle:04d}_{context.package_id[:8]}.json"
-        filepath = os.path.join(self.context_dir, filename)
-        with open(filepath, "w") as f:
-            f.write(context.model_dump_json(indent=2))
+        return f"shift_{context.shift_cycle:04d}_{context.package_id[:8]}.json"
+
+    def save_context(self, context: ContextPackage) -> str:
+        """Saves the shift state (as a delta where possible). Returns the name recorded in the checkpoint."""
+        filename = self.context_filename(context)
+        if self.db is not None:
+            self.db.save_context(filename, context)
+        else:
+            self.chain.save(filename, context)
+        return filename
+
+    def load_context(self, filename: str) -> ContextPackage:
+        if self.db is not None:
+            return self.db.load_context(filename)
+        return self.chain.load(filename)
+
+    def context_names(self) -> List[str]:
+        """Saved shifts, oldest first."""
+        if self.db is not None:
+            return self.db.context_names()
+        return self.chain.names()
+
+    def iter_contexts(self) -> Iterator[Tuple[str, ContextPackage]]:
+        """Every saved shift, oldest first, as (name, context)."""
+        if self.db is not None:
+            return self.db.iter_contexts()
+        return self.chain.iter_contexts()
+
+    def discard_contexts_after(self, shift_cycle: int) -> List[str]:
+        """
+        Removes shift files newer than the last checkpoint: a crash between
+        saving a context and checkpointing it leaves one behind, and the
+        resumed run will redo that shift.
+        """
+        if self.db is not None:
+            return self.db.discard_after(shift_cycle)
+        return self.chain.discard_after(shift_cycle)
+
+    def load_latest_context(self) -> Optional[ContextPackage]:
+        """Returns the most recent saved shift state, or None on a fresh engagement."""
+        names = self.context_names()
+        if not names:
+            return None
+        return self.load_context(names[-1])
+
+    def export_contexts(self, latest_only: bool = False) -> List[str]:
+        """
+        Full snapshots in contexts/*.json, for tools that read the pre-chain layout.
+        The sqlite backend also writes ledgers/*.json and audit_log.jsonl.
+        """
+        if self.db is not None:
+            return self.db.export(self.root_dir, latest_only)
+        return self.chain.export(self.context_dir, latest_only)
+
+    # --- QUERIES (indexed on the sqlite backend, a scan of the shifts on the file backend) ---
+    def find_findings(self, severity: Optional[str] = None, category: Optional[str] = None, document: Optional[str] = None,
+                      page: Optional[int] = None, agent: Optional[str] = None) -> List[RiskFinding]:
+        """Findings in the latest register matching every given filter."""
+        if self.db is not None:
+            return self.db.find_findings(severity, category, document, page, agent)
+        latest = self.load_latest_context()
+        if latest is None:
+            return []
+        found_by = None
+        if agent is not None:
+            # The file backend does not record who added a finding; use what each agent reported
+            found_by = {(r.get("category"), r.get("description")) for _, ctx in self.iter_contexts()
+                        if ctx.previous_agent_id == agent for r in ctx.task_state.get("identified_risks", [])}
+        return [
+            r for r in latest.cumulative_risk_register
+            if (severity is None or r.severity == severity) and (category is None or r.category == category)
+            and (found_by is None or (r.category, r.description) in found_by)
+            and (document is None and page is None or any(
+                (document is None or ev.document_name == document) and (page is None or ev.page_number == page) for ev in r.evidence))
+        ]
+
+    def count_by_severity(self) -> Dict[str, int]:
+        """Findings in the latest register per severity."""
+        if self.db is not None:
+            return self.db.count_by_severity()
+        counts: Dict[str, int] = {}
+        latest = self.load_latest_context()
+        for r in latest.cumulative_risk_register if latest is not None else []:
+            counts[r.severity] = counts.get(r.severity, 0) + 1
+        return counts
+
+    def shift_summaries(self) -> List[Dict[str, Any]]:
+        """One row per shift (name, shift_cycle, agent_id, timestamp, confidence_score, complexity_rating, summary, register_size)."""
+        if self.db is not None:
+            return self.db.shift_summaries()
+        return [{
+            "name": name, "shift_cycle": ctx.shift_cycle, "agent_id": ctx.previous_agent_id,
+            "timestamp": ctx.timestamp.isoformat(), "confidence_score": ctx.confidence_score,
+            "complexity_rating": ctx.complexity_rating.value, "summary": str(ctx.task_state.get("summary", "")),
+            "register_size": len(ctx.cumulative_risk_register),
+        } for name, ctx in self.iter_contexts()]
+
+    def load_manifest(self) -> Dict[str, Any]:
+        """The record of which document versions (by content hash) have been analyzed."""
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, "r") as f:
+                return json.load(f)
+        return {"documents": {}}
+
+    def save_manifest(self, manifest: Dict[str, Any]):
+        self._write_atomic(self.manifest_file, json.dumps(manifest, indent=2))
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """The last commit point of an interrupted run (see ShiftScheduler), or None."""
+        if os.path.exists(self.checkpoint_file):
+            with open(self.checkpoint_file, "r") as f:
+                return json.load(f)
+        return None
+
+    def save_checkpoint(self, checkpoint: Dict[str, Any]):
+        # Rewritten at every commit: compact, and small (the batch plan lives in batch_plan.json)
+        self._write_atomic(self.checkpoint_file, json.dumps(checkpoint, separators=(",", ":")))
+
+    def save_batch_plan(self, plan: List[Any]) -> str:
+        """Writes the run's batch plan (once per run). Returns its sha256, which the checkpoint records."""
+        data = json.dumps(plan, separators=(",", ":"))
+        self._write_atomic(self.batch_plan_file, data)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def load_batch_plan(self, sha256: str) -> List[Any]:
+        """The batch plan a checkpoint refers to. ValueError if it is missing or was overwritten since."""
+        if os.path.exists(self.batch_plan_file):
+            with open(self.batch_plan_file, "r") as f:
+                data = f.read()
+            if hashlib.sha256(data.encode("utf-8")).hexdigest() == sha256:
+                return json.loads(data)
+        raise ValueError(f"{self.batch_plan_file} does not match the checkpoint. Start a new run instead of resuming.")
+
+    def audit_count(self) -> int:
+        """Number of events in the audit log (every segment), from the index."""
+        if self.db is not None:
+            return self.db.audit_count()
+        self.audit.flush()
+        return self.audit.index.count()
+
+    def audit_tail(self, n: int = 1) -> List[Dict[str, str]]:
+        """The last `n` audit events, oldest first."""
+        if self.db is not None:
+            return self.db.audit_events(limit=n)
+        self.audit.flush()
+        return self.audit.index.tail(n)
+
+    def audit_query(self, source: Optional[str] = None, start: Optional[Union[str, datetime]] = None,
+                    end: Optional[Union[str, datetime]] = None, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """Audit events from `source` (any if None) with start <= timestamp <= end, oldest first."""
+        if self.db is not None:
+            return self.db.audit_events(source=source, start=start, end=end, limit=limit, latest=False)
+        self.audit.flush()
+        return self.audit.index.query(source, start, end, limit)
+
+    def flush(self):
+        """Writes out audit events still queued in memory (the file backend batches them)."""
+        if self.audit is not None:
+            self.audit.flush()
 
     def log_event(self, source: str, event: str, details: str):
-        """Append-only Audit Log (The Black Box)."""
+        """Append-only Audit Log (The Black Box). Written in batches; see `flush`."""
         entry = {
             "timestamp": datetime.now().isoformat(),
             "source": source,
             "event": event,
             "details": details
         }
-        with open(self.audit_file, "a") as f:
-            f.write(json.dumps(entry) + "\n")
\ No newline at end of file
+        if self.db is not None:
+            self.db.log_event(entry)
+            return
+        self.audit.write(entry)
\ No newline at end of file
@@ -0,0 +1,327 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from core.audit.atomic import write_atomic
+from core.context.context_package import Citation, ContextPackage, RiskFinding
+from core.context.risk_register import RiskRegister
+from core.ledger.ledger_store import AgentLedger, LedgerEntry
+
+DB_FILENAME = "state.db"
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shifts (
+    name TEXT PRIMARY KEY,
+    shift_cycle INTEGER NOT NULL,
+    package_id TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    confidence_score REAL,
+    complexity_rating TEXT,
+    summary TEXT,
+    register_size INTEGER NOT NULL,
+    context TEXT NOT NULL -- The context minus its register (see findings)
+);
+CREATE INDEX IF NOT EXISTS shifts_cycle ON shifts(shift_cycle);
+CREATE INDEX IF NOT EXISTS shifts_agent ON shifts(agent_id);
+
+-- One row per finding per register version: live from `added_in` until `retired_in` (shift cycles)
+CREATE TABLE IF NOT EXISTS findings (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    added_in INTEGER NOT NULL,
+    retired_in INTEGER,
+    agent_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS findings_severity ON findings(severity);
+CREATE INDEX IF NOT EXISTS findings_category ON findings(category);
+CREATE INDEX IF NOT EXISTS findings_agent ON findings(agent_id);
+CREATE INDEX IF NOT EXISTS findings_added ON findings(added_in);
+CREATE INDEX IF NOT EXISTS findings_retired ON findings(retired_in);
+
+CREATE TABLE IF NOT EXISTS citations (
+    finding_id INTEGER NOT NULL REFERENCES findings(id),
+    position INTEGER NOT NULL,
+    document_name TEXT NOT NULL,
+    page_number INTEGER NOT NULL,
+    verbatim_quote TEXT NOT NULL,
+    PRIMARY KEY (finding_id, position)
+);
+CREATE INDEX IF NOT EXISTS citations_document ON citations(document_name, page_number);
+CREATE INDEX IF NOT EXISTS citations_page ON citations(page_number);
+
+CREATE TABLE IF NOT EXISTS ledgers (
+    agent_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL -- The ledger minus its history (see ledger_events)
+);
+
+CREATE TABLE IF NOT EXISTS ledger_events (
+    agent_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    amount REAL NOT NULL,
+    reason TEXT NOT NULL,
+    related_shift_id TEXT NOT NULL,
+    PRIMARY KEY (agent_id, seq)
+);
+CREATE INDEX IF NOT EXISTS ledger_events_type ON ledger_events(event_type);
+
+CREATE TABLE IF NOT EXISTS audit_events (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    source TEXT NOT NULL,
+    event TEXT NOT NULL,
+    details TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS audit_events_source ON audit_events(source, timestamp);
+CREATE INDEX IF NOT EXISTS audit_events_timestamp ON audit_events(timestamp);
+"""
+
+class SQLiteStore:
+    """
+    Engagement state in one SQLite file (WAL mode, so the dashboard and report
+    scripts can read while a run writes).
+
+    1. Shifts: one row each, the context without its register.
+    2. Findings + citations: a finding is stored once, when it enters the
+       register, and stays live until a shift rewrites the register (a
+       retirement or a reduce), which retires the old rows and inserts the new
+       register. The register of shift N is the rows live at N, by position.
+    3. Ledgers: current balances, plus their history as ledger_events rows.
+    4. Audit events: the Black Box log.
+
+    Every write is one transaction.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL") # A checkpoint must never point at a shift the DB lost
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        # Last saved (or loaded) shift: (shift_cycle, register)
+        self._parent: Optional[Tuple[int, RiskRegister]] = None
+
+    def close(self):
+        self._conn.close()
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # --- SHIFTS ---
+    def save_context(self, name: str, context: ContextPackage):
+        register = context.cumulative_risk_register
+        cycle = context.shift_cycle
+        parent = self._parent
+        with self._lock, self._conn:
+            if parent is not None and register.extends(parent[1]):
+                self._insert_findings(register[len(parent[1]):], len(parent[1]), cycle, context.previous_agent_id)
+            else:
+                # Rewritten register: keep who found each surviving finding
+                found_by = {(r["category"], r["description"]): r["agent_id"] for r in self._conn.execute(
+                    "SELECT category, description, agent_id FROM findings WHERE retired_in IS NULL")}
+                self._conn.execute("UPDATE findings SET retired_in = ? WHERE retired_in IS NULL", (cycle,))
+                for position, risk in enumerate(register):
+                    agent_id = found_by.get((risk.category, risk.description), context.previous_agent_id)
+                    self._insert_findings([risk], position, cycle, agent_id)
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO shifts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (name, cycle, context.package_id, context.previous_agent_id, context.timestamp.isoformat(),
+                 context.confidence_score, context.complexity_rating.value, str(context.task_state.get("summary", "")),
+                 len(register), context.model_dump_json(exclude={"cumulative_risk_register"})))
+        self._parent = (cycle, register)
+
+    def _insert_findings(self, risks: List[RiskFinding], start: int, cycle: int, agent_id: str):
+        for position, risk in enumerate(risks, start):
+            cursor = self._conn.execute(
+                "INSERT INTO findings (position, added_in, agent_id, category, severity, description) VALUES (?, ?, ?, ?, ?, ?)",
+                (position, cycle, agent_id, risk.category, risk.severity, risk.description))
+            self._conn.executemany(
+                "INSERT INTO citations VALUES (?, ?, ?, ?, ?)",
+                [(cursor.lastrowid, n, ev.document_name, ev.page_number, ev.verbatim_quote) for n, ev in enumerate(risk.evidence)])
+
+    def context_names(self) -> List[str]:
+        return [row["name"] for row in self._query("SELECT name FROM shifts ORDER BY shift_cycle, name")]
+
+    def load_context(self, name: str) -> ContextPackage:
+        rows = self._query("SELECT shift_cycle, context FROM shifts WHERE name = ?", (name,))
+        if not rows:
+            raise FileNotFoundError(f"No saved shift {name} in {self.db_path}")
+        cycle = rows[0]["shift_cycle"]
+        register = RiskRegister(self._register_at(cycle))
+        context = ContextPackage(**json.loads(rows[0]["context"]), cumulative_risk_register=register)
+        self._parent = (cycle, register)
+        return context
+
+    def iter_contexts(self) -> Iterator[Tuple[str, ContextPackage]]:
+        for name in self.context_names():
+            yield name, self.load_context(name)
+
+    def discard_after(self, shift_cycle: int) -> List[str]:
+        discarded = [row["name"] for row in self._query("SELECT name FROM shifts WHERE shift_cycle > ? ORDER BY shift_cycle", (shift_cycle,))]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM shifts WHERE shift_cycle > ?", (shift_cycle,))
+            self._conn.execute("DELETE FROM citations WHERE finding_id IN (SELECT id FROM findings WHERE added_in > ?)", (shift_cycle,))
+            self._conn.execute("DELETE FROM findings WHERE added_in > ?", (shift_cycle,))
+            self._conn.execute("UPDATE findings SET retired_in = NULL WHERE retired_in > ?", (shift_cycle,))
+        if self._parent is not None and self._parent[0] > shift_cycle:
+            self._parent = None
+        return discarded
+
+    # --- FINDINGS ---
+    def _live_at(self, cycle: Optional[int]) -> Tuple[str, Tuple]:
+        if cycle is None:
+            return "f.retired_in IS NULL", ()
+        return "f.added_in <= ? AND (f.retired_in IS NULL OR f.retired_in > ?)", (cycle, cycle)
+
+    def _register_at(self, cycle: int) -> List[RiskFinding]:
+        live, params = self._live_at(cycle)
+        return self._findings(f"SELECT f.* FROM findings f WHERE {live} ORDER BY f.position", params)
+
+    def _findings(self, sql: str, params: Tuple) -> List[RiskFinding]:
+        rows = self._query(sql, params)
+        evidence: Dict[int, List[Citation]] = {row["id"]: [] for row in rows}
+        if rows:
+            ids = list(evidence)
+            for chunk in range(0, len(ids), 500): # Keep under SQLite's bound-parameter limit
+                part = ids[chunk:chunk + 500]
+                for c in self._query(
+                        f"SELECT * FROM citations WHERE finding_id IN ({','.join('?' * len(part))}) ORDER BY finding_id, position", tuple(part)):
+                    evidence[c["finding_id"]].append(Citation(document_name=c["document_name"], page_number=c["page_number"], verbatim_quote=c["verbatim_quote"]))
+        return [RiskFinding(category=row["category"], severity=row["severity"], description=row["description"], evidence=evidence[row["id"]])
+                for row in rows]
+
+    def find_findings(self, severity: Optional[str] = None, category: Optional[str] = None, document: Optional[str] = None,
+                      page: Optional[int] = None, agent: Optional[str] = None, shift_cycle: Optional[int] = None) -> List[RiskFinding]:
+        """Findings in the register (latest, or as of `shift_cycle`) matching every given filter, in register order."""
+        live, params = self._live_at(shift_cycle)
+        where, args = [live], list(params)
+        for column, value in (("f.severity", severity), ("f.category", category), ("f.agent_id", agent)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(value)
+        if document is not None or page is not None:
+            cited = ["c.finding_id = f.id"]
+            if document is not None:
+                cited.append("c.document_name = ?")
+                args.append(document)
+            if page is not None:
+                cited.append("c.page_number = ?")
+                args.append(page)
+            where.append(f"EXISTS (SELECT 1 FROM citations c WHERE {' AND '.join(cited)})")
+        return self._findings(f"SELECT f.* FROM findings f WHERE {' AND '.join(where)} ORDER BY f.position", tuple(args))
+
+    def count_by_severity(self, shift_cycle: Optional[int] = None) -> Dict[str, int]:
+        live, params = self._live_at(shift_cycle)
+        return {row["severity"]: row["n"] for row in self._query(
+            f"SELECT f.severity, COUNT(*) AS n FROM findings f WHERE {live} GROUP BY f.severity", params)}
+
+    def shift_summaries(self) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self._query(
+            "SELECT name, shift_cycle, agent_id, timestamp, confidence_score, complexity_rating, summary, register_size "
+            "FROM shifts ORDER BY shift_cycle, name")]
+
+    # --- LEDGERS ---
+    def save_ledger(self, ledger: AgentLedger):
+        with self._lock, self._conn:
+            stored = self._conn.execute("SELECT COUNT(*) FROM ledger_events WHERE agent_id = ?", (ledger.agent_id,)).fetchone()[0]
+            if stored > len(ledger.history): # Rolled back to a checkpoint
+                self._conn.execute("DELETE FROM ledger_events WHERE agent_id = ? AND seq >= ?", (ledger.agent_id, len(ledger.history)))
+                stored = len(ledger.history)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ledger_events VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(ledger.agent_id, seq, e.timestamp.isoformat(), e.event_type, e.amount, e.reason, e.related_shift_id)
+                 for seq, e in enumerate(ledger.history[stored:], stored)])
+            self._conn.execute("INSERT OR REPLACE INTO ledgers VALUES (?, ?)",
+                               (ledger.agent_id, ledger.model_dump_json(exclude={"history"})))
+
+    def load_ledger(self, agent_id: str) -> Optional[AgentLedger]:
+        rows = self._query("SELECT state FROM ledgers WHERE agent_id = ?", (agent_id,))
+        if not rows:
+            return None
+        history = [LedgerEntry(timestamp=e["timestamp"], event_type=e["event_type"], amount=e["amount"],
+                               reason=e["reason"], related_shift_id=e["related_shift_id"])
+                   for e in self._query("SELECT * FROM ledger_events WHERE agent_id = ? ORDER BY seq", (agent_id,))]
+        return AgentLedger(**json.loads(rows[0]["state"]), history=history)
+
+    def ledger_ids(self) -> List[str]:
+        return [row["agent_id"] for row in self._query("SELECT agent_id FROM ledgers ORDER BY agent_id")]
+
+    def active_agents(self) -> List[str]:
+        """Agents whose ledger is still active (not decommissioned)."""
+        return [row["agent_id"] for row in self._query("SELECT agent_id, state FROM ledgers ORDER BY agent_id")
+                if json.loads(row["state"]).get("is_active", True)]
+
+    # --- AUDIT ---
+    def log_event(self, entry: Dict[str, str]):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO audit_events (timestamp, source, event, details) VALUES (?, ?, ?, ?)",
+                               (entry["timestamp"], entry["source"], entry["event"], entry["details"]))
+
+    def audit_events(self, source: Optional[str] = None, start: Optional[Union[str, datetime]] = None,
+                     end: Optional[Union[str, datetime]] = None, limit: Optional[int] = None, latest: bool = True) -> List[Dict[str, str]]:
+        """
+        Oldest first. With `limit`, the most recent `limit` matching events
+        (`latest`) or the earliest ones.
+        """
+        where, args = [], []
+        for clause, value in (("source = ?", source), ("timestamp >= ?", start), ("timestamp <= ?", end)):
+            if value is not None:
+                where.append(clause)
+                args.append(value.isoformat() if isinstance(value, datetime) else value)
+        sql = f"SELECT timestamp, source, event, details, id FROM audit_events {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY id {'DESC' if latest else ''}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        rows = sorted(self._query(sql, tuple(args)), key=lambda row: row["id"])
+        return [{k: row[k] for k in ("timestamp", "source", "event", "details")} for row in rows]
+
+    def audit_count(self) -> int:
+        # Append-only with rowid ids (nothing is ever deleted), so the last id is the count: one index seek, not a scan
+        return self._query("SELECT MAX(id) FROM audit_events")[0][0] or 0
+
+    # --- EXPORT ---
+    def export(self, root_dir: str, latest_only: bool = False) -> List[str]:
+        """
+        Writes the JSON layout of the file backend: contexts/shift_*.json,
+        ledgers/<agent>.json and audit_log.jsonl. Returns the shift names written.
+        """
+        context_dir = os.path.join(root_dir, "contexts")
+        ledger_dir = os.path.join(root_dir, "ledgers")
+        os.makedirs(context_dir, exist_ok=True)
+        os.makedirs(ledger_dir, exist_ok=True)
+
+        names = self.context_names()
+        if latest_only:
+            names = names[-1:]
+        for name in names:
+            write_atomic(os.path.join(context_dir, name), self.load_context(name).model_dump_json(indent=2))
+        for agent_id in self.ledger_ids():
+            write_atomic(os.path.join(ledger_dir, f"{agent_id}.json"), self.load_ledger(agent_id).model_dump_json(indent=2))
+        write_atomic(os.path.join(root_dir, "audit_log.jsonl"), "".join(json.dumps(e) + "\n" for e in self.audit_events()))
+        return names
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the SQLite state backend to the JSON layout")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--storage", default="storage", help="Engagement storage root")
+    parser.add_argument("--latest", action="store_true", help="Only the latest shift (ledgers and audit log are always complete)")
+    args = parser.parse_args()
+
+    store = SQLiteStore(os.path.join(args.storage, DB_FILENAME))
+    written = store.export(args.storage, latest_only=args.latest)
+    print(f"📤 Exported {len(written)} shifts, {len(store.ledger_ids())} ledgers and {store.audit_count()} audit events to {args.storage}")
@@ -0,0 +1,140 @@
+import os
+import time
+import shutil
+import tempfile
+from typing import Dict, Iterator, Optional, Tuple
+
+class DiskCache:
+    """
+    A size-bounded, content-addressed blob store on the local disk.
+
+    Every entry is one file under `objects/<key[:2]>/<key>`. The file's mtime
+    doubles as the 'last used' stamp (it is touched on every hit), so least
+    recently used entries are evicted first when the cache outgrows `max_bytes`.
+    Writes go through a temp file + rename, so a crash never leaves a torn entry.
+    """
+
+    def __init__(self, root_dir: str, max_bytes: Optional[int] = None, suffix: str = ""):
+        self.root_dir = root_dir
+        self.objects_dir = os.path.join(root_dir, "objects")
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._total_bytes: Optional[int] = None # Computed lazily on first write
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.objects_dir, key[:2], key + self.suffix)
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path) # Mark as recently used
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        if self._total_bytes is None:
+            self._total_bytes = self._scan_total()
+        else:
+            self._total_bytes += len(data) - old_size
+
+        if self.max_bytes is not None and self._total_bytes > self.max_bytes:
+            self.prune(self.max_bytes)
+
+    def delete(self, key: str) -> bool:
+        path = self._path(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        if self._total_bytes is not None:
+            self._total_bytes -= size
+        return True
+
+    def entries(self) -> Iterator[Tuple[str, int, float]]:
+        """Yields (key, size_bytes, last_used) for every entry."""
+        if not os.path.isdir(self.objects_dir):
+            return
+        for shard in os.scandir(self.objects_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith(".tmp_") or not entry.name.endswith(self.suffix):
+                    continue
+                st = entry.stat()
+                key = entry.name[:len(entry.name) - len(self.suffix)] if self.suffix else entry.name
+                yield key, st.st_size, st.st_mtime
+
+    def _scan_total(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def stats(self) -> Dict[str, float]:
+        count, total, oldest, newest = 0, 0, None, None
+        for _, size, last_used in self.entries():
+            count += 1
+            total += size
+            oldest = last_used if oldest is None else min(oldest, last_used)
+            newest = last_used if newest is None else max(newest, last_used)
+        self._total_bytes = total
+        return {
+            "entries": count,
+            "total_bytes": total,
+            "max_bytes": self.max_bytes,
+            "oldest_use": oldest,
+            "newest_use": newest,
+        }
+
+    def prune(self, max_bytes: Optional[int] = None, max_age_seconds: Optional[float] = None) -> int:
+        """
+        Evicts least recently used entries until the cache fits in `max_bytes`,
+        and drops anything unused for longer than `max_age_seconds`.
+        Returns the number of entries removed.
+        """
+        entries = sorted(self.entries(), key=lambda e: e[2]) # Oldest first
+        total = sum(size for _, size, _ in entries)
+        cutoff = time.time() - max_age_seconds if max_age_seconds is not None else None
+
+        removed = 0
+        for key, size, last_used in entries:
+            too_big = max_bytes is not None and total > max_bytes
+            too_old = cutoff is not None and last_used < cutoff
+            if not (too_big or too_old):
+                continue
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+        self._total_bytes = total
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.objects_dir, ignore_errors=True)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._total_bytes = 0
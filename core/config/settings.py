@@ -0,0 +1,50 @@
+import os
+from typing import Any, Dict
+from pydantic import BaseModel
+
+SYSTEM_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "system.yaml")
+
+class SystemSettings(BaseModel):
+    """Typed view of core/config/system.yaml. Missing keys keep these defaults."""
+    max_shift_duration_hours: float = 24
+    llm_attempt_timeout_seconds: float = 180
+    llm_call_timeout_seconds: float = 900
+    llm_hedge_requests: bool = True
+    llm_hedge_percentile: float = 0.95
+    context_keyframe_interval: int = 32
+    context_compression: bool = False
+    state_backend: str = "files"
+    audit_fsync: str = "batch"
+    audit_batch_size: int = 256
+    audit_flush_interval_seconds: float = 0.5
+    audit_segment_max_mb: float = 64
+
+    @property
+    def max_shift_duration_seconds(self) -> float:
+        return self.max_shift_duration_hours * 3600
+
+def _parse_flat_yaml(text: str) -> Dict[str, Any]:
+    """Fallback for flat `key: value` files when PyYAML is not installed."""
+    data = {}
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line or ":" not in line:
+            continue
+        key, value = (part.strip() for part in line.split(":", 1))
+        if value.lower() in ("true", "false"):
+            data[key] = value.lower() == "true"
+        elif value:
+            data[key] = value.strip("'\"")
+    return data
+
+def load_system_settings(path: str = SYSTEM_CONFIG_PATH) -> SystemSettings:
+    if not os.path.exists(path):
+        return SystemSettings()
+    with open(path, "r") as f:
+        text = f.read()
+    try:
+        import yaml
+        data = yaml.safe_load(text) or {}
+    except ImportError:
+        data = _parse_flat_yaml(text)
+    return SystemSettings(**data)
@@ -3,6 +3,8 @@ from datetime import datetime
 from enum import Enum
 from pydantic import BaseModel, Field, field_validator
 import uuid
+from core.context.usage import CallUsage, RoutingDecision
+from core.context.risk_register import RiskRegister
 
 class ComplexityLevel(str, Enum):
     LOW = "LOW"
@@ -31,7 +33,8 @@ class ContextPackage(BaseModel):
     task_state: Dict[str, Any] 
     
     # NEW: The Master Database (Managed by Orchestrator)
-    cumulative_risk_register: List[RiskFinding] = Field(default_factory=list)
+    # A shared, append-only version: handing a context on does not copy it
+    cumulative_risk_register: RiskRegister = Field(default_factory=RiskRegister)
     
     decisions: List[str]
     assumptions: List[str]
@@ -40,6 +43,10 @@ class ContextPackage(BaseModel):
     complexity_rating: ComplexityLevel
     intent_hash_reference: str
 
+    # What the LLM calls behind this shift cost
+    usage: List[CallUsage] = Field(default_factory=list)
+    routing: Optional[RoutingDecision] = None # Which model(s) answered, and why
+
     @field_validator('confidence_score')
     def validate_confidence(cls, v):
         if not 0 <= v <= 1:
@@ -0,0 +1,142 @@
+import re
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence
+from core.llm.token_estimator import estimate_tokens
+
+DEFAULT_REGISTER_TOKEN_CAP = 4_000
+
+_TERM = re.compile(r"[a-z0-9][a-z0-9$%.,-]*[a-z0-9%]|[a-z0-9]")
+_STOPWORDS = frozenset(
+    "the and for with that this from are was were has have had not but any all its our their which "
+    "will shall may must such other been being into upon under over per than then also each more "
+    "risk risks company document documents page section".split()
+)
+_SEVERITY_ORDER = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
+
+def content_terms(text: str) -> set:
+    return {t for t in _TERM.findall(text.lower()) if len(t) > 2 and t not in _STOPWORDS}
+
+def _finding_key(risk) -> str:
+    return f"{risk.category}|{risk.severity}|{risk.description}"
+
+class RegisterDigest:
+    """
+    Relevance-filtered view of the Master Risk Register for one shift's prompt.
+
+    Instead of pasting every prior finding into every prompt (prompt size grows
+    per shift, total tokens grow quadratically), the digest keeps:
+      1. the prior findings most lexically similar to the NEW documents
+         (an inverted index over finding descriptions, IDF-weighted), and
+      2. a category/severity rollup of everything left out,
+    under a hard token cap. Registers that already fit are passed through whole.
+
+    The index is updated incrementally as the register grows, so the cost per
+    shift follows the new documents, not the size of the register.
+    """
+
+    def __init__(self, token_cap: int = DEFAULT_REGISTER_TOKEN_CAP):
+        self.token_cap = token_cap
+        self._reset()
+
+    def _reset(self):
+        self._keys: List[str] = []
+        self._lines: List[str] = []
+        self._line_tokens: List[int] = []
+        self._term_counts: List[int] = []
+        self._groups: List[tuple] = [] # (category, severity) per finding
+        self._group_counts: Dict[str, Counter] = defaultdict(Counter) # category -> severity counts
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._total_tokens = 0
+
+    def _sync(self, register: Sequence):
+        """Indexes only findings appended since the last call; rebuilds if the register was rewritten."""
+        n = len(self._keys)
+        still_prefix = n <= len(register) and (n == 0 or (
+            _finding_key(register[0]) == self._keys[0] and _finding_key(register[n - 1]) == self._keys[n - 1]
+        ))
+        if not still_prefix:
+            self._reset()
+            n = 0
+
+        for idx in range(n, len(register)):
+            risk = register[idx]
+            line = f"- [{risk.severity}] {risk.category}: {risk.description}"
+            tokens = estimate_tokens(line) + 1
+            terms = content_terms(f"{risk.category} {risk.description}")
+            self._keys.append(_finding_key(risk))
+            self._lines.append(line)
+            self._line_tokens.append(tokens)
+            self._term_counts.append(max(1, len(terms)))
+            self._groups.append((risk.category, risk.severity))
+            self._group_counts[risk.category][risk.severity] += 1
+            self._total_tokens += tokens
+            for term in terms:
+                self._postings[term].append(idx)
+
+    def _rank(self, new_documents: str) -> List[int]:
+        """Findings ordered by IDF-weighted term overlap with the new documents."""
+        total = len(self._keys)
+        scores: Dict[int, float] = defaultdict(float)
+        for term in content_terms(new_documents):
+            postings = self._postings.get(term)
+            # Terms in more than half the register don't discriminate
+            if not postings or len(postings) > total / 2:
+                continue
+            idf = math.log(1 + total / len(postings))
+            for idx in postings:
+                scores[idx] += idf
+        ranked = sorted(scores, key=lambda i: (-scores[i] / math.sqrt(self._term_counts[i]), i))
+        return ranked
+
+    def _rollup(self, selected: List[int]) -> List[str]:
+        # Running totals minus what's shown: no pass over the whole register
+        by_category = {category: Counter(counts) for category, counts in self._group_counts.items()}
+        for idx in selected:
+            category, severity = self._groups[idx]
+            by_category[category][severity] -= 1
+        by_category = {c: +counts for c, counts in by_category.items() if +counts}
+        lines = []
+        for category in sorted(by_category, key=lambda c: -sum(by_category[c].values())):
+            counts = by_category[category]
+            parts = ", ".join(f"{counts[s]} {s}" for s in sorted(counts, key=lambda s: _SEVERITY_ORDER.get(s, 9)))
+            lines.append(f"- {category}: {parts}")
+        return lines
+
+    def render(self, register: Sequence, new_documents: str) -> str:
+        if not register:
+            return "None."
+        self._sync(register)
+
+        # Small registers go in whole, exactly as before
+        if self._total_tokens <= self.token_cap:
+            return "\n".join(self._lines)
+
+        ranked = self._rank(new_documents)
+        # Reserve room for the rollup and headers first so the cap is never exceeded
+        rollup_budget = self.token_cap // 5
+        budget = self.token_cap - rollup_budget - 40
+
+        selected, used = [], 0
+        for idx in ranked:
+            if used + self._line_tokens[idx] > budget:
+                continue
+            selected.append(idx)
+            used += self._line_tokens[idx]
+        excluded = len(self._keys) - len(selected)
+
+        rollup, rollup_used = [], 0
+        for line in self._rollup(selected):
+            cost = estimate_tokens(line) + 1
+            if rollup_used + cost > rollup_budget:
+                rollup.append("- (further categories omitted)")
+                break
+            rollup.append(line)
+            rollup_used += cost
+
+        parts = [f"(Showing {len(selected)} of {len(self._keys)} prior findings most relevant to these documents.)"]
+        parts.extend(self._lines[i] for i in sorted(selected)) # Keep register order
+        if excluded:
+            parts.append(f"\nOther prior findings, not shown ({excluded}):")
+            parts.extend(rollup)
+        return "\n".join(parts)
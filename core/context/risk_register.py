@@ -0,0 +1,123 @@
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple, Union, overload
+
+CHUNK_SIZE = 256
+
+class RiskRegister(Sequence):
+    """
+    Persistent, append-only Master Risk Register.
+
+    Findings live in immutable chunks of CHUNK_SIZE. `extend` returns a new
+    version that shares every full chunk with the old one and only rebuilds
+    the partly filled tail, so committing a shift costs O(new findings)
+    (plus one pointer per chunk) instead of a copy of the whole register. Old versions stay valid: a
+    rejected shift's register is simply dropped, and contexts can hold their
+    version without a deep copy.
+
+    Findings are shared between versions and must not be mutated in place.
+    """
+
+    __slots__ = ("_chunks", "_tail", "_len")
+
+    def __init__(self, findings: Iterable = ()):
+        findings = tuple(findings)
+        full = len(findings) - len(findings) % CHUNK_SIZE
+        self._chunks: Tuple[Tuple, ...] = tuple(findings[n:n + CHUNK_SIZE] for n in range(0, full, CHUNK_SIZE))
+        self._tail: Tuple = findings[full:]
+        self._len = len(findings)
+
+    @classmethod
+    def _version(cls, chunks: Tuple[Tuple, ...], tail: Tuple) -> "RiskRegister":
+        register = cls.__new__(cls)
+        register._chunks = chunks
+        register._tail = tail
+        register._len = len(chunks) * CHUNK_SIZE + len(tail)
+        return register
+
+    def extend(self, findings: Iterable) -> "RiskRegister":
+        """New version with `findings` appended. This version is unchanged."""
+        tail = self._tail + tuple(findings)
+        if len(tail) < CHUNK_SIZE:
+            return self._version(self._chunks, tail)
+        full = len(tail) - len(tail) % CHUNK_SIZE
+        new_chunks = tuple(tail[n:n + CHUNK_SIZE] for n in range(0, full, CHUNK_SIZE))
+        return self._version(self._chunks + new_chunks, tail[full:])
+
+    def __add__(self, findings: Iterable) -> "RiskRegister":
+        return self.extend(findings)
+
+    def __len__(self) -> int:
+        return self._len
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+    @overload
+    def __getitem__(self, index: slice) -> List: ...
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("register index out of range")
+        chunk, offset = divmod(index, CHUNK_SIZE)
+        return self._chunks[chunk][offset] if chunk < len(self._chunks) else self._tail[offset]
+
+    def __iter__(self) -> Iterator:
+        for chunk in self._chunks:
+            yield from chunk
+        yield from self._tail
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (RiskRegister, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"RiskRegister({self._len} findings, {len(self._chunks)} full chunks)"
+
+    # Immutable: sharing is the whole point, so copies are the same object
+    def __copy__(self) -> "RiskRegister":
+        return self
+
+    def __deepcopy__(self, memo) -> "RiskRegister":
+        return self
+
+    def extends(self, other: "RiskRegister") -> bool:
+        """
+        True if `other` is a prefix of this version because this one was built by
+        appending to it (checked by identity, so O(chunks + CHUNK_SIZE)).
+        """
+        if not isinstance(other, RiskRegister) or len(other) > self._len:
+            return False
+        n = len(other._chunks)
+        if any(a is not b for a, b in zip(self._chunks, other._chunks)):
+            return False
+        start = n * CHUNK_SIZE
+        return all(self[start + i] is risk for i, risk in enumerate(other._tail))
+
+    def shares_chunks_with(self, other: "RiskRegister") -> int:
+        """How many leading chunks two versions share by identity (for tests and diagnostics)."""
+        shared = 0
+        for a, b in zip(self._chunks, other._chunks):
+            if a is not b:
+                break
+            shared += 1
+        return shared
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any):
+        """
+        A RiskRegister passes validation as-is (no per-finding re-validation);
+        a plain list (e.g. from JSON) is validated into RiskFindings and wrapped.
+        Serialized as a plain list of findings.
+        """
+        from pydantic_core import core_schema
+        from core.context.context_package import RiskFinding # Defined alongside the model that uses us
+
+        findings_schema = handler.generate_schema(List[RiskFinding])
+        from_list = core_schema.no_info_after_validator_function(cls, findings_schema)
+        return core_schema.json_or_python_schema(
+            json_schema=from_list,
+            python_schema=core_schema.union_schema([core_schema.is_instance_schema(cls), from_list]),
+            serialization=core_schema.plain_serializer_function_ser_schema(list, return_schema=findings_schema),
+        )
@@ -0,0 +1,34 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+class CallUsage(BaseModel):
+    """What one structured completion cost."""
+    model: str
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+    retries: int = 0 # Attempts beyond the first (429/503/timeouts)
+    timed_out_attempts: int = 0
+    hedges: int = 0 # Duplicate requests fired past the latency threshold
+    backoff_seconds: float = 0.0 # Time spent waiting on the rate budget
+    wall_seconds: float = 0.0
+    cost_usd: float = 0.0
+    cached: bool = False # Served from the response cache: nothing was bought
+    tokens_estimated: bool = False # Provider reported no usage; counts are estimates
+
+class RoutingDecision(BaseModel):
+    """Which models answered a shift, and why it was escalated (kept in the context and audit log)."""
+    models_tried: List[str] = Field(default_factory=list)
+    final_model: str = ""
+    reasons: List[str] = Field(default_factory=list) # Escalation triggers seen on the fast answer
+    escalation_error: str = "" # Strong model failed; the fast answer was kept
+
+    @property
+    def escalated(self) -> bool:
+        return len(self.models_tried) > 1
+
+    def summary(self) -> str:
+        path = " -> ".join(self.models_tried)
+        if not self.reasons:
+            return f"{path} (no escalation)"
+        note = f" | escalation failed, kept fast answer: {self.escalation_error}" if self.escalation_error else ""
+        return f"{path} ({'; '.join(self.reasons)}){note}"
@@ -1,7 +1,9 @@
-from typing import List
+from typing import List, Iterable
 from datetime import datetime
 from pydantic import BaseModel, Field
 from core.ledger.error_types import ErrorType
+from core.context.usage import CallUsage
+from core.llm.usage import UsageSummary
 
 class LedgerEntry(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
@@ -27,6 +29,12 @@ class AgentLedger(BaseModel):
     
     history: List[LedgerEntry] = Field(default_factory=list)
 
+    # What this agent's shifts cost (tokens, retries, time, $)
+    usage: UsageSummary = Field(default_factory=UsageSummary)
+
+    def record_usage(self, calls: Iterable[CallUsage]):
+        self.usage.add_all(calls)
+
     # --- 1. THE GRIND (Safe Path) ---
     def complete_successful_shift(self, shift_id: str):
         if not self.is_active: return
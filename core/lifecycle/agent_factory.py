@@ -1,14 +1,16 @@
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 from core.ledger.ledger_store import AgentLedger
 from core.intent.intent_schema import IntentPackage
 from agents.executor.base_executor import BaseExecutor
+from core.llm.model_router import ModelRouter
 
 class AgentFactory:
     """
     Responsible for creating new agents and handling the 'Rebirth' logic.
     """
     
-    def create_replacement(self, dead_agent_id: str, dead_ledger: AgentLedger, intent: IntentPackage) -> Tuple[BaseExecutor, AgentLedger, str]:
+    def create_replacement(self, dead_agent_id: str, dead_ledger: AgentLedger, intent: IntentPackage,
+                           router: Optional[ModelRouter] = None) -> Tuple[BaseExecutor, AgentLedger, str]:
         """
         Analyzes the dead agent and spawns a smarter successor.
         """
@@ -33,7 +35,7 @@ class AgentFactory:
 
         # 4. Create New Executor with Injected Wisdom
         # We inject the lesson into the agent's 'memory' (simulated here by attaching it)
-        new_worker = BaseExecutor(new_id, intent)
+        new_worker = BaseExecutor(new_id, intent, router=router)
         
         # HACK: We attach the lesson to the worker instance so it can use it in prompts later
         new_worker.inherited_lessons = lessons_learned
@@ -0,0 +1,48 @@
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+class LatencyTracker:
+    """
+    Rolling window of successful request latencies for one model.
+
+    Feeds the hedge threshold: once enough samples exist, a request still
+    outstanding after the chosen percentile (p95 by default) gets a duplicate.
+    The threshold follows the window, so it re-tunes itself as the API
+    speeds up or slows down.
+    """
+
+    def __init__(self, window: int = 200, percentile: float = 0.95, min_samples: int = 20, min_hedge_seconds: float = 1.0):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_hedge_seconds = min_hedge_seconds
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0 # All-time samples
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def hedge_after(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while the window is too small to trust."""
+        if len(self._samples) < self.min_samples:
+            return None
+        return max(self.min_hedge_seconds, self.quantile(self.percentile))
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        return {"p50": self.quantile(0.50), "p95": self.quantile(0.95), "p99": self.quantile(0.99), "samples": self.count}
+
+    def summary(self) -> str:
+        s = self.stats()
+        if s["p50"] is None:
+            return "no samples"
+        return f"p50 {s['p50']:.1f}s | p95 {s['p95']:.1f}s | p99 {s['p99']:.1f}s (n={s['samples']})"
@@ -1,27 +1,74 @@
-import os
+import asyncio
 import time
 import random
 import json
-from typing import Type, TypeVar, Any
+import threading
+from typing import Type, TypeVar, Any, Optional, Tuple
 from pydantic import BaseModel
-from google import genai
-from google.genai import types
 from dotenv import load_dotenv
+from core.llm.rate_limiter import RateLimiter
+from core.llm.token_estimator import estimate_tokens
+from core.llm.response_cache import ResponseCache
+from core.llm.providers import LLMProvider, provider_from_env
+from core.llm.usage import estimate_cost
+from core.context.usage import CallUsage
+from core.llm.latency_tracker import LatencyTracker
 
 load_dotenv()
 
 T = TypeVar("T", bound=BaseModel)
 
+# Rough allowance for the JSON answer when reserving tokens/min up front
+EXPECTED_RESPONSE_TOKENS = 2_000
+
+# --- THE LLM I/O LOOP ---
+# Every LLM request in the process runs on one background event loop. The SDK's
+# async HTTP client and the limiter's semaphore live there, so sync callers,
+# threads and other event loops can all share one rate budget safely.
+_io_loop: Optional[asyncio.AbstractEventLoop] = None
+_io_lock = threading.Lock()
+
+def _get_io_loop() -> asyncio.AbstractEventLoop:
+    global _io_loop
+    with _io_lock:
+        if _io_loop is None or _io_loop.is_closed():
+            _io_loop = asyncio.new_event_loop()
+            threading.Thread(target=_io_loop.run_forever, name="llm-io-loop", daemon=True).start()
+        return _io_loop
+
+class DeadlineExceeded(TimeoutError):
+    """A call (all retries and budget waits included) ran past its deadline and was cancelled."""
+
+def failed_call_usage(error: BaseException) -> Optional[CallUsage]:
+    """What a call that raised `error` had spent (retries, hedges, waits), if an LLMClient raised it."""
+    return getattr(error, "usage", None)
+
 class LLMClient:
     # You can change this to "gemini-1.5-pro-002" if you want reasoning
-    def __init__(self, model="gemini-3-flash-preview"):
+    def __init__(self, model="gemini-3-flash-preview", limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = None, provider: Optional[LLMProvider] = None,
+                 attempt_timeout_seconds: Optional[float] = None, call_timeout_seconds: Optional[float] = None,
+                 hedge: bool = False, latency: Optional[LatencyTracker] = None):
+        """
+        attempt_timeout_seconds: Ceiling for one request; a stuck request is cancelled and retried.
+        call_timeout_seconds: Ceiling for the whole call, retries and rate-budget waits included.
+        hedge: Fire one duplicate request once an attempt outlives the tracked p95 latency.
+        """
         self.model_name = model
-        api_key = os.getenv("GEMINI_API_KEY")
-        
-        if not api_key:
-            raise ValueError("❌ CRITICAL: GEMINI_API_KEY not found in .env file.")
-            
-        self.client = genai.Client(api_key=api_key)
+        self.limiter = limiter or RateLimiter.shared()
+        self.cache = cache or ResponseCache.from_env()
+        self.attempt_timeout_seconds = attempt_timeout_seconds
+        self.call_timeout_seconds = call_timeout_seconds
+        self.hedge = hedge
+        self.latency = latency or LatencyTracker()
+
+        # Replay mode never touches the network, so it runs without a key
+        if provider is None and self.cache.replay:
+            self.provider = None
+            return
+
+        # Backend chosen by LLM_PROVIDER (Gemini needs GEMINI_API_KEY, raises ValueError without it)
+        self.provider = provider or provider_from_env()
 
     def _sanitize_schema(self, schema: Any) -> Any:
         if isinstance(schema, dict):
@@ -35,58 +82,197 @@ class LLMClient:
                 self._sanitize_schema(item)
         return schema
 
+    def _parse_response(self, response: Any, response_model: Type[T]) -> T:
+        if response.parsed:
+            try:
+                return response_model(**response.parsed)
+            except:
+                return response_model(**json.loads(response.text))
+
+        data = json.loads(response.text)
+        return response_model(**data)
+
     def get_structured_completion(self, system_prompt: str, user_prompt: str, response_model: Type[T]) -> T:
         """
-        Robust Client with Aggressive Backoff for Pro Models.
+        Blocking wrapper around `aget_structured_completion`, kept for the serial scheduler.
+        """
+        return self.get_structured_completion_with_usage(system_prompt, user_prompt, response_model)[0]
+
+    async def aget_structured_completion(self, system_prompt: str, user_prompt: str, response_model: Type[T]) -> T:
+        """
+        Async API. Safe to await from any event loop; the request itself runs on
+        the shared LLM I/O loop, and cancelling the awaiting task cancels it there.
+        """
+        return (await self.aget_structured_completion_with_usage(system_prompt, user_prompt, response_model))[0]
+
+    def get_structured_completion_with_usage(self, system_prompt: str, user_prompt: str, response_model: Type[T],
+                                             deadline: Optional[float] = None) -> Tuple[T, CallUsage]:
+        """
+        Same as `get_structured_completion`, plus what the call cost (tokens, retries, time).
+        deadline: absolute `time.monotonic()` by which the answer is needed (e.g. end of shift).
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._complete(system_prompt, user_prompt, response_model, deadline), _get_io_loop()
+        )
+        return future.result()
+
+    async def aget_structured_completion_with_usage(self, system_prompt: str, user_prompt: str, response_model: Type[T],
+                                                    deadline: Optional[float] = None) -> Tuple[T, CallUsage]:
+        future = asyncio.run_coroutine_threadsafe(
+            self._complete(system_prompt, user_prompt, response_model, deadline), _get_io_loop()
+        )
+        return await asyncio.wrap_future(future)
+
+    async def _complete(self, system_prompt: str, user_prompt: str, response_model: Type[T],
+                        deadline: Optional[float] = None) -> Tuple[T, CallUsage]:
+        """Applies the call deadline (the tighter of our own and the caller's) with real cancellation."""
+        started = time.monotonic()
+        usage = CallUsage(model=self.model_name)
+        timeout = self.call_timeout_seconds
+        if deadline is not None:
+            timeout = deadline - started if timeout is None else min(timeout, deadline - started)
+
+        try:
+            if timeout is None:
+                result = await self._complete_with_retries(system_prompt, user_prompt, response_model, usage)
+            elif timeout <= 0:
+                raise asyncio.TimeoutError()
+            else:
+                result = await asyncio.wait_for(self._complete_with_retries(system_prompt, user_prompt, response_model, usage), timeout)
+        except (DeadlineExceeded, asyncio.TimeoutError) as e:
+            # A failed call still cost something: the partial usage travels with the error
+            usage.wall_seconds = time.monotonic() - started
+            if not isinstance(e, DeadlineExceeded):
+                print(f"   ⌛ Deadline exceeded ({self.model_name}) after {usage.wall_seconds:.1f}s.")
+                e = DeadlineExceeded(f"LLM call to {self.model_name} missed its deadline ({max(timeout, 0):.0f}s).")
+            e.usage = usage
+            raise e
+        except Exception as e:
+            usage.wall_seconds = time.monotonic() - started
+            e.usage = usage
+            raise
+
+        usage.wall_seconds = time.monotonic() - started
+        return result, usage
+
+    async def _complete_with_retries(self, system_prompt: str, user_prompt: str, response_model: Type[T], usage: CallUsage) -> T:
+        """
+        Robust Client: paced by the shared rate limiter, adaptive on 429/503.
         """
         max_retries = 5 # Increased retries
-        
-        # If using Pro, start with a high delay
+
+        # If using Pro, pause the budget for longer after a throttle
         if "pro" in self.model_name.lower():
             base_delay = 35 # 35 seconds minimum for Pro tier
         else:
             base_delay = 5  # 5 seconds for Flash tier
-        
+
+        raw_schema = response_model.model_json_schema()
+        clean_schema = self._sanitize_schema(raw_schema)
+
+        # Recorded answer? (Raises CacheMissError in replay mode if not)
+        cache_key = ResponseCache.make_key(self.model_name, system_prompt, user_prompt, clean_schema)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            usage.cached = True
+            return response_model(**cached)
+
+        request_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt) + EXPECTED_RESPONSE_TOKENS
+
         for attempt in range(max_retries):
+            usage.retries = attempt
+            # Wait for our share of the budget (requests/min, tokens/min, pauses after 429s)
+            usage.backoff_seconds += await self.limiter.acquire(request_tokens)
             try:
-                raw_schema = response_model.model_json_schema()
-                clean_schema = self._sanitize_schema(raw_schema)
-
-                response = self.client.models.generate_content(
-                    model=self.model_name,
-                    contents=user_prompt,
-                    config=types.GenerateContentConfig(
-                        system_instruction=system_prompt,
-                        response_mime_type="application/json",
-                        response_schema=clean_schema,
-                        temperature=0.1
-                    )
-                )
-                
-                if hasattr(response, "parsed") and response.parsed:
-                    try:
-                        return response_model(**response.parsed)
-                    except:
-                        import json
-                        return response_model(**json.loads(response.text))
-                
-                import json
-                data = json.loads(response.text)
-                return response_model(**data)
-                
+                response = await self._attempt(system_prompt, user_prompt, clean_schema, request_tokens, usage)
+                self.limiter.on_success()
+                result = self._parse_response(response, response_model)
+                self.cache.put(cache_key, self.model_name, result.model_dump(mode="json"))
+
+                # Provider-reported usage when available, our estimate otherwise (added to any hedge already billed)
+                prompt_tokens, response_tokens = response.prompt_tokens, response.response_tokens
+                if not prompt_tokens:
+                    prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+                    response_tokens = estimate_tokens(response.text)
+                    usage.tokens_estimated = True
+                usage.prompt_tokens += prompt_tokens
+                usage.response_tokens += response_tokens
+                usage.cost_usd += estimate_cost(self.model_name, prompt_tokens, response_tokens)
+                return result
+
+            except asyncio.TimeoutError:
+                # One stuck request: cancelled by _attempt, try again (the call deadline still applies)
+                usage.timed_out_attempts += 1
+                if attempt < max_retries - 1:
+                    print(f"   ⌛ Request timed out ({self.model_name}) after {self.attempt_timeout_seconds:.0f}s. Retrying...")
+                    continue
+                raise DeadlineExceeded(f"All {max_retries} requests to {self.model_name} timed out.")
             except Exception as e:
                 error_str = str(e)
                 # Catch 429 (Rate Limit) AND 503 (Service Overload)
-                if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str or "503" in error_str:
+                if getattr(e, "status_code", None) in (429, 503) or "429" in error_str or "RESOURCE_EXHAUSTED" in error_str or "503" in error_str:
+                    # Slow the whole shared budget down; the next acquire() waits it out
+                    pause = self.limiter.on_throttle(base_pause=base_delay + random.uniform(0, 1))
                     if attempt < max_retries - 1:
-                        # Exponential Backoff: 35s -> 70s -> 140s
-                        wait_time = (base_delay * (2 ** attempt)) + random.uniform(1, 5)
-                        print(f"   ⏳ Rate Limit/Overload ({self.model_name}). Sleeping for {wait_time:.1f}s...")
-                        time.sleep(wait_time)
+                        print(f"   ⏳ Rate Limit/Overload ({self.model_name}). Budget paused {pause:.1f}s, rate now {self.limiter.rate_scale:.0%}...")
                         continue
                     else:
                         print(f"   🔥 Max Retries Exceeded.")
                         raise e
                 else:
-                    print(f"   🔥 GEMINI ERROR: {error_str}")
-                    raise e
\ No newline at end of file
+                    print(f"   🔥 {self.provider.name.upper()} ERROR: {error_str}")
+                    raise e
+
+    async def _attempt(self, system_prompt: str, user_prompt: str, schema: Any, request_tokens: int, usage: CallUsage) -> Any:
+        """
+        One logical request, bounded by the attempt timeout. If it is still
+        outstanding past the tracked p95 latency, a single duplicate is fired
+        (only if the rate budget has room right now) and the first success wins.
+        Losers are cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        async def call():
+            async with self.limiter.slot():
+                sent = loop.time()
+                response = await self.provider.generate(self.model_name, system_prompt, user_prompt, schema)
+                self.latency.record(loop.time() - sent)
+                return response
+
+        tasks = [asyncio.ensure_future(call())]
+        try:
+            hedge_after = self.latency.hedge_after() if self.hedge else None
+            if hedge_after is not None and (self.attempt_timeout_seconds is None or hedge_after < self.attempt_timeout_seconds):
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done and self.limiter.try_reserve(request_tokens):
+                    usage.hedges += 1
+                    # The duplicate's prompt is paid for whichever request wins
+                    hedge_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+                    usage.prompt_tokens += hedge_tokens
+                    usage.cost_usd += estimate_cost(self.model_name, hedge_tokens, 0)
+                    print(f"   🐢 Slow response ({self.model_name}) past p95 {hedge_after:.1f}s. Hedging...")
+                    tasks.append(asyncio.ensure_future(call()))
+
+            error = None
+            pending = set(tasks)
+            while pending:
+                remaining = None
+                if self.attempt_timeout_seconds is not None:
+                    remaining = self.attempt_timeout_seconds - (loop.time() - started)
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise asyncio.TimeoutError()
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                    # Nobody awaits a cancelled loser; mark its outcome as seen
+                    task.add_done_callback(lambda t: t.cancelled() or t.exception())
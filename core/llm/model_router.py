@@ -0,0 +1,114 @@
+import os
+from typing import Any, List, Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel
+import asyncio
+from core.llm.llm_client import LLMClient, _get_io_loop, failed_call_usage
+from core.llm.latency_tracker import LatencyTracker
+from core.config.settings import SystemSettings, load_system_settings
+from core.llm.rate_limiter import RateLimiter
+from core.llm.response_cache import ResponseCache, CacheMissError
+from core.llm.providers import provider_from_env
+from core.context.usage import CallUsage, RoutingDecision
+
+T = TypeVar("T", bound=BaseModel)
+
+DEFAULT_FAST_MODEL = "gemini-3-flash-preview"
+DEFAULT_STRONG_MODEL = "gemini-3-pro-preview"
+
+class ModelRouter:
+    """
+    Cascade: every batch goes to the fast model first. The answer is escalated
+    to the strong model only if it shows one of the signals the Supervisor
+    would act on:
+      1. complexity_rating == HIGH
+      2. confidence below the Supervisor's strictness
+      3. a citation that does not check out against the page text
+    Most boilerplate batches never leave the fast tier.
+    """
+
+    def __init__(self, fast: LLMClient, strong: Optional[LLMClient] = None,
+                 citation_index: Any = None, strictness: float = 0.8):
+        self.fast = fast
+        self.strong = strong
+        self.citation_index = citation_index
+        self.strictness = strictness
+
+    @classmethod
+    def from_env(cls, citation_index: Any = None, strictness: float = 0.8, settings: Optional[SystemSettings] = None) -> "ModelRouter":
+        """
+        LLM_FAST_MODEL and LLM_STRONG_MODEL pick the tiers; an empty LLM_STRONG_MODEL disables escalation.
+        Timeouts and hedging come from core/config/system.yaml.
+        """
+        settings = settings or load_system_settings()
+        cache = ResponseCache.from_env()
+        provider = None if cache.replay else provider_from_env()
+        limiter = RateLimiter.shared()
+
+        def client(model: str) -> LLMClient:
+            return LLMClient(
+                model, limiter=limiter, cache=cache, provider=provider,
+                attempt_timeout_seconds=settings.llm_attempt_timeout_seconds,
+                call_timeout_seconds=settings.llm_call_timeout_seconds,
+                hedge=settings.llm_hedge_requests,
+                latency=LatencyTracker(percentile=settings.llm_hedge_percentile),
+            )
+
+        strong_model = os.getenv("LLM_STRONG_MODEL", DEFAULT_STRONG_MODEL).strip()
+        fast = client(os.getenv("LLM_FAST_MODEL", DEFAULT_FAST_MODEL))
+        strong = client(strong_model) if strong_model else None
+        return cls(fast, strong, citation_index, strictness)
+
+    @property
+    def tiers(self) -> List[LLMClient]:
+        return [self.fast] + ([self.strong] if self.strong is not None else [])
+
+    def escalation_reasons(self, output: Any) -> List[str]:
+        reasons = []
+        complexity = getattr(output, "complexity_rating", None)
+        if getattr(complexity, "value", complexity) == "HIGH":
+            reasons.append("complexity HIGH")
+
+        confidence = getattr(output, "confidence_score", None)
+        if confidence is not None and confidence < self.strictness:
+            reasons.append(f"confidence {confidence:.2f} < {self.strictness:.2f}")
+
+        if self.citation_index is not None:
+            task_state = getattr(output, "task_state", None)
+            citations = [
+                ev for risk in getattr(task_state, "identified_risks", [])
+                for ev in risk.evidence if "Master Risk Register" not in ev.document_name
+            ]
+            report = self.citation_index.verify_all(citations)
+            if not report.all_verified:
+                reasons.append(f"{len(report.failed)} unverified citations")
+        return reasons
+
+    def complete(self, system_prompt: str, user_prompt: str, response_model: Type[T],
+                 deadline: Optional[float] = None) -> Tuple[T, List[CallUsage], RoutingDecision]:
+        """Blocking wrapper around `acomplete`, kept for the serial scheduler."""
+        future = asyncio.run_coroutine_threadsafe(
+            self.acomplete(system_prompt, user_prompt, response_model, deadline), _get_io_loop()
+        )
+        return future.result()
+
+    async def acomplete(self, system_prompt: str, user_prompt: str, response_model: Type[T],
+                        deadline: Optional[float] = None) -> Tuple[T, List[CallUsage], RoutingDecision]:
+        """deadline: absolute `time.monotonic()` shared by both tiers (an escalation only gets what is left)."""
+        output, usage = await self.fast.aget_structured_completion_with_usage(system_prompt, user_prompt, response_model, deadline)
+        calls = [usage]
+        decision = RoutingDecision(models_tried=[self.fast.model_name], final_model=self.fast.model_name)
+        decision.reasons = self.escalation_reasons(output)
+
+        if decision.reasons and self.strong is not None:
+            decision.models_tried.append(self.strong.model_name)
+            try:
+                output, usage = await self.strong.aget_structured_completion_with_usage(system_prompt, user_prompt, response_model, deadline)
+                calls.append(usage)
+                decision.final_model = self.strong.model_name
+            except CacheMissError:
+                raise
+            except Exception as e:
+                decision.escalation_error = str(e)[:200]
+                if failed_call_usage(e) is not None: # The failed attempt still cost something
+                    calls.append(failed_call_usage(e))
+        return output, calls, decision
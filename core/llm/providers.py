@@ -0,0 +1,221 @@
+import os
+import re
+import json
+import random
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from core.llm.token_estimator import estimate_tokens
+
+class ProviderResponse(BaseModel):
+    """What a backend hands back to `LLMClient`: the raw JSON text plus usage."""
+    text: str
+    parsed: Optional[Any] = None
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+
+class ProviderError(RuntimeError):
+    """Transport-level failure with an HTTP-like status (429/503 are retried by the client)."""
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class LLMProvider(ABC):
+    """
+    Backend interface behind `LLMClient`. A provider only turns one prompt into
+    one JSON answer; pacing, retries and caching stay in the client.
+    """
+    name = "base"
+
+    @abstractmethod
+    async def generate(self, model: str, system_prompt: str, user_prompt: str, schema: Dict[str, Any]) -> ProviderResponse:
+        ...
+
+# --- GEMINI ---
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str] = None, client: Any = None):
+        if client is None:
+            api_key = api_key or os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise ValueError("❌ CRITICAL: GEMINI_API_KEY not found in .env file.")
+            from google import genai
+            client = genai.Client(api_key=api_key)
+        self.client = client
+
+    async def generate(self, model: str, system_prompt: str, user_prompt: str, schema: Dict[str, Any]) -> ProviderResponse:
+        from google.genai import types
+        response = await self.client.aio.models.generate_content(
+            model=model,
+            contents=user_prompt,
+            config=types.GenerateContentConfig(
+                system_instruction=system_prompt,
+                response_mime_type="application/json",
+                response_schema=schema,
+                temperature=0.1
+            )
+        )
+        usage = getattr(response, "usage_metadata", None)
+        return ProviderResponse(
+            text=response.text or "",
+            parsed=getattr(response, "parsed", None),
+            prompt_tokens=getattr(usage, "prompt_token_count", None) or 0,
+            response_tokens=getattr(usage, "candidates_token_count", None) or 0,
+        )
+
+# --- MOCK ---
+
+_DOCUMENT = re.compile(r"\[DOCUMENT START: (.+?)\]")
+_PAGE = re.compile(r"--- Page (\d+) ---\n")
+_WORDS = (
+    "indemnity covenant change-of-control termination exclusivity warranty escrow liability "
+    "assignment consent receivable impairment litigation licence renewal audit retention"
+).split()
+MAX_TRACKED_PROMPTS = 10_000 # Failing prompts whose attempt number is remembered
+
+class MockProvider(LLMProvider):
+    """
+    Deterministic offline backend for load tests.
+
+    Answers are generated from the response schema, so they always validate:
+    risk citations point at real `[DOCUMENT START]` / `--- Page N ---` sections
+    of the prompt and quote them verbatim (they pass citation verification).
+    The same prompt and seed always give the same answer; latency, 429/503
+    error rates and output size are configurable.
+    """
+    name = "mock"
+
+    def __init__(self, latency_seconds: float = 0.05, jitter_seconds: float = 0.0,
+                 rate_429: float = 0.0, rate_503: float = 0.0, risks_per_response: int = 3,
+                 filler_words: int = 12, confidence: float = 0.9, seed: int = 0):
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.rate_429 = rate_429
+        self.rate_503 = rate_503
+        self.risks_per_response = risks_per_response
+        self.filler_words = filler_words
+        self.confidence = confidence
+        self.seed = seed
+        self.calls = 0
+        self._attempts: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "MockProvider":
+        """Configured by MOCK_LLM_LATENCY_MS, MOCK_LLM_JITTER_MS, MOCK_LLM_429_RATE, MOCK_LLM_503_RATE,
+        MOCK_LLM_RISKS, MOCK_LLM_FILLER_WORDS, MOCK_LLM_CONFIDENCE and MOCK_LLM_SEED."""
+        env = os.getenv
+        return cls(
+            latency_seconds=float(env("MOCK_LLM_LATENCY_MS", "50")) / 1000,
+            jitter_seconds=float(env("MOCK_LLM_JITTER_MS", "0")) / 1000,
+            rate_429=float(env("MOCK_LLM_429_RATE", "0")),
+            rate_503=float(env("MOCK_LLM_503_RATE", "0")),
+            risks_per_response=int(env("MOCK_LLM_RISKS", "3")),
+            filler_words=int(env("MOCK_LLM_FILLER_WORDS", "12")),
+            confidence=float(env("MOCK_LLM_CONFIDENCE", "0.9")),
+            seed=int(env("MOCK_LLM_SEED", "0")),
+        )
+
+    async def generate(self, model: str, system_prompt: str, user_prompt: str, schema: Dict[str, Any]) -> ProviderResponse:
+        key = hashlib.sha256(json.dumps([self.seed, model, system_prompt, user_prompt]).encode("utf-8")).hexdigest()
+        # Only a prompt that has just failed is remembered (so its retry rolls again), and only the latest few
+        attempt = self._attempts.pop(key, 0)
+        self.calls += 1
+
+        # 1. Latency and injected failures (deterministic per prompt and attempt)
+        chaos = random.Random(f"{key}:{attempt}")
+        await asyncio.sleep(self.latency_seconds + self.jitter_seconds * chaos.random())
+        roll = chaos.random()
+        if roll < self.rate_429 + self.rate_503:
+            self._attempts[key] = attempt + 1
+            if len(self._attempts) > MAX_TRACKED_PROMPTS:
+                del self._attempts[next(iter(self._attempts))] # Oldest first
+            if roll < self.rate_429:
+                raise ProviderError("429 RESOURCE_EXHAUSTED (mock)", status_code=429)
+            raise ProviderError("503 UNAVAILABLE (mock)", status_code=503)
+
+        # 2. A schema-valid answer grounded in the prompt's pages
+        rng = random.Random(key)
+        pages = self._pages(user_prompt)
+        data = self._fill(schema, schema.get("$defs", {}), rng, pages, field="")
+        text = json.dumps(data)
+        return ProviderResponse(
+            text=text,
+            parsed=data,
+            prompt_tokens=estimate_tokens(system_prompt) + estimate_tokens(user_prompt),
+            response_tokens=estimate_tokens(text),
+        )
+
+    @staticmethod
+    def _pages(prompt: str) -> List[Tuple[str, int, str]]:
+        """(document, page number, page text) for every page section in the prompt."""
+        pages = []
+        docs = list(_DOCUMENT.finditer(prompt))
+        for i, doc in enumerate(docs):
+            end = docs[i + 1].start() if i + 1 < len(docs) else len(prompt)
+            body = prompt[doc.end():end].split("[DOCUMENT END", 1)[0]
+            marks = list(_PAGE.finditer(body))
+            for j, mark in enumerate(marks):
+                page_end = marks[j + 1].start() if j + 1 < len(marks) else len(body)
+                text = body[mark.end():page_end].strip()
+                if text:
+                    pages.append((doc.group(1), int(mark.group(1)), text))
+        return pages
+
+    def _filler(self, rng: random.Random) -> str:
+        return " ".join(rng.choice(_WORDS) for _ in range(self.filler_words))
+
+    def _citation(self, rng: random.Random, pages: List[Tuple[str, int, str]]) -> Dict[str, Any]:
+        document, page, text = rng.choice(pages)
+        words = text.split()
+        start = rng.randrange(max(1, len(words) - 12))
+        return {"document_name": document, "page_number": page, "verbatim_quote": " ".join(words[start:start + 12])}
+
+    def _fill(self, schema: Dict[str, Any], defs: Dict[str, Any], rng: random.Random,
+              pages: List[Tuple[str, int, str]], field: str) -> Any:
+        if "$ref" in schema:
+            schema = defs[schema["$ref"].rsplit("/", 1)[-1]]
+        if "anyOf" in schema:
+            schema = next((s for s in schema["anyOf"] if s.get("type") != "null"), schema["anyOf"][0])
+        if "enum" in schema:
+            return rng.choice(schema["enum"])
+
+        kind = schema.get("type")
+        if kind == "object":
+            properties = schema.get("properties", {})
+            if {"document_name", "page_number", "verbatim_quote"} <= set(properties) and pages:
+                return self._citation(rng, pages)
+            return {name: self._fill(sub, defs, rng, pages, name) for name, sub in properties.items()}
+        if kind == "array":
+            items = schema.get("items", {})
+            if field == "evidence":
+                count = 1 if pages else 0
+            elif field == "identified_risks":
+                count = self.risks_per_response if pages else 0
+            else:
+                count = 2
+            return [self._fill(items, defs, rng, pages, field) for _ in range(count)]
+        if kind == "number":
+            return self.confidence if "confidence" in field else round(rng.random(), 2)
+        if kind == "integer":
+            return rng.randint(1, 10)
+        if kind == "boolean":
+            return rng.random() < 0.5
+        # Strings
+        if field == "severity":
+            return rng.choice(["HIGH", "MEDIUM", "LOW"])
+        if field == "category":
+            return rng.choice(["Legal", "Financial", "IP", "HR", "Compliance"])
+        return self._filler(rng)
+
+def provider_from_env() -> LLMProvider:
+    """LLM_PROVIDER selects the backend: gemini (default) or mock."""
+    name = os.getenv("LLM_PROVIDER", "gemini").strip().lower()
+    if name == "mock":
+        return MockProvider.from_env()
+    if name == "gemini":
+        return GeminiProvider()
+    raise ValueError(f"Unknown LLM_PROVIDER '{name}'. Use 'gemini' or 'mock'.")
@@ -0,0 +1,121 @@
+import time
+import asyncio
+import threading
+from typing import Optional
+
+class RateLimiter:
+    """
+    Proactive, shared rate budget for LLM calls.
+
+    - Two token buckets (requests/min and tokens/min). Callers reserve capacity
+      up front and wait exactly as long as the budget requires, instead of
+      firing blindly and sleeping after a 429.
+    - A concurrency cap on in-flight requests.
+    - Adaptive: every 429/503 halves the effective rate and pauses the whole
+      budget briefly; successes creep the rate back up (AIMD).
+
+    One instance is meant to be shared by every client in the process
+    (see `RateLimiter.shared()`), so many shifts draw from one budget.
+    """
+
+    _shared: Optional["RateLimiter"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, requests_per_minute: float = 60, tokens_per_minute: float = 1_000_000,
+                 max_concurrency: int = 8, burst_seconds: float = 10.0,
+                 min_rate_scale: float = 0.1, recovery_step: float = 0.05):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.min_rate_scale = min_rate_scale
+        self.recovery_step = recovery_step
+
+        # Bucket sizes: how much may be spent in a burst
+        self._request_capacity = max(1.0, requests_per_minute * burst_seconds / 60)
+        self._token_capacity = max(1.0, tokens_per_minute * burst_seconds / 60)
+
+        self._lock = threading.Lock()
+        self._requests = self._request_capacity
+        self._tokens = self._token_capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.rate_scale = 1.0 # Fraction of the nominal rate currently allowed
+        self.consecutive_throttles = 0
+        self.throttle_count = 0
+        self.wait_seconds = 0.0 # Total time callers spent waiting on the budget
+
+    @classmethod
+    def shared(cls) -> "RateLimiter":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    # --- BUCKETS ---
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        scale = self.rate_scale / 60.0
+        self._requests = min(self._request_capacity, self._requests + elapsed * self.requests_per_minute * scale)
+        self._tokens = min(self._token_capacity, self._tokens + elapsed * self.tokens_per_minute * scale)
+
+    def reserve(self, tokens: int) -> float:
+        """
+        Debits one request and `tokens` from the budget and returns how many
+        seconds the caller must wait before sending. Balances may go negative:
+        that is the queue of callers already waiting their turn.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._requests -= 1
+            self._tokens -= tokens
+
+            scale = self.rate_scale / 60.0
+            wait_requests = -self._requests / (self.requests_per_minute * scale) if self._requests < 0 else 0.0
+            wait_tokens = -self._tokens / (self.tokens_per_minute * scale) if self._tokens < 0 else 0.0
+            wait = max(wait_requests, wait_tokens, self._paused_until - now, 0.0)
+            self.wait_seconds += wait
+            return wait
+
+    def try_reserve(self, tokens: int) -> bool:
+        """Debits the budget only if it can be spent right now (no queue, no pause). For optional work like hedges."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until or self._requests < 1 or self._tokens < tokens:
+                return False
+            self._requests -= 1
+            self._tokens -= tokens
+            return True
+
+    async def acquire(self, tokens: int) -> float:
+        """Waits for our share of the budget; returns the seconds waited."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def slot(self) -> asyncio.Semaphore:
+        """Concurrency cap. Must be used from the LLM I/O loop (see llm_client)."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    # --- FEEDBACK ---
+    def on_throttle(self, base_pause: float = 5.0, max_pause: float = 60.0) -> float:
+        """Called on 429/503. Halves the rate and pauses the budget; returns the pause length."""
+        with self._lock:
+            self.throttle_count += 1
+            self.consecutive_throttles += 1
+            self.rate_scale = max(self.min_rate_scale, self.rate_scale / 2)
+            pause = min(max_pause, base_pause * (2 ** (self.consecutive_throttles - 1)))
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            return pause
+
+    def on_success(self):
+        with self._lock:
+            self.consecutive_throttles = 0
+            self.rate_scale = min(1.0, self.rate_scale + self.recovery_step)
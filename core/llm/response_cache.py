@@ -0,0 +1,79 @@
+import os
+import json
+import hashlib
+from typing import Any, Dict, Optional
+from core.cache.disk_cache import DiskCache
+
+DEFAULT_CACHE_DIR = os.path.join(".sentinel_cache", "llm")
+DEFAULT_MAX_BYTES = 1024 ** 3 # 1 GB
+
+CACHE_MODES = ("off", "read_write", "replay")
+
+class CacheMissError(RuntimeError):
+    """Raised in replay mode when a request was never recorded."""
+
+class ResponseCache:
+    """
+    Disk-backed cache of structured LLM responses.
+
+    Keyed by model, system prompt, user prompt and a hash of the response
+    schema, so any change to what we ask (or how we want the answer shaped)
+    is a miss. Modes:
+      - off:        always call the model
+      - read_write: serve hits, record misses (resume after a crash for free)
+      - replay:     serve hits, FAIL on a miss; no network, no API key needed
+    """
+
+    def __init__(self, root_dir: str = DEFAULT_CACHE_DIR, mode: str = "read_write", max_bytes: Optional[int] = DEFAULT_MAX_BYTES):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode '{mode}'. Use one of {CACHE_MODES}.")
+        self.mode = mode
+        self.store = DiskCache(root_dir, max_bytes=max_bytes, suffix=".json") if mode != "off" else None
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Configured by LLM_CACHE_MODE (default off), LLM_CACHE_DIR and LLM_CACHE_MAX_MB."""
+        mode = os.getenv("LLM_CACHE_MODE", "off").strip().lower()
+        root_dir = os.getenv("LLM_CACHE_DIR", DEFAULT_CACHE_DIR)
+        max_mb = os.getenv("LLM_CACHE_MAX_MB")
+        max_bytes = int(float(max_mb) * 1024 ** 2) if max_mb else DEFAULT_MAX_BYTES
+        return cls(root_dir, mode=mode, max_bytes=max_bytes)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str, schema: Dict[str, Any]) -> str:
+        schema_hash = hashlib.sha256(json.dumps(schema, sort_keys=True).encode("utf-8")).hexdigest()
+        payload = json.dumps([model, system_prompt, user_prompt, schema_hash])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        data = self.store.get(key)
+        if data is not None:
+            try:
+                entry = json.loads(data)
+                self.hits += 1
+                return entry["response"]
+            except (ValueError, KeyError):
+                pass # Corrupt entry: fall through as a miss
+
+        self.misses += 1
+        if self.replay:
+            raise CacheMissError(f"Replay mode: no recorded response for request {key[:12]}.")
+        return None
+
+    def put(self, key: str, model: str, response: Dict[str, Any]):
+        if self.mode != "read_write":
+            return
+        entry = {"model": model, "response": response}
+        self.store.put(key, json.dumps(entry).encode("utf-8"))
@@ -0,0 +1,16 @@
+import re
+
+# Words, numbers and individual punctuation marks each cost roughly one
+# BPE token; very long words and digit runs split further, which the
+# 4-characters-per-token floor accounts for.
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local, dependency-free token estimate. Deliberately errs on the high side
+    so budgets computed with it don't overflow the real model context.
+    """
+    if not text:
+        return 0
+    pieces = sum(1 for _ in _PIECES.finditer(text))
+    return max(pieces, (len(text) + 3) // 4)
@@ -0,0 +1,57 @@
+from typing import Dict, Iterable, Tuple
+from pydantic import BaseModel, Field
+from core.context.usage import CallUsage
+
+# USD per 1M (input, output) tokens. Published list prices; used for estimates only.
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gemini-3-flash-preview": (0.50, 3.00),
+    "gemini-1.5-pro-002": (1.25, 5.00),
+    "gemini-1.5-flash-002": (0.075, 0.30),
+}
+_FAMILY_PRICES = {"pro": (1.25, 10.00), "flash": (0.30, 2.50)}
+
+def estimate_cost(model: str, prompt_tokens: int, response_tokens: int) -> float:
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        family = "pro" if "pro" in model.lower() else "flash"
+        prices = _FAMILY_PRICES[family]
+    return (prompt_tokens * prices[0] + response_tokens * prices[1]) / 1_000_000
+
+class UsageSummary(BaseModel):
+    """Running totals over many calls (per agent, per engagement)."""
+    calls: int = 0
+    cached_calls: int = 0
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+    retries: int = 0
+    timed_out_attempts: int = 0
+    hedges: int = 0
+    backoff_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    cost_usd: float = 0.0
+    by_model: Dict[str, int] = Field(default_factory=dict) # Calls per model
+
+    def add(self, usage: CallUsage):
+        self.calls += 1
+        self.cached_calls += int(usage.cached)
+        self.prompt_tokens += usage.prompt_tokens
+        self.response_tokens += usage.response_tokens
+        self.retries += usage.retries
+        self.timed_out_attempts += usage.timed_out_attempts
+        self.hedges += usage.hedges
+        self.backoff_seconds += usage.backoff_seconds
+        self.wall_seconds += usage.wall_seconds
+        self.cost_usd += usage.cost_usd
+        self.by_model[usage.model] = self.by_model.get(usage.model, 0) + 1
+
+    def add_all(self, calls: Iterable[CallUsage]):
+        for usage in calls:
+            self.add(usage)
+
+    def summary(self) -> str:
+        return (
+            f"{self.calls} calls ({self.cached_calls} cached) | "
+            f"{self.prompt_tokens:,} in / {self.response_tokens:,} out tokens | "
+            f"{self.retries} retries, {self.timed_out_attempts} timeouts, {self.hedges} hedges, {self.backoff_seconds:.1f}s backoff | "
+            f"{self.wall_seconds:.1f}s wall | ~${self.cost_usd:.4f}"
+        )
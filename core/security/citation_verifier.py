@@ -0,0 +1,174 @@
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from pydantic import BaseModel, Field
+
+# Fuzzy matching is bounded so one pathological quote can't stall a review
+FUZZY_MIN_RATIO = 0.9
+FUZZY_MAX_CANDIDATES = 8
+FUZZY_MAX_QUOTE_CHARS = 400
+MIN_FRAGMENT_CHARS = 8
+
+_QUOTES = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"', "–": "-", "—": "-", "­": ""})
+_HYPHEN_BREAK = re.compile(r"(\w)-\s*\n\s*(\w)")
+_WHITESPACE = re.compile(r"\s+")
+_NON_ALNUM = re.compile(r"[\W_]+")
+_ELLIPSIS = re.compile(r"\.\.\.+|…")
+
+def document_key(name: str) -> str:
+    """Normalizes a filename or a cited document name for comparison."""
+    name = os.path.basename(name.strip()).lower()
+    return name[:-4] if name.endswith(".pdf") else name
+
+def normalize_text(text: str) -> str:
+    """Lowercases, straightens quotes/dashes, re-joins hyphenated line breaks and collapses whitespace."""
+    text = unicodedata.normalize("NFKC", text).translate(_QUOTES)
+    text = _HYPHEN_BREAK.sub(r"\1\2", text)
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+def squash_text(normalized: str) -> str:
+    """Drops everything but letters and digits: immune to whitespace and hyphenation drift."""
+    return _NON_ALNUM.sub("", normalized)
+
+class CitationCheck(BaseModel):
+    document_name: str
+    page_number: int
+    verbatim_quote: str
+    status: str # EXACT | FUZZY | FAILED
+    reason: str = ""
+
+class CitationReport(BaseModel):
+    checks: List[CitationCheck] = Field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def failed(self) -> List[CitationCheck]:
+        return [c for c in self.checks if c.status == "FAILED"]
+
+    @property
+    def all_verified(self) -> bool:
+        return not self.failed
+
+    def summary(self) -> str:
+        exact = sum(1 for c in self.checks if c.status == "EXACT")
+        fuzzy = sum(1 for c in self.checks if c.status == "FUZZY")
+        return f"{len(self.checks)} citations: {exact} exact, {fuzzy} fuzzy, {len(self.failed)} failed ({self.elapsed_ms:.1f}ms)"
+
+class CitationIndex:
+    """
+    Checks that a quoted passage really appears on the cited page.
+
+    Built once at ingestion from the data room's filenames and page counts.
+    Page text is pulled from the page store on demand and its normalized forms
+    are kept in a bounded LRU, so verifying thousands of citations touches
+    each page once while memory stays capped.
+    """
+
+    def __init__(self, get_page: Callable[[int, int], str], filenames: Sequence[str], page_counts: Sequence[int], max_cached_pages: int = 2048):
+        self._get_page = get_page
+        self._page_counts = list(page_counts)
+        self._max_cached_pages = max_cached_pages
+        self._pages: "OrderedDict[Tuple[int, int], Tuple[str, str]]" = OrderedDict()
+
+        self._aliases: Dict[str, int] = {}
+        for doc_index, filename in enumerate(filenames):
+            self._aliases.setdefault(document_key(filename), doc_index)
+
+    def resolve(self, document_name: str) -> Optional[int]:
+        return self._aliases.get(document_key(document_name))
+
+    def _page(self, doc_index: int, page_number: int) -> Tuple[str, str]:
+        key = (doc_index, page_number)
+        cached = self._pages.get(key)
+        if cached is not None:
+            self._pages.move_to_end(key)
+            return cached
+
+        normalized = normalize_text(self._get_page(doc_index, page_number))
+        entry = (normalized, squash_text(normalized))
+        self._pages[key] = entry
+        if len(self._pages) > self._max_cached_pages:
+            self._pages.popitem(last=False)
+        return entry
+
+    def _match_fragment(self, fragment: str, page: Tuple[str, str]) -> Optional[str]:
+        normalized_page, squashed_page = page
+        squashed = squash_text(fragment)
+        if not squashed: # Punctuation only: nothing to find
+            return None
+
+        # 1. Exact (after normalization)
+        if fragment in normalized_page:
+            return "EXACT"
+
+        # 2. Whitespace / hyphenation drift
+        if squashed in squashed_page:
+            return "FUZZY"
+
+        # 3. Bounded fuzzy: align on a few anchors and score a window around each hit
+        quote = squashed[:FUZZY_MAX_QUOTE_CHARS]
+        anchor_len = min(12, len(quote))
+        anchors = {0: quote[:anchor_len], len(quote) // 2: quote[len(quote) // 2:len(quote) // 2 + anchor_len], len(quote) - anchor_len: quote[-anchor_len:]}
+        starts = set()
+        for offset, anchor in anchors.items():
+            pos = squashed_page.find(anchor)
+            while pos != -1 and len(starts) < FUZZY_MAX_CANDIDATES:
+                starts.add(max(0, pos - offset))
+                pos = squashed_page.find(anchor, pos + 1)
+
+        slack = len(quote) // 10 + 1
+        for start in sorted(starts):
+            window = squashed_page[max(0, start - slack):start + len(quote) + slack]
+            matcher = SequenceMatcher(None, quote, window, autojunk=False)
+            # Score against the quote's length: a longer window shouldn't dilute the ratio
+            matched = sum(block.size for block in matcher.get_matching_blocks())
+            if matched / len(quote) >= FUZZY_MIN_RATIO:
+                return "FUZZY"
+        return None
+
+    def verify(self, document_name: str, page_number: int, verbatim_quote: str) -> CitationCheck:
+        def result(status: str, reason: str = "") -> CitationCheck:
+            return CitationCheck(document_name=document_name, page_number=page_number, verbatim_quote=verbatim_quote, status=status, reason=reason)
+
+        doc_index = self.resolve(document_name)
+        if doc_index is None:
+            return result("FAILED", "Unknown document")
+        if not 1 <= page_number <= self._page_counts[doc_index]:
+            return result("FAILED", f"Page {page_number} does not exist")
+
+        page = self._page(doc_index, page_number)
+        # Quotes trimmed with '...' must match fragment by fragment
+        fragments = [f for f in (normalize_text(p) for p in _ELLIPSIS.split(verbatim_quote)) if f]
+        if not any(squash_text(f) for f in fragments):
+            return result("FAILED", "Empty quote")
+        # Short fragments ("a ... e") would match almost any page: only real text counts
+        fragments = [f for f in fragments if len(squash_text(f)) >= MIN_FRAGMENT_CHARS]
+        if not fragments:
+            return result("FAILED", f"Quote too short to verify (under {MIN_FRAGMENT_CHARS} letters/digits)")
+
+        status = "EXACT"
+        for fragment in fragments:
+            match = self._match_fragment(fragment, page)
+            if match is None:
+                return result("FAILED", "Quote not found on cited page")
+            if match == "FUZZY":
+                status = "FUZZY"
+        return result(status)
+
+    def verify_all(self, citations: Iterable[Any]) -> CitationReport:
+        """
+        Verifies a whole shift's citations in one pass. Citations are grouped by
+        page, so each page is loaded and normalized once.
+        """
+        started = time.perf_counter()
+        items = list(citations)
+        order = sorted(range(len(items)), key=lambda i: (items[i].document_name, items[i].page_number))
+        checks: List[Optional[CitationCheck]] = [None] * len(items)
+        for i in order:
+            c = items[i]
+            checks[i] = self.verify(c.document_name, c.page_number, c.verbatim_quote)
+        return CitationReport(checks=checks, elapsed_ms=(time.perf_counter() - started) * 1000)
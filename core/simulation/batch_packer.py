@@ -0,0 +1,76 @@
+from typing import List, NamedTuple, Optional, Sequence
+
+DEFAULT_TOKEN_BUDGET = 50_000
+DOC_OVERHEAD_TOKENS = 30 # [DOCUMENT START/END] markers and the part header
+
+class BatchSegment(NamedTuple):
+    doc_index: int
+    first_page: int # 1-based, inclusive
+    last_page: int # 1-based, inclusive (0 for documents without pages)
+    tokens: int
+
+class Batch(NamedTuple):
+    segments: List[BatchSegment]
+    tokens: int
+
+    @property
+    def doc_indices(self) -> List[int]:
+        return sorted({s.doc_index for s in self.segments})
+
+class BatchPacker:
+    """
+    Turns documents into shift-sized batches under a token budget.
+
+    - Small documents are packed together (in data room order) until the
+      budget is reached, so 3,000 one-page NDAs don't cost 3,000 shifts.
+    - Documents bigger than the budget are split at page boundaries; the
+      last part stays open so the next small documents can share its batch.
+    - A single page larger than the budget becomes a batch on its own.
+    """
+
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET, doc_overhead: int = DOC_OVERHEAD_TOKENS):
+        self.token_budget = token_budget
+        self.doc_overhead = doc_overhead
+
+    def pack(self, page_tokens: Sequence[Sequence[int]], doc_indices: Optional[Sequence[int]] = None) -> List[Batch]:
+        """
+        page_tokens[d] holds the estimated tokens of each page of document d.
+        doc_indices restricts packing to a subset (e.g. only changed documents).
+        """
+        batches: List[Batch] = []
+        current: List[BatchSegment] = []
+        current_tokens = 0
+
+        def flush():
+            nonlocal current, current_tokens
+            if current:
+                batches.append(Batch(current, current_tokens))
+            current, current_tokens = [], 0
+
+        for doc in (doc_indices if doc_indices is not None else range(len(page_tokens))):
+            pages = page_tokens[doc]
+            doc_tokens = sum(pages) + self.doc_overhead
+
+            # 1. Fits in one batch: pack it
+            if doc_tokens <= self.token_budget:
+                if current_tokens + doc_tokens > self.token_budget:
+                    flush()
+                current.append(BatchSegment(doc, 1 if pages else 0, len(pages), doc_tokens))
+                current_tokens += doc_tokens
+                continue
+
+            # 2. Oversized: cut at page boundaries
+            flush()
+            first, part_tokens = 1, self.doc_overhead
+            for page_num, tokens in enumerate(pages, 1):
+                if page_num > first and part_tokens + tokens > self.token_budget:
+                    current.append(BatchSegment(doc, first, page_num - 1, part_tokens))
+                    current_tokens = part_tokens
+                    flush()
+                    first, part_tokens = page_num, self.doc_overhead
+                part_tokens += tokens
+            current.append(BatchSegment(doc, first, len(pages), part_tokens))
+            current_tokens = part_tokens
+
+        flush()
+        return batches
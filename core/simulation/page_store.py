@@ -0,0 +1,119 @@
+import os
+import mmap
+import weakref
+import tempfile
+from array import array
+from collections.abc import Mapping
+from typing import Iterator, List, Optional
+
+def _cleanup(file_obj, path: Optional[str]):
+    file_obj.close()
+    if path and os.path.exists(path):
+        os.remove(path)
+
+class PageStore(Mapping):
+    """
+    Rendered data room documents, kept in ONE append-only file on disk and read
+    back through a memory map.
+
+    Only an offset index lives in RAM (a few integers per page), so resident
+    memory stays flat no matter how big the data room is. A document or a single
+    page is decoded into a Python string only when someone asks for it.
+
+    Behaves like the old `{doc_index: text}` dict, so `store[i]`, `len(store)`
+    and `i in store` keep working.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        owns_file = path is None
+        if owns_file:
+            fd, path = tempfile.mkstemp(prefix="sentinel_pages_", suffix=".bin")
+            os.close(fd)
+        self.path = path
+        self._file = open(path, "w+b")
+        self._mmap: Optional[mmap.mmap] = None
+        self._size = 0
+
+        # Offset index. Document d spans bytes [_doc_spans[2d], _doc_spans[2d+1]).
+        # Its pages are _page_spans[_page_index[d] : _page_index[d+1]] (start/end pairs).
+        self._filenames: List[str] = []
+        self._doc_spans = array("q")
+        self._page_index = array("q", [0])
+        self._page_spans = array("q")
+
+        # Temp stores are deleted when the object goes away
+        self._finalizer = weakref.finalize(self, _cleanup, self._file, path if owns_file else None)
+
+    # --- WRITING ---
+    def _write(self, text: str) -> int:
+        data = text.encode("utf-8")
+        self._file.write(data)
+        self._size += len(data)
+        return self._size
+
+    def append(self, filename: str, header: str, pages: List[str], footer: str = "") -> int:
+        """
+        Appends one rendered document (header, page segments, footer) and
+        returns its index. Page segments are stored contiguously, so the
+        whole document is still one slice of the file.
+        """
+        doc_start = self._size
+        self._write(header)
+        for segment in pages:
+            page_start = self._size
+            page_end = self._write(segment)
+            self._page_spans.append(page_start)
+            self._page_spans.append(page_end)
+        self._write(footer)
+
+        self._filenames.append(filename)
+        self._doc_spans.append(doc_start)
+        self._doc_spans.append(self._size)
+        self._page_index.append(len(self._page_spans) // 2)
+        return len(self._filenames) - 1
+
+    # --- READING ---
+    def _slice(self, start: int, end: int) -> str:
+        if end <= start:
+            return ""
+        if self._mmap is None or len(self._mmap) < end:
+            # (Re)map after new writes; the old view may be too short
+            self._file.flush()
+            if self._mmap is not None:
+                self._mmap.close()
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap[start:end].decode("utf-8")
+
+    def __getitem__(self, doc_index: int) -> str:
+        if not isinstance(doc_index, int) or not 0 <= doc_index < len(self._filenames):
+            raise KeyError(doc_index)
+        return self._slice(self._doc_spans[2 * doc_index], self._doc_spans[2 * doc_index + 1])
+
+    def __contains__(self, doc_index) -> bool:
+        # Overridden so membership checks never materialize the document
+        return isinstance(doc_index, int) and 0 <= doc_index < len(self._filenames)
+
+    def __len__(self) -> int:
+        return len(self._filenames)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self._filenames)))
+
+    def filename(self, doc_index: int) -> str:
+        return self._filenames[doc_index]
+
+    def page_count(self, doc_index: int) -> int:
+        return self._page_index[doc_index + 1] - self._page_index[doc_index]
+
+    def get_page(self, doc_index: int, page_number: int) -> str:
+        """Returns the rendered segment of one page (1-based, like the '--- Page N ---' markers)."""
+        if doc_index not in self or not 1 <= page_number <= self.page_count(doc_index):
+            raise KeyError((doc_index, page_number))
+        slot = self._page_index[doc_index] + page_number - 1
+        return self._slice(self._page_spans[2 * slot], self._page_spans[2 * slot + 1])
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._finalizer()
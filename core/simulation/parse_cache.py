@@ -0,0 +1,158 @@
+import os
+import sys
+import gzip
+import json
+import hashlib
+import argparse
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from core.cache.disk_cache import DiskCache
+
+DEFAULT_CACHE_DIR = os.path.join(".sentinel_cache", "parse")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3 # 2 GB
+
+def file_digest(filepath: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of the file's bytes, streamed so 500 MB scans don't sit in RAM."""
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class ParseCache:
+    """
+    Persistent cache of parsed PDF pages, keyed by the PDF's content hash plus
+    the extractor settings. Changing either the file or the extractor means a miss.
+
+    A small fingerprint file remembers (size, mtime) -> content hash, so a warm
+    restart over an unchanged data room doesn't even re-hash the PDFs.
+    """
+
+    def __init__(self, root_dir: str = DEFAULT_CACHE_DIR, max_bytes: Optional[int] = DEFAULT_MAX_BYTES):
+        self.root_dir = root_dir
+        self.store = DiskCache(root_dir, max_bytes=max_bytes, suffix=".json.gz")
+        self.fingerprint_file = os.path.join(root_dir, "fingerprints.json")
+        self._fingerprints: Dict[str, list] = self._load_fingerprints()
+        self._fingerprints_dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    # --- CONTENT HASHING ---
+    def _load_fingerprints(self) -> Dict[str, list]:
+        if os.path.exists(self.fingerprint_file):
+            try:
+                with open(self.fingerprint_file, "r") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
+
+    def content_hash(self, filepath: str) -> str:
+        st = os.stat(filepath)
+        path = os.path.abspath(filepath)
+        known = self._fingerprints.get(path)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            return known[2]
+
+        digest = file_digest(filepath)
+        self._fingerprints[path] = [st.st_size, st.st_mtime_ns, digest]
+        self._fingerprints_dirty = True
+        return digest
+
+    def save(self):
+        """Persists the fingerprint table. Call once after a load pass."""
+        if not self._fingerprints_dirty:
+            return
+        tmp_path = self.fingerprint_file + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._fingerprints, f)
+        os.replace(tmp_path, self.fingerprint_file)
+        self._fingerprints_dirty = False
+
+    @staticmethod
+    def make_key(content_hash: str, settings: Dict[str, Any]) -> str:
+        payload = content_hash + json.dumps(settings, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # --- LOOKUP / STORE ---
+    def has(self, content_hash: str, settings: Dict[str, Any]) -> bool:
+        """Cheap existence probe (no read). A False answer counts as a miss."""
+        found = self.store.contains(self.make_key(content_hash, settings))
+        if not found:
+            self.misses += 1
+        return found
+
+    def get(self, content_hash: str, settings: Dict[str, Any]) -> Optional[List[Tuple[str, str]]]:
+        """Returns the cached [(text, table_text), ...] pages, or None on a miss."""
+        data = self.store.get(self.make_key(content_hash, settings))
+        if data is None:
+            self.misses += 1
+            return None
+        try:
+            entry = json.loads(gzip.decompress(data))
+        except (OSError, ValueError):
+            # Corrupt entry: treat as a miss, it will be overwritten
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [(text, tables) for text, tables in entry["pages"]]
+
+    def put(self, content_hash: str, settings: Dict[str, Any], filename: str, pages: List[Tuple[str, str]]):
+        entry = {
+            "filename": filename,
+            "content_hash": content_hash,
+            "settings": settings,
+            "created_at": datetime.now().isoformat(),
+            "pages": [list(p) for p in pages],
+        }
+        data = gzip.compress(json.dumps(entry).encode("utf-8"), compresslevel=5)
+        self.store.put(self.make_key(content_hash, settings), data)
+
+    # --- MAINTENANCE ---
+    def stats(self) -> Dict[str, Any]:
+        stats = self.store.stats()
+        stats["session_hits"] = self.hits
+        stats["session_misses"] = self.misses
+        return stats
+
+    def prune(self, max_bytes: Optional[int] = None, max_age_days: Optional[float] = None) -> int:
+        max_age = max_age_days * 86400 if max_age_days is not None else None
+        return self.store.prune(max_bytes=max_bytes, max_age_seconds=max_age)
+
+    def clear(self):
+        self.store.clear()
+        self._fingerprints = {}
+        self._fingerprints_dirty = True
+        self.save()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and prune the SENTINEL PDF parse cache.")
+    parser.add_argument("--root", default=DEFAULT_CACHE_DIR, help="Cache directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Show entry count and disk usage")
+    prune = sub.add_parser("prune", help="Evict least recently used entries")
+    prune.add_argument("--max-mb", type=float, default=None, help="Shrink the cache to this size")
+    prune.add_argument("--max-age-days", type=float, default=None, help="Drop entries unused for this long")
+    sub.add_parser("clear", help="Delete every entry")
+    args = parser.parse_args(argv)
+
+    cache = ParseCache(args.root, max_bytes=None)
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"📦 Parse cache: {args.root}")
+        print(f"   Entries: {stats['entries']}")
+        print(f"   Size:    {stats['total_bytes'] / 1024 ** 2:.1f} MB")
+        if stats["newest_use"]:
+            print(f"   Last used: {datetime.fromtimestamp(stats['newest_use']).isoformat(timespec='seconds')}")
+    elif args.command == "prune":
+        max_bytes = int(args.max_mb * 1024 ** 2) if args.max_mb is not None else None
+        removed = cache.prune(max_bytes=max_bytes, max_age_days=args.max_age_days)
+        print(f"🧹 Pruned {removed} entries.")
+    elif args.command == "clear":
+        cache.clear()
+        print("🧹 Parse cache cleared.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,35 +1,142 @@
 import os
 import glob
+import time
+from array import array
+from collections import Counter, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import pdfplumber # <--- THE UPGRADE
+from core.simulation.parse_cache import ParseCache, file_digest
+from core.simulation.page_store import PageStore
+from core.simulation.batch_packer import Batch, BatchPacker, DEFAULT_TOKEN_BUDGET
+from core.llm.token_estimator import estimate_tokens
+from core.security.citation_verifier import CitationIndex
+
+# Large PDFs are split into page ranges of this size so one 400-page
+# credit agreement doesn't pin a single core while the others sit idle.
+DEFAULT_PAGES_PER_TASK = 25
+
+# Part of the parse cache key: bump when the extraction logic changes output.
+EXTRACTOR_SETTINGS = {
+    "engine": "pdfplumber",
+    "engine_version": pdfplumber.__version__,
+    "tables": True,
+    "table_pass": "ruled_pages_only",
+}
+
+
+def _windowed(pool: Executor, fn: Callable[..., Any], calls: Iterable[tuple], window: int) -> Iterator[Future]:
+    """Submits fn(*args) per call with at most `window` outstanding; yields the futures in submission order."""
+    queue: deque = deque()
+    for args in calls:
+        queue.append(pool.submit(fn, *args))
+        if len(queue) >= window:
+            yield queue.popleft() # The next call is submitted once the caller comes back for more
+    while queue:
+        yield queue.popleft()
+
+
+def _count_pages(filepath: str) -> int:
+    """Worker entry point: returns the page count of a PDF."""
+    with pdfplumber.open(filepath) as pdf:
+        return len(pdf.pages)
+
+
+def _classify_page(page) -> str:
+    """
+    Cheap first pass: is this page worth the expensive table finder?
+
+    pdfplumber's default table settings find cells from ruling lines only
+    (lines, rect borders, curves). A page without at least two horizontal and
+    two vertical edges cannot yield a table, so skipping extract_tables() on
+    it loses nothing.
+    """
+    if not (page.lines or page.rects or page.curves):
+        return "plain"
+    if len(page.horizontal_edges) >= 2 and len(page.vertical_edges) >= 2:
+        return "tabular"
+    return "plain"
+
+
+def _parse_page_range(filepath: str, start: int = 0, end: Optional[int] = None) -> Tuple[List[Tuple[str, str]], float, Dict[str, int]]:
+    """
+    Worker entry point: parses pages [start, end) of one PDF.
+    Returns a list of (text, table_text) per page, the seconds spent and the
+    per-tier page counters. Must stay a module-level function so the process
+    pool can pickle it.
+    """
+    started = time.perf_counter()
+    pages = []
+    stats = Counter()
+    with pdfplumber.open(filepath) as pdf:
+        for page in pdf.pages[start:end]:
+            # 1. Extract Standard Text
+            text = page.extract_text() or ""
+
+            # 2. Extract Tables (only on pages with ruling lines)
+            table_text = ""
+            tier = _classify_page(page)
+            stats[f"pages_{tier}"] += 1
+            if tier == "tabular":
+                tables = page.extract_tables()
+                stats["tables_found"] += len(tables)
+                if tables:
+                    table_text = "".join(["\n[DETECTED TABLES]:\n"] + [RealDataRoom._table_to_markdown(t) for t in tables])
+
+            pages.append((text, table_text))
+            page.close()
+    return pages, time.perf_counter() - started, dict(stats)
+
 
 class RealDataRoom:
-    def __init__(self, folder_path="client_data_room"):
+    def __init__(self, folder_path="client_data_room", workers: Optional[int] = None, pages_per_task: int = DEFAULT_PAGES_PER_TASK, cache: Optional[ParseCache] = None, page_store_path: Optional[str] = None, token_budget: int = DEFAULT_TOKEN_BUDGET):
+        """
+        workers: Size of the ingestion process pool. None = all cores, 1 = parse in-process.
+        cache: Optional on-disk parse cache. Unchanged PDFs are loaded from it instead of re-parsed.
+        page_store_path: Backing file for the page store (defaults to a temp file removed on exit).
+        token_budget: Max estimated tokens of document text per shift (see BatchPacker).
+        """
         self.folder_path = folder_path
-        self.documents = {}
+        self.workers = workers or os.cpu_count() or 1
+        self.pages_per_task = max(1, pages_per_task)
+        self.cache = cache
+        self.documents = PageStore(page_store_path) # Lazy {doc_index: text} view over a memory-mapped file
+        self.doc_hashes: Dict[int, str] = {} # doc index -> SHA-256 of the PDF bytes
+        self.load_timings: Dict[str, float] = {} # filename -> parse seconds (summed across page ranges)
+        self.page_tokens: List[array] = [] # doc index -> estimated tokens per page
+        self.failed_docs = set() # doc indices that could not be read
+        self.extraction_stats = Counter() # pages_plain / pages_tabular / tables_found / pages_cached
+        self.packer = BatchPacker(token_budget)
         self._load_documents()
+        self.batches: List[Batch] = self.packer.pack(self.page_tokens)
+        self.citation_index = CitationIndex(
+            self.get_page,
+            [self.documents.filename(i) for i in range(len(self.documents))],
+            [len(tokens) for tokens in self.page_tokens]
+        )
 
-    def _table_to_markdown(self, table):
+    @staticmethod
+    def _table_to_markdown(table):
         """
         Converts a list of lists (from pdfplumber) into a Markdown table string.
         """
         if not table or len(table) < 2:
             return ""
-        
+
         # Filter out None values
         cleaned_table = [[str(cell) if cell is not None else "" for cell in row] for row in table]
-        
+
         try:
-            # Header
-            md = "\n\n| " + " | ".join(cleaned_table[0]) + " |\n"
-            # Separator
-            md += "| " + " | ".join(["---"] * len(cleaned_table[0])) + " |\n"
-            # Rows
-            for row in cleaned_table[1:]:
-                md += "| " + " | ".join(row) + " |\n"
-            return md + "\n"
+            # Header, separator, then rows; joined once instead of grown cell by cell
+            lines = ["| " + " | ".join(cleaned_table[0]) + " |", "| " + " | ".join(["---"] * len(cleaned_table[0])) + " |"]
+            lines.extend("| " + " | ".join(row) + " |" for row in cleaned_table[1:])
+            return "\n\n" + "\n".join(lines) + "\n\n"
         except Exception:
             return ""
 
+    def _render_pages(self, pages: List[Tuple[str, str]]) -> List[str]:
+        return [f"\n--- Page {page_num + 1} ---\n{text}\n{table_text}" for page_num, (text, table_text) in enumerate(pages)]
+
     def _load_documents(self):
         if not os.path.exists(self.folder_path):
             os.makedirs(self.folder_path)
@@ -39,42 +146,161 @@ class RealDataRoom:
         files = glob.glob(os.path.join(self.folder_path, "*.pdf"))
         files.sort()
 
-        print(f"📂 Loading {len(files)} documents using pdfplumber (Table Extraction Enabled)...")
+        mode = f"{self.workers} worker processes" if self.workers > 1 and len(files) > 0 else "in-process"
+        print(f"📂 Loading {len(files)} documents using pdfplumber (Table Extraction Enabled, {mode})...")
+
+        started = time.perf_counter()
+        errors: Dict[int, Exception] = {}
+
+        # 1. Hash every file and find out what the parse cache already has
+        pending = []
+        for i, filepath in enumerate(files):
+            try:
+                self.doc_hashes[i] = self.cache.content_hash(filepath) if self.cache else file_digest(filepath)
+            except OSError as e:
+                errors[i] = e
+                continue
+            if not (self.cache and self.cache.has(self.doc_hashes[i], EXTRACTOR_SETTINGS)):
+                pending.append(i)
+
+        # 2. Stream results in file order into the page store. Each document is
+        #    written and dropped before the next one is touched, so only the
+        #    offset index stays in memory.
+        pending_files = [files[i] for i in pending]
+        if self.workers > 1 and pending_files:
+            parsed = self._parse_parallel(pending_files)
+        else:
+            parsed = self._parse_serial(pending_files)
+        parsed_set = set(pending)
 
         for i, filepath in enumerate(files):
             filename = os.path.basename(filepath)
-            text_content = f"[DOCUMENT START: {filename}]\n"
-            
+            pages, seconds, error = [], 0.0, errors.get(i)
+
+            if error is None and i in parsed_set:
+                pages, seconds, error = next(parsed)
+                if self.cache and error is None:
+                    self.cache.put(self.doc_hashes[i], EXTRACTOR_SETTINGS, filename, pages)
+                source = "Parsed"
+            elif error is None:
+                pages = self.cache.get(self.doc_hashes[i], EXTRACTOR_SETTINGS)
+                if pages is None:
+                    # Evicted or corrupt since we checked: parse it here
+                    pages, seconds, error = next(self._parse_serial([filepath]))
+                else:
+                    self.extraction_stats["pages_cached"] += len(pages)
+                source = "Cached"
+            self.load_timings[filename] = seconds
+
+            if error is None:
+                rendered = self._render_pages(pages)
+                self.page_tokens.append(array("l", (estimate_tokens(p) for p in rendered)))
+                self.documents.append(
+                    filename,
+                    f"[DOCUMENT START: {filename}]\n",
+                    rendered,
+                    f"\n[DOCUMENT END: {filename}]"
+                )
+                print(f"   ✅ Loaded & {source}: {filename} ({len(pages)} pages, {seconds:.2f}s)")
+            else:
+                print(f"   ❌ Failed to load {filename}: {error}")
+                self.failed_docs.add(i)
+                self.page_tokens.append(array("l"))
+                self.documents.append(filename, f"[ERROR READING {filename}]", [])
+
+        if self.cache:
+            self.cache.save()
+            print(f"   📦 Parse cache: {len(files) - len(pending) - len(errors)} hits, {len(pending)} parsed")
+        if files:
+            st = self.extraction_stats
+            print(f"   🗂️ Pages: {st['pages_plain']} plain (fast path), {st['pages_tabular']} tabular "
+                  f"({st['tables_found']} tables), {st['pages_cached']} from cache")
+            print(f"   ⏱️ Ingestion finished in {time.perf_counter() - started:.2f}s")
+
+    def _parse_serial(self, files: List[str]) -> Iterator[Tuple[List[Tuple[str, str]], float, Optional[Exception]]]:
+        for filepath in files:
             try:
-                with pdfplumber.open(filepath) as pdf:
-                    for page_num, page in enumerate(pdf.pages):
-                        # 1. Extract Standard Text
-                        text = page.extract_text() or ""
-                        
-                        # 2. Extract Tables
-                        tables = page.extract_tables()
-                        table_text = ""
-                        if tables:
-                            table_text = "\n[DETECTED TABLES]:\n"
-                            for table in tables:
-                                table_text += self._table_to_markdown(table)
-                        
-                        # Combine
-                        text_content += f"\n--- Page {page_num + 1} ---\n{text}\n{table_text}"
-                
-                text_content += f"\n[DOCUMENT END: {filename}]"
-                self.documents[i] = text_content
-                print(f"   ✅ Loaded & Parsed: {filename}")
-                
+                pages, seconds, stats = _parse_page_range(filepath)
+                self.extraction_stats.update(stats)
+                yield pages, seconds, None
             except Exception as e:
-                print(f"   ❌ Failed to load {filename}: {e}")
-                self.documents[i] = f"[ERROR READING {filename}]"
+                yield [], 0.0, e
+
+    def _parse_parallel(self, files: List[str]) -> Iterator[Tuple[List[Tuple[str, str]], float, Optional[Exception]]]:
+        """
+        Fans documents out across a process pool. Big documents are split into
+        page ranges so their pages are parsed on several cores at once.
+        Yields one result per file, in input order.
+        """
+        errors: Dict[int, Exception] = {}
+        window = 2 * self.workers # Tasks submitted ahead of the one being read: keeps the pool busy, not the whole room queued
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            # 1. Size every document so we can cut it into page ranges
+            page_counts = []
+            for i, future in enumerate(_windowed(pool, _count_pages, ((fp,) for fp in files), window)):
+                try:
+                    page_counts.append(future.result())
+                except Exception as e:
+                    errors[i] = e
+                    page_counts.append(0)
+
+            # 2. One task per page range, submitted as earlier results are consumed
+            ranges = lambda i: range(0, page_counts[i], self.pages_per_task)
+            chunks = _windowed(pool, _parse_page_range, (
+                (filepath, start, min(start + self.pages_per_task, page_counts[i]))
+                for i, filepath in enumerate(files) if i not in errors for start in ranges(i)
+            ), window)
+
+            # 3. Reassemble ranges in page order
+            for i in range(len(files)):
+                if i in errors:
+                    yield [], 0.0, errors[i]
+                    continue
+                pages, seconds, error = [], 0.0, None
+                for _ in ranges(i):
+                    future = next(chunks)
+                    if error is not None:
+                        continue # Skip the rest of a failed document's ranges
+                    try:
+                        chunk_pages, chunk_seconds, chunk_stats = future.result()
+                        self.extraction_stats.update(chunk_stats)
+                        pages.extend(chunk_pages)
+                        seconds += chunk_seconds
+                    except Exception as e:
+                        error = e
+                yield (pages, seconds, None) if error is None else ([], seconds, error)
+
+    def plan_batches(self, doc_indices: Optional[List[int]] = None):
+        """Re-packs the shift batches, optionally for a subset of documents only."""
+        self.batches = self.packer.pack(self.page_tokens, doc_indices)
+
+    def _render_segment(self, doc_index: int, first_page: int, last_page: int) -> str:
+        page_count = self.documents.page_count(doc_index)
+        if first_page <= 1 and last_page >= page_count:
+            return self.documents[doc_index]
+
+        # Part of a split document. Page markers keep their original numbers
+        # so citations still point at the right page.
+        filename = self.documents.filename(doc_index)
+        parts = [f"[DOCUMENT START: {filename}]\n[PART: Pages {first_page}-{last_page} of {page_count}]\n"]
+        parts.extend(self.documents.get_page(doc_index, n) for n in range(first_page, last_page + 1))
+        parts.append(f"\n[DOCUMENT END: {filename}]")
+        return "".join(parts)
 
     def get_batch_for_shift(self, shift_index: int) -> str:
-        if shift_index in self.documents:
-            return self.documents[shift_index]
+        if 0 <= shift_index < len(self.batches):
+            batch = self.batches[shift_index]
+            return "\n\n".join(self._render_segment(s.doc_index, s.first_page, s.last_page) for s in batch.segments)
         else:
             return "NO NEW DOCUMENTS. Review the Cumulative Risk Register and finalize the report."
-    
+
+    def get_page(self, doc_index: int, page_number: int) -> str:
+        """Materializes a single page (1-based) without loading the rest of the document."""
+        return self.documents.get_page(doc_index, page_number)
+
     def get_total_docs(self) -> int:
-        return len(self.documents)
\ No newline at end of file
+        return len(self.documents)
+
+    def get_total_batches(self) -> int:
+        return len(self.batches)
@@ -1,51 +1,52 @@
 import streamlit as st
 import json
-import glob
 import pandas as pd
-import os
 from datetime import datetime
+from core.audit.persistence import StateManager
 
 st.set_page_config(page_title="GAP Due Diligence", layout="wide")
 
 st.title("⚖️ GAP: Autonomous Due Diligence Engine")
 
+state = StateManager("storage")
+
 # --- SIDEBAR ---
 st.sidebar.header("System Status")
-if os.path.exists("storage/audit_log.jsonl"):
-    with open("storage/audit_log.jsonl", "r") as f:
-        logs = [json.loads(line) for line in f]
-    st.sidebar.success(f"System Online. Events: {len(logs)}")
-    st.sidebar.text(f"Last Update: {logs[-1]['timestamp'].split('T')[1][:8]}")
-
-# --- METRICS ---
-context_files = glob.glob("storage/contexts/*.json")
-context_files.sort()
+event_count = state.audit_count()
+if event_count:
+    last_event = state.audit_tail(1)[0]
+    st.sidebar.success(f"System Online. Events: {event_count}")
+    st.sidebar.text(f"Last Update: {last_event['timestamp'].split('T')[1][:8]}")
 
-total_risks = 0
-high_risks = 0
+    # Audit trail: seeks straight to the matching time range (sparse index / SQL index)
+    with st.sidebar.expander("🔍 Audit Trail"):
+        source = st.text_input("Source (e.g. Agent_2)")
+        day = last_event['timestamp'].split('T')[0]
+        window = st.text_input("Time range (HH:MM-HH:MM)", "00:00-23:59")
+        start, _, end = window.partition("-")
+        events = state.audit_query(source=source or None, start=f"{day}T{start.strip()}", end=f"{day}T{end.strip()}:59.999999", limit=200)
+        st.caption(f"{len(events)} events" + (" (first 200)" if len(events) == 200 else ""))
+        for e in events:
+            st.text(f"{e['timestamp'].split('T')[1][:8]} {e['source']} {e['event']}")
 
-# Pre-calculate totals
-for fpath in context_files:
-    with open(fpath, "r") as f:
-        data = json.load(f)
-        risks = data['task_state'].get('identified_risks', [])
-        total_risks = max(total_risks, len(risks)) # Assuming cumulative
-        high_risks = max(high_risks, len([r for r in risks if r['severity'] == 'HIGH']))
+# --- METRICS ---
+# One row per shift; full contexts are only rebuilt for the shift being viewed
+shifts = state.shift_summaries()
+severity_counts = state.count_by_severity()
 
 col1, col2, col3 = st.columns(3)
-col1.metric("Total Risks Identified", total_risks)
-col2.metric("High Severity Risks", high_risks)
-col3.metric("Active Agents", "2")
+col1.metric("Total Risks Identified", sum(severity_counts.values()))
+col2.metric("High Severity Risks", severity_counts.get("HIGH", 0))
+col3.metric("Active Agents", len(state.active_agents()))
 
 # --- SHIFT VIEWER ---
 st.divider()
 st.header("🧬 Chain of Custody & Findings")
 
-if context_files:
-    selected_shift_index = st.slider("Select Shift Cycle", 0, len(context_files)-1, len(context_files)-1)
+if shifts:
+    selected_shift_index = st.slider("Select Shift Cycle", 0, len(shifts)-1, len(shifts)-1)
     
-    with open(context_files[selected_shift_index], "r") as f:
-        ctx = json.load(f)
+    ctx = json.loads(state.load_context(shifts[selected_shift_index]['name']).model_dump_json())
     
     # Header Info
     c1, c2, c3 = st.columns([1, 1, 2])
@@ -70,5 +71,24 @@ if context_files:
     else:
         st.success("No Risks Identified in this shift.")
 
+    # --- REGISTER SEARCH ---
+    st.divider()
+    st.header("🔎 Search the Risk Register")
+    f1, f2, f3, f4 = st.columns(4)
+    severity = f1.selectbox("Severity", ["Any"] + sorted(severity_counts))
+    category = f2.text_input("Category")
+    document = f3.text_input("Document")
+    agent = f4.selectbox("Agent", ["Any"] + sorted({s['agent_id'] for s in shifts}))
+    found = state.find_findings(
+        severity=None if severity == "Any" else severity, category=category or None,
+        document=document or None, agent=None if agent == "Any" else agent)
+    st.caption(f"{len(found)} findings")
+    for r in found:
+        with st.expander(f"{r.severity} | {r.category}: {r.description[:50]}..."):
+            st.markdown(f"**Description:** {r.description}")
+            for ev in r.evidence:
+                st.markdown(f"> *\"{ev.verbatim_quote}\"*")
+                st.caption(f"Source: {ev.document_name} (Page {ev.page_number})")
+
 else:
     st.warning("No data found. Run main.py first.")
\ No newline at end of file
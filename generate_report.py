@@ -1,27 +1,22 @@
-import json
-import glob
 import os
 from datetime import datetime
+from core.audit.persistence import StateManager
 
 # --- CONFIGURATION ---
 TARGET_NAME = "LogiFlow Technologies"  # <--- CHANGE THIS FOR EACH CLIENT
 # ---------------------
 
 def generate_final_report():
-    # 1. Find the latest context file (The Final State)
-    files = glob.glob("storage/contexts/*.json")
-    files.sort()
+    # 1. Find the saved shifts (the last one is The Final State)
+    state = StateManager("storage")
+    files = state.context_names()
     
     if not files:
         print("❌ No data found.")
         return
 
-    last_file = files[-1]
-    with open(last_file, "r") as f:
-        data = json.load(f)
-
-    # 2. Extract the Master Register
-    master_register = data.get("cumulative_risk_register", [])
+    # 2. Extract the Master Register (the latest one)
+    master_register = [r.model_dump() for r in state.find_findings()]
     
     if not master_register:
         print("❌ No risks found in the Master Register.")
@@ -45,9 +40,9 @@ The following report details specific findings with citations to the source docu
 """
     
     # Group by Severity
-    high_risks = [r for r in master_register if r['severity'] == 'HIGH']
-    med_risks = [r for r in master_register if r['severity'] == 'MEDIUM']
-    low_risks = [r for r in master_register if r['severity'] == 'LOW']
+    high_risks = [r.model_dump() for r in state.find_findings(severity='HIGH')]
+    med_risks = [r.model_dump() for r in state.find_findings(severity='MEDIUM')]
+    low_risks = [r.model_dump() for r in state.find_findings(severity='LOW')]
 
     def add_section(title, risks, icon):
         section = f"### {icon} {title} ({len(risks)})\n"
@@ -1,17 +1,23 @@
 from core.intent.intent_schema import IntentPackage
 from orchestrator.shift_scheduler import ShiftScheduler
+from core.llm.response_cache import ResponseCache
+from orchestrator.engagement_runtime import EngagementRuntime, load_engagements
+import argparse
 import os
 import shutil
 
-def main():
-    # 1. Clean Start
-    if os.path.exists("storage"):
-        shutil.rmtree("storage")
-        print("🧹 Storage wiped for Blind Test.")
+def prepare_storage(root: str, incremental: bool, resume: bool):
+    """Clean Start, unless we're syncing or resuming an existing engagement."""
+    if resume and os.path.exists(os.path.join(root, "checkpoint.json")):
+        print(f"⏯️  Resume mode: keeping {root}.")
+    elif incremental:
+        print(f"🔄 Incremental mode: keeping {root}.")
+    elif os.path.exists(root):
+        shutil.rmtree(root)
+        print(f"🧹 {root} wiped for Blind Test.")
 
-    print("🔌 SYSTEM ONLINE. MODE: BLIND FORENSIC AUDIT")
-    
-    # 2. Define a GENERIC Intent (Simulating a lazy client)
+def default_intent() -> IntentPackage:
+    """The mission of a single-engagement run: a GENERIC one, simulating a lazy client."""
     intent = IntentPackage(
         original_prompt="Perform a full Due Diligence review on LogiFlow Technologies.",
         constraints=[
@@ -26,9 +32,58 @@ def main():
         success_definition="A comprehensive Risk Register covering all standard M&A risk categories."
     )
     intent.sign()
+    return intent
+
+def run_engagements(args):
+    """Many deals in one process, sharing the worker pool and the LLM budget."""
+    engagements = load_engagements(args.engagements)
+    for engagement in engagements:
+        engagement.map_reduce = engagement.map_reduce or args.map_reduce
+        prepare_storage(engagement.storage, args.incremental, args.resume)
+
+    runtime = EngagementRuntime(engagements, workers=args.workers, incremental=args.incremental, resume=args.resume)
+    runtime.run()
+    runtime.print_final_stats()
+    for run in runtime.runs:
+        run.scheduler.state_manager.export_contexts(latest_only=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="SENTINEL forensic due diligence engine")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep storage/ and only analyze documents added or changed since the last run")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Shifts in flight at once (paced by the shared rate limiter instead of a cooldown)")
+    parser.add_argument("--agents", type=int, default=None,
+                        help="Executor agents pulling batches (default: enough for --concurrency, at least 2)")
+    parser.add_argument("--map-reduce", action="store_true",
+                        help="Analyze batches independently in parallel, then consolidate the findings")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run from its last checkpoint in storage/")
+    parser.add_argument("--engagements", metavar="JSON",
+                        help="Run every engagement listed in this file in one process (see engagements.example.json)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="With --engagements: shifts in flight across all engagements")
+    args = parser.parse_args()
+
+    if args.engagements:
+        return run_engagements(args)
+
+    # 1. Clean Start (unless we're syncing or resuming an existing engagement)
+    prepare_storage("storage", args.incremental, args.resume)
+
+    print("🔌 SYSTEM ONLINE. MODE: BLIND FORENSIC AUDIT")
+    
+    # 2. Define a GENERIC Intent (Simulating a lazy client)
+    intent = default_intent()
 
     # 3. Initialize Scheduler
-    scheduler = ShiftScheduler(intent)
+    # Replayed runs (LLM_CACHE_MODE=replay) never hit the API, so skip the cooldown
+    replay = ResponseCache.from_env().replay
+    if replay:
+        print("📼 LLM replay mode: answers come from the response cache only.")
+    scheduler = ShiftScheduler(intent, incremental=args.incremental, cooldown_seconds=0.0 if replay else 5.0,
+                               concurrency=args.concurrency, resume=args.resume, agents=args.agents,
+                               map_reduce=args.map_reduce)
     
     # 4. Run
     total_docs = scheduler.data_room.get_total_docs()
@@ -36,9 +91,28 @@ def main():
         print("❌ No documents found.")
         return
 
-    print(f"🚀 Starting Analysis of {total_docs} documents...")
-    scheduler.run_loop(max_shifts=total_docs + 1)
+    total_batches = scheduler.data_room.get_total_batches()
+    if args.incremental and total_batches == 0:
+        plan = scheduler.sync_plan
+        if plan is not None and (plan.deleted or scheduler.retired_findings):
+            # Deletions still changed the state: the manifest, and possibly a System_Sync shift
+            print(f"✅ Retired {scheduler.retired_findings} findings; no new documents to analyze ({plan.summary()}).")
+        else:
+            print("✅ Data room unchanged. Nothing new to analyze.")
+        return
+
+    if scheduler.start_batch > total_batches:
+        print("✅ Checkpointed run already finished. Nothing left to resume.")
+        return
+
+    print(f"🚀 Starting Analysis of {total_docs} documents in {total_batches} batches...")
+    scheduler.run_loop(max_shifts=total_batches + 1)
     scheduler.print_final_stats()
 
+    # Full snapshot of the final shift for anything outside the engine that reads storage/contexts/
+    scheduler.state_manager.export_contexts(latest_only=True)
+    exporter = "core.audit.sqlite_store" if scheduler.state_manager.backend == "sqlite" else "core.audit.context_chain"
+    print(f"📤 Final shift exported to storage/contexts/ (every shift: python -m {exporter} export)")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,72 @@
+from typing import List, Sequence, Tuple
+from pydantic import BaseModel
+from core.context.context_package import RiskFinding
+from core.context.dedup_index import DedupIndex
+from core.security.citation_verifier import document_key
+
+SEVERITY_RANK = {"LOW": 0, "MEDIUM": 1, "HIGH": 2}
+
+class ConsolidationStats(BaseModel):
+    """What the reduce phase did to the map findings."""
+    findings_in: int = 0
+    findings_out: int = 0
+    merged: int = 0 # Duplicates folded into an earlier finding
+    regraded: int = 0 # Findings whose severity rose because a duplicate was graded higher
+    levels: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"{self.findings_in} map findings -> {self.findings_out} "
+            f"({self.merged} merged, {self.regraded} re-graded, {self.levels} levels)"
+        )
+
+def _absorb(kept: RiskFinding, duplicate: RiskFinding, stats: ConsolidationStats):
+    """Folds a duplicate into the finding it repeats: highest severity wins, evidence is pooled."""
+    if SEVERITY_RANK.get(duplicate.severity.upper(), 0) > SEVERITY_RANK.get(kept.severity.upper(), 0):
+        kept.severity = duplicate.severity
+        stats.regraded += 1
+
+    seen = {(document_key(ev.document_name), ev.page_number, ev.verbatim_quote) for ev in kept.evidence}
+    for ev in duplicate.evidence:
+        key = (document_key(ev.document_name), ev.page_number, ev.verbatim_quote)
+        if key not in seen:
+            kept.evidence.append(ev.model_copy())
+            seen.add(key)
+    stats.merged += 1
+
+def merge_findings(registers: Sequence[List[RiskFinding]], stats: ConsolidationStats) -> List[RiskFinding]:
+    """
+    Merges registers in order into one. A finding that near-duplicates an
+    earlier one (see DedupIndex) is folded into it, so the earliest wording
+    is kept whatever order the map shifts finished in.
+    """
+    index = DedupIndex()
+    merged: List[RiskFinding] = []
+    for register in registers:
+        for risk in register:
+            position = index.find_duplicate(risk)
+            if position is None:
+                merged.append(risk.model_copy(deep=True))
+                index.add(risk)
+            else:
+                _absorb(merged[position], risk, stats)
+    return merged
+
+def consolidate(findings: List[RiskFinding], leaf_size: int = 64, fan_in: int = 8) -> Tuple[List[RiskFinding], ConsolidationStats]:
+    """
+    Reduce phase of a map-reduce run. The raw map findings (in batch order)
+    are cut into leaves of `leaf_size`, then merged `fan_in` at a time, level
+    by level, until one register is left. Each merge only sees its own
+    inputs, so repeats are folded close to where they came from and the
+    last levels work on an already-thinned register.
+    """
+    stats = ConsolidationStats(findings_in=len(findings))
+    level = [merge_findings([findings[n:n + leaf_size]], stats) for n in range(0, len(findings), leaf_size)]
+    stats.levels = 1 if level else 0
+    while len(level) > 1:
+        level = [merge_findings(level[n:n + fan_in], stats) for n in range(0, len(level), fan_in)]
+        stats.levels += 1
+
+    result = level[0] if level else []
+    stats.findings_out = len(result)
+    return result, stats
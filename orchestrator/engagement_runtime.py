@@ -0,0 +1,194 @@
+import asyncio
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
+from core.intent.intent_schema import IntentPackage
+from core.context.context_package import ContextPackage
+from orchestrator.shift_scheduler import MAP_COMMIT_WINDOW, ShiftScheduler
+
+class Engagement(BaseModel):
+    """One deal hosted by the runtime: its own mission, data room and storage root."""
+    name: str
+    intent: IntentPackage
+    data_room: str
+    storage: str
+    weight: float = Field(default=1.0, gt=0) # Share of the worker pool relative to the other deals
+    concurrency: int = Field(default=2, ge=1) # Shifts of this deal in flight at once (its commit window)
+    agents: Optional[int] = Field(default=None, ge=1) # Executor slots; default as in ShiftScheduler
+    map_reduce: bool = False # Independent map shifts, then one consolidation (see ShiftScheduler._reduce)
+
+def load_engagements(path: str) -> List[Engagement]:
+    """
+    Reads a JSON list of engagements, e.g.
+    [{"name": "LogiFlow", "data_room": "deals/logiflow", "storage": "storage/logiflow",
+      "weight": 1.0, "intent": {"original_prompt": "...", "success_definition": "..."}}]
+    Intents are signed on load. Storage roots are wiped on a fresh run, so
+    each must be its own directory, clear of every data room.
+    """
+    with open(path, "r") as f:
+        engagements = [Engagement(**item) for item in json.load(f)]
+    names = [e.name for e in engagements]
+    if len(set(names)) != len(names):
+        raise ValueError("Engagement names must be unique.")
+    storages = [os.path.realpath(e.storage) for e in engagements]
+    if len(set(storages)) != len(storages):
+        raise ValueError("Engagement storage roots must be unique.")
+    for engagement, storage in zip(engagements, storages):
+        for other in engagements:
+            if _overlaps(storage, os.path.realpath(other.data_room)):
+                raise ValueError(f"Storage root of {engagement.name} ({engagement.storage}) overlaps the data room of {other.name} ({other.data_room}).")
+    for engagement in engagements:
+        engagement.intent.sign()
+    return engagements
+
+def _overlaps(a: str, b: str) -> bool:
+    """True if the (real) paths are the same directory or one is inside the other."""
+    return os.path.commonpath([a, b]) in (a, b)
+
+class _EngagementRun:
+    """Dispatch/commit cursors of one engagement inside the runtime."""
+
+    def __init__(self, engagement: Engagement, scheduler: ShiftScheduler, incremental: bool):
+        self.engagement = engagement
+        self.scheduler = scheduler
+        # Same plan as main.py: one shift per batch plus the closing review (map-reduce: the batches, then the reduce)
+        total_batches = scheduler.data_room.get_total_batches()
+        if scheduler.data_room.get_total_docs() == 0 or (incremental and total_batches == 0):
+            self.max_shifts = 0
+        else:
+            self.max_shifts = scheduler._map_shifts(total_batches + 1)
+        # Dispatched, not yet committed (as in ShiftScheduler.arun_loop)
+        self.window = scheduler.concurrency * (MAP_COMMIT_WINDOW if scheduler.map_reduce else 1)
+        self.next_batch = scheduler.start_batch
+        self.next_commit = scheduler.start_batch
+        self.in_flight: Dict[int, str] = {} # batch -> agent, dispatched but not committed
+        self.idle: Dict[str, None] = dict.fromkeys(scheduler.agent_slots) # Free executor slots, longest idle first
+        self.finished: Dict[int, ContextPackage] = {} # batch -> answer waiting for its turn to commit
+        self.stride = 0.0 # Weighted shifts dispatched so far
+        self.error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        running = len(self.in_flight) - len(self.finished)
+        return (self.error is None and self.next_batch < self.max_shifts and len(self.in_flight) < self.window
+                and running < self.scheduler.concurrency and bool(self.idle))
+
+    @property
+    def committed(self) -> int:
+        return self.next_commit - self.scheduler.start_batch
+
+class EngagementRuntime:
+    """
+    Hosts many engagements in one process. They share:
+      1. a pool of `workers` shift slots (shifts in flight across all deals)
+      2. the process-wide LLM budget (RateLimiter.shared() and the response cache)
+
+    A free slot goes to the ready deal that has had the fewest shifts per unit
+    of weight so far (stride scheduling), so a 5,000-document deal cannot
+    starve a 50-document one. Each deal still commits one shift at a time in
+    batch order, exactly as ShiftScheduler.arun_loop does, and never runs two
+    shifts on one executor: a shift goes to an idle agent slot of its deal
+    (its round-robin slot if idle, else the longest idle one). A map-reduce
+    deal gets the wider commit window of arun_loop and is consolidated once
+    its last map shift commits.
+    """
+
+    def __init__(self, engagements: List[Engagement], workers: int = 4, incremental: bool = False, resume: bool = False):
+        self.workers = max(1, workers)
+        self.runs: List[_EngagementRun] = []
+        for engagement in engagements:
+            print(f"\n🏢 [{engagement.name}] Loading data room {engagement.data_room}...")
+            scheduler = ShiftScheduler(
+                engagement.intent, incremental=incremental, cooldown_seconds=0.0,
+                concurrency=engagement.concurrency, resume=resume,
+                data_room_path=engagement.data_room, storage_root=engagement.storage,
+                agents=engagement.agents, map_reduce=engagement.map_reduce
+            )
+            self.runs.append(_EngagementRun(engagement, scheduler, incremental))
+
+    def run(self):
+        asyncio.run(self.arun())
+
+    async def arun(self):
+        print(f"🚀 RUNTIME START. {len(self.runs)} engagements | {self.workers} shared workers")
+        running: Dict[asyncio.Task, Tuple[_EngagementRun, int, str]] = {}
+        try:
+            for run in self.runs:
+                self._reduce_if_done(run) # Resumed after the last map commit
+            self._dispatch(running)
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    run, batch, slot = running.pop(task)
+                    run.idle[slot] = None
+                    if run.error is not None:
+                        continue
+                    try:
+                        run.finished[batch] = task.result()
+                        self._commit_ready(run)
+                    except Exception as e:
+                        self._stop(run, e, running)
+                self._dispatch(running)
+        finally:
+            for task in running:
+                task.cancel()
+            for run in self.runs:
+                run.scheduler.state_manager.flush()
+
+    def _dispatch(self, running: Dict[asyncio.Task, Tuple[_EngagementRun, int, str]]):
+        """Fills free worker slots, lowest weighted stride first (ties go to the earlier deal)."""
+        while len(running) < self.workers:
+            ready = [run for run in self.runs if run.ready]
+            if not ready:
+                return
+            run = min(ready, key=lambda r: r.stride)
+            batch = run.next_batch
+            slot = run.scheduler._pick_slot(batch, run.idle)
+            try:
+                prepared = run.scheduler._prepare_shift(batch, slot)
+            except Exception as e:
+                run.idle[slot] = None
+                self._stop(run, e, running)
+                continue
+            if prepared is None:
+                run.idle[slot] = None
+                run.max_shifts = batch # No agent left to staff the deal
+                continue
+            agent_id, context_input, shift_deadline = prepared
+            worker = run.scheduler.workers[agent_id]
+            task = asyncio.ensure_future(worker.arun_shift(context_input, deadline=shift_deadline))
+            running[task] = (run, batch, slot)
+            run.in_flight[batch] = agent_id
+            run.next_batch += 1
+            run.stride += 1.0 / run.engagement.weight
+
+    def _commit_ready(self, run: _EngagementRun):
+        while run.next_commit in run.finished:
+            batch = run.next_commit
+            next_context = run.finished.pop(batch)
+            print(f"\n🏢 [{run.engagement.name}] Committing batch {batch + 1}")
+            run.scheduler._commit_shift(batch, run.in_flight.pop(batch), next_context)
+            run.next_commit += 1
+            if run.next_commit == run.max_shifts:
+                self._reduce_if_done(run)
+
+    def _reduce_if_done(self, run: _EngagementRun):
+        """A map-reduce deal consolidates once every map shift has committed."""
+        if run.scheduler.map_reduce and run.error is None and 0 < run.max_shifts <= run.next_commit:
+            run.scheduler._reduce()
+
+    def _stop(self, run: _EngagementRun, error: Exception, running: Dict[asyncio.Task, Tuple[_EngagementRun, int, str]]):
+        """One deal failing (e.g. a replay cache miss) stops that deal only."""
+        run.error = f"{type(error).__name__}: {error}"
+        print(f"❌ [{run.engagement.name}] Stopped: {run.error}")
+        run.scheduler.state_manager.log_event("Runtime", "ENGAGEMENT_STOPPED", run.error)
+        for task, (owner, *_) in running.items():
+            if owner is run:
+                task.cancel()
+
+    def print_final_stats(self):
+        for run in self.runs:
+            print(f"\n🏢 [{run.engagement.name}] weight {run.engagement.weight:g} | {run.committed} shifts committed"
+                  + (f" | STOPPED: {run.error}" if run.error else ""))
+            run.scheduler.print_final_stats()
@@ -0,0 +1,64 @@
+from typing import Dict, List, Tuple
+from pydantic import BaseModel, Field
+from core.context.context_package import RiskFinding
+from core.simulation.real_data_room import RealDataRoom
+from core.security.citation_verifier import document_key
+
+class SyncPlan(BaseModel):
+    """What changed in the data room since the last analyzed state."""
+    added: List[str] = Field(default_factory=list)
+    modified: List[str] = Field(default_factory=list)
+    deleted: List[str] = Field(default_factory=list)
+    unchanged: List[str] = Field(default_factory=list)
+    doc_indices: List[int] = Field(default_factory=list) # Data room indices that need a shift
+
+    @property
+    def stale_documents(self) -> List[str]:
+        """Documents whose previous findings no longer describe the data room."""
+        return self.deleted + self.modified
+
+    def summary(self) -> str:
+        return (
+            f"+{len(self.added)} new | ~{len(self.modified)} changed | "
+            f"-{len(self.deleted)} deleted | ={len(self.unchanged)} unchanged"
+        )
+
+def plan_sync(manifest: Dict, data_room: RealDataRoom) -> SyncPlan:
+    """Diffs the data room against the manifest of previously analyzed document hashes."""
+    analyzed = manifest.get("documents", {})
+    plan = SyncPlan()
+    present = set()
+
+    for i in range(data_room.get_total_docs()):
+        filename = data_room.documents.filename(i)
+        present.add(filename)
+        record = analyzed.get(filename)
+        if record is None:
+            plan.added.append(filename)
+            plan.doc_indices.append(i)
+        elif record.get("sha256") != data_room.doc_hashes.get(i):
+            plan.modified.append(filename)
+            plan.doc_indices.append(i)
+        else:
+            plan.unchanged.append(filename)
+
+    plan.deleted = sorted(name for name in analyzed if name not in present)
+    return plan
+
+def retire_findings(register: List[RiskFinding], filenames: List[str]) -> Tuple[List[RiskFinding], List[RiskFinding]]:
+    """
+    Splits the register into (kept, retired). A finding is retired when any of
+    its citations points at one of `filenames`: the evidence it rests on was
+    deleted or replaced.
+    """
+    stale = {document_key(name) for name in filenames}
+    if not stale:
+        return list(register), []
+
+    kept, retired = [], []
+    for risk in register:
+        if any(document_key(ev.document_name) in stale for ev in risk.evidence):
+            retired.append(risk)
+        else:
+            kept.append(risk)
+    return kept, retired
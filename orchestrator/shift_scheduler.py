@@ -1,5 +1,8 @@
 import time
 import os
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
 from core.intent.intent_schema import IntentPackage
 from core.context.context_package import ContextPackage, RiskFinding
 from core.ledger.ledger_store import AgentLedger
@@ -9,29 +12,65 @@ from agents.executor.base_executor import BaseExecutor
 from agents.learning.reflection_engine import ReflectionEngine
 from core.lifecycle.agent_factory import AgentFactory
 from core.simulation.real_data_room import RealDataRoom
+from core.simulation.parse_cache import ParseCache
+from core.simulation.batch_packer import Batch, BatchSegment
+from orchestrator.incremental_sync import SyncPlan, plan_sync, retire_findings
+from core.llm.usage import UsageSummary
+from core.context.dedup_index import DedupIndex
+from orchestrator.consolidation import consolidate
+from core.llm.model_router import ModelRouter
+from core.config.settings import load_system_settings
+
+# Map shifts don't depend on each other, so finished answers may queue for
+# their commit turn: up to this many times `concurrency` batches are open at once.
+MAP_COMMIT_WINDOW = 4
 
 class ShiftScheduler:
-    def __init__(self, intent: IntentPackage):
+    def __init__(self, intent: IntentPackage, incremental: bool = False, cooldown_seconds: float = 5.0, concurrency: int = 1,
+                 resume: bool = False, data_room_path: str = "client_data_room", storage_root: str = "storage",
+                 agents: Optional[int] = None, map_reduce: bool = False):
+        """
+        incremental: Continue from the last saved state and only analyze documents
+                     that are new or changed since they were last analyzed.
+        resume: Pick an interrupted run up at its last checkpoint (see `_resume`).
+        data_room_path / storage_root: Where this engagement's PDFs and state live.
+        cooldown_seconds: Pause between shifts (0 for cached/replayed runs). Serial runs only.
+        concurrency: Shifts in flight at once. Above 1, the rate limiter does the pacing.
+        agents: Executor slots (Agent_1..Agent_N). Defaults to enough for `concurrency`, and at least 2.
+        map_reduce: Analyze every batch on its own (no register in the prompt, no
+                    ordering between shifts), then consolidate the findings (see `_reduce`).
+        """
         self.intent = intent
-        self.state_manager = StateManager()
+        self.cooldown_seconds = cooldown_seconds
+        self.concurrency = max(1, concurrency)
+        self.map_reduce = map_reduce
+        self.settings = load_system_settings()
+        self.state_manager = StateManager(storage_root, self.settings.context_keyframe_interval, self.settings.context_compression,
+                                          backend=self.settings.state_backend, audit_fsync=self.settings.audit_fsync,
+                                          audit_batch_size=self.settings.audit_batch_size,
+                                          audit_flush_interval=self.settings.audit_flush_interval_seconds,
+                                          audit_segment_bytes=int(self.settings.audit_segment_max_mb * 1024 * 1024))
         self.learner = ReflectionEngine()
         self.factory = AgentFactory()
-        self.data_room = RealDataRoom("client_data_room")
-        
-        self.ledgers = {
-            "Agent_1": self.state_manager.load_ledger("Agent_1"),
-            "Agent_2": self.state_manager.load_ledger("Agent_2")
-        }
+        self.data_room = RealDataRoom(data_room_path, cache=ParseCache())
         
+        # Slots are stable seats; the agent in a seat changes when the Phoenix Protocol replaces it
+        self.agent_slots = [f"Agent_{n}" for n in range(1, (agents or max(2, self.concurrency)) + 1)]
+        self.slot_agents: Dict[str, str] = {slot: slot for slot in self.agent_slots} # slot -> live agent id
+
+        self.ledgers = {slot: self.state_manager.load_ledger(slot) for slot in self.agent_slots}
         self.supervisor_map = {
-            "Agent_1": SupervisorAgent(intent, self.ledgers["Agent_1"]),
-            "Agent_2": SupervisorAgent(intent, self.ledgers["Agent_2"])
+            slot: SupervisorAgent(intent, self.ledgers[slot], self.data_room.citation_index)
+            for slot in self.agent_slots
         }
         
-        self.workers = {
-            "Agent_1": BaseExecutor("Agent_1", intent),
-            "Agent_2": BaseExecutor("Agent_2", intent)
-        }
+        # One fast/strong cascade for all executors; escalates on what the Supervisor would reject
+        try:
+            self.router = ModelRouter.from_env(self.data_room.citation_index, self.supervisor_map["Agent_1"].strictness, self.settings)
+        except ValueError:
+            self.router = None # No API key: executors fall back on their own
+
+        self.workers = {slot: BaseExecutor(slot, intent, router=self.router) for slot in self.agent_slots}
         
         self.current_context = ContextPackage(
             shift_cycle=0,
@@ -46,109 +85,495 @@ class ShiftScheduler:
             intent_hash_reference=intent.intent_hash
         )
         
-        self.agent_slots = ["Agent_1", "Agent_2"]
+        self.usage = UsageSummary() # Whole engagement, this run
+        self.start_batch = 0
+        self._batch_plan_hash: Optional[str] = None # batch_plan.json, written at the first checkpoint
+
+        # Which document versions have been analyzed (see incremental_sync)
+        self.manifest = self.state_manager.load_manifest()
+        self._failed_docs = set()
+        self.sync_plan: Optional[SyncPlan] = None # Set by an incremental sync
+        self.retired_findings = 0
+        if resume and self._resume():
+            pass
+        elif incremental:
+            self._prepare_incremental_sync()
+
+        # Near-duplicate lookup over the committed register, updated at each commit
+        self.dedup = DedupIndex()
+        self.dedup.rebuild(self.current_context.cumulative_risk_register)
+
+    def _prepare_incremental_sync(self):
+        """
+        Diffs the data room against the manifest, schedules only new/changed
+        documents and retires findings that cite deleted or replaced ones.
+        """
+        plan = self.sync_plan = plan_sync(self.manifest, self.data_room)
+        print(f"🔄 INCREMENTAL SYNC: {plan.summary()}")
+        self.state_manager.log_event("Orchestrator", "INCREMENTAL_SYNC", plan.summary())
+        self.data_room.plan_batches(plan.doc_indices)
+
+        previous = self.state_manager.load_latest_context()
+        if previous is None:
+            return # Nothing analyzed yet: behaves like a full run
+        if previous.intent_hash_reference != self.intent.intent_hash:
+            raise ValueError("Intent changed since the last run. Run a full analysis instead of an incremental sync.")
+
+        for name in plan.deleted:
+            del self.manifest["documents"][name]
+        self.state_manager.save_manifest(self.manifest)
+
+        kept, retired = retire_findings(previous.cumulative_risk_register, plan.stale_documents)
+        self.retired_findings = len(retired)
+        if not retired:
+            self.current_context = previous
+            return
+
+        for risk in retired:
+            print(f"   🗄️  Retired: [{risk.severity}] {risk.category} - {risk.description[:40]}...")
+            self.state_manager.log_event("Orchestrator", "FINDING_RETIRED", f"[{risk.severity}] {risk.category}: {risk.description}")
+
+        # Commit the retirement as its own shift so reports see the pruned register
+        self.current_context = ContextPackage(
+            shift_cycle=previous.shift_cycle + 1,
+            previous_agent_id="System_Sync",
+            task_state={
+                "summary": f"Incremental sync: {plan.summary()}",
+                "retired_risks": [r.model_dump() for r in retired]
+            },
+            cumulative_risk_register=kept,
+            decisions=[f"Retired {len(retired)} findings citing deleted or replaced documents."],
+            assumptions=[],
+            open_risks=[],
+            confidence_score=1.0,
+            complexity_rating="LOW",
+            intent_hash_reference=self.intent.intent_hash
+        )
+        self.state_manager.save_context(self.current_context)
+
+    # --- CHECKPOINT / RESUME ---
+    def _batch_plan(self) -> List[List[List[Any]]]:
+        """The shift batches as [filename, sha256, first_page, last_page, tokens] segments."""
+        docs = self.data_room.documents
+        return [
+            [[docs.filename(s.doc_index), self.data_room.doc_hashes.get(s.doc_index), s.first_page, s.last_page, s.tokens]
+             for s in batch.segments]
+            for batch in self.data_room.batches
+        ]
+
+    def _restore_batch_plan(self, plan: List[List[List[Any]]]):
+        """Re-uses the interrupted run's batches so batch numbers still line up with the cursor."""
+        docs = self.data_room.documents
+        by_name = {docs.filename(i): i for i in docs}
+        batches = []
+        for segments in plan:
+            restored = []
+            for filename, sha256, first_page, last_page, tokens in segments:
+                doc_index = by_name.get(filename)
+                if doc_index is None or self.data_room.doc_hashes.get(doc_index) != sha256:
+                    raise ValueError(f"{filename} changed since the checkpoint. Use --incremental instead of --resume.")
+                restored.append(BatchSegment(doc_index, first_page, last_page, tokens))
+            batches.append(Batch(restored, sum(seg.tokens for seg in restored)))
+        self.data_room.batches = batches
 
-    def _is_duplicate(self, new_risk: RiskFinding, existing_risks: list) -> bool:
+    def _save_checkpoint(self, next_batch: int):
+        """
+        The commit record of a shift. Written last, atomically, after the context
+        and manifest, so a crash anywhere leaves the previous checkpoint intact
+        and the resumed run simply redoes the batch. Ledger balances and history
+        lengths are snapshotted here too (the histories themselves are in the
+        ledger files), so points from a shift that never checkpointed are not kept.
+        The batch plan does not change during a run: it is written once, to
+        batch_plan.json, and the checkpoint only records its hash.
+        """
+        if self._batch_plan_hash is None:
+            self._batch_plan_hash = self.state_manager.save_batch_plan(self._batch_plan())
+        ctx = self.current_context
+        self.state_manager.save_checkpoint({
+            "intent_hash": self.intent.intent_hash,
+            "next_batch": next_batch,
+            "map_reduce": self.map_reduce,
+            "shift_cycle": ctx.shift_cycle,
+            "context_file": self.state_manager.context_filename(ctx) if ctx.shift_cycle > 0 else None,
+            "slots": self.slot_agents, # Live roster, incl. Phoenix replacements
+            "workers": {aid: worker.inherited_lessons for aid, worker in self.workers.items()},
+            "ledgers": {
+                aid: {**ledger.model_dump(mode="json", exclude={"history"}), "history_len": len(ledger.history)}
+                for aid, ledger in self.ledgers.items()
+            },
+            "failed_docs": sorted(self.data_room.documents.filename(i) for i in self._failed_docs),
+            "usage": self.usage.model_dump(),
+            "batch_plan": self._batch_plan_hash,
+            "saved_at": datetime.now().isoformat()
+        })
+
+    def _resume(self) -> bool:
+        """
+        Restores the last checkpoint: committed context, ledgers, agent roster
+        (with inherited lessons), batch plan and cursor. False if there is none.
+        """
+        checkpoint = self.state_manager.load_checkpoint()
+        if checkpoint is None:
+            print("⏯️  RESUME: No checkpoint found. Starting from the first batch.")
+            return False
+        if checkpoint["intent_hash"] != self.intent.intent_hash:
+            raise ValueError("Intent changed since the checkpoint. Start a new run instead of resuming.")
+
+        # 1. Same batches as before the crash
+        self._restore_batch_plan(self.state_manager.load_batch_plan(checkpoint["batch_plan"]))
+        self._batch_plan_hash = checkpoint["batch_plan"]
+
+        # 2. Last committed context; drop anything saved after it
+        if checkpoint["context_file"]:
+            self.current_context = self.state_manager.load_context(checkpoint["context_file"])
+        for name in self.state_manager.discard_contexts_after(self.current_context.shift_cycle):
+            print(f"   🗑️  Discarded uncommitted shift: {name}")
+
+        # 3. Roster, ledgers and supervisors as of the checkpoint
+        self.ledgers = {}
+        for aid, snapshot in checkpoint["ledgers"].items():
+            # The ledger file may hold entries from the uncheckpointed shift
+            history = self.state_manager.load_ledger(aid).history[:snapshot.pop("history_len")]
+            self.ledgers[aid] = AgentLedger(**snapshot, history=history)
+        self.supervisor_map = {
+            aid: SupervisorAgent(self.intent, ledger, self.data_room.citation_index)
+            for aid, ledger in self.ledgers.items()
+        }
+        self.agent_slots = list(checkpoint["slots"])
+        self.slot_agents = dict(checkpoint["slots"])
+        self.workers = {}
+        for aid, lessons in checkpoint["workers"].items():
+            self.workers[aid] = BaseExecutor(aid, self.intent, router=self.router)
+            self.workers[aid].inherited_lessons = lessons
+        for ledger in self.ledgers.values():
+            self.state_manager.save_ledger(ledger)
+
+        # 4. Cursor
+        by_name = {self.data_room.documents.filename(i): i for i in self.data_room.documents}
+        self._failed_docs = {by_name[name] for name in checkpoint["failed_docs"] if name in by_name}
+        self.usage = UsageSummary(**checkpoint["usage"])
+        self.start_batch = checkpoint["next_batch"]
+        self.map_reduce = checkpoint.get("map_reduce", False) # Finish in the mode the run started in
+
+        summary = f"Batch {self.start_batch + 1} of {self.data_room.get_total_batches()}, shift {self.current_context.shift_cycle}, agents {', '.join(self.workers)}"
+        print(f"⏯️  RESUME: {summary}")
+        self.state_manager.log_event("Orchestrator", "RESUMED", summary)
+        return True
+
+    def _record_analyzed(self, batch_index: int, approved: bool, shift_cycle: int):
+        """Marks the documents of an approved batch as analyzed in the manifest."""
+        if batch_index >= self.data_room.get_total_batches():
+            return # Review-only shift, no documents
+
+        for seg in self.data_room.batches[batch_index].segments:
+            if not approved:
+                self._failed_docs.add(seg.doc_index)
+                continue
+            # Split documents count once their last part is approved, and only if no part failed
+            if seg.doc_index in self._failed_docs or seg.doc_index in self.data_room.failed_docs:
+                continue
+            if seg.last_page < self.data_room.documents.page_count(seg.doc_index):
+                continue
+            self.manifest["documents"][self.data_room.documents.filename(seg.doc_index)] = {
+                "sha256": self.data_room.doc_hashes[seg.doc_index],
+                "analyzed_at": datetime.now().isoformat(),
+                "shift_cycle": shift_cycle
+            }
+        self.state_manager.save_manifest(self.manifest)
+
+    def _is_duplicate(self, new_risk: RiskFinding, index: DedupIndex) -> bool:
         """
         Checks if a risk is a duplicate.
         1. Rejects if source is 'Master Risk Register'.
-        2. Rejects if description is too similar to existing.
+        2. Rejects if it is a near-duplicate of an indexed finding (see DedupIndex).
         """
         # Check 1: The "Echo Chamber" Filter
         for ev in new_risk.evidence:
             if "Master Risk Register" in ev.document_name:
                 return True
 
-        # Check 2: Semantic Similarity (Simple Keyword Match)
-        # In production, use embeddings. Here, we check if the category + first 20 chars match.
-        for existing in existing_risks:
-            if new_risk.category == existing.category:
-                # Check for significant overlap in description
-                if new_risk.description[:30] in existing.description or existing.description[:30] in new_risk.description:
-                    return True
+        # Check 2: Near-duplicate (reworded text, or same cited page with overlapping text)
+        return index.find_duplicate(new_risk) is not None
+
+    def _assign_agent(self, i: int, slot: Optional[str] = None) -> Optional[str]:
+        """
+        Picks the agent for batch i (round-robin over the slots unless a slot is
+        given), replacing it first if it was decommissioned (Phoenix Protocol).
+        """
+        # 2. Determine Agent
+        slot = slot or self.agent_slots[i % len(self.agent_slots)]
+        current_agent_id = self.slot_agents.get(slot)
+        if current_agent_id is None: return None
+        ledger = self.ledgers[current_agent_id]
+        
+        # 3. Phoenix Protocol
+        if not ledger.is_active:
+            print(f"💀 DETECTED DEATH: {current_agent_id}")
+            new_worker, new_ledger, new_id = self.factory.create_replacement(current_agent_id, ledger, self.intent, router=self.router)
+            self.workers[new_id] = new_worker
+            del self.workers[current_agent_id]
+            self.ledgers[new_id] = new_ledger
+            self.supervisor_map[new_id] = SupervisorAgent(self.intent, new_ledger, self.data_room.citation_index)
+            self.slot_agents[slot] = new_id
+            current_agent_id = new_id
+        return current_agent_id
+
+    def _pick_slot(self, i: int, idle: Dict[str, None]) -> str:
+        """Slot for batch i out of the idle ones (insertion-ordered, longest idle first): its round-robin slot, else the longest idle."""
+        slot = self.agent_slots[i % len(self.agent_slots)]
+        if slot not in idle:
+            slot = next(iter(idle)) # Steal: the due slot is still busy
+        del idle[slot]
+        return slot
+
+    def _prepare_shift(self, i: int, slot: Optional[str] = None) -> Optional[Tuple[str, ContextPackage, float]]:
+        """(agent, context to hand over, deadline) for batch i, from the state committed so far."""
+        # 1. Get Documents
+        docs = self.data_room.get_batch_for_shift(i)
+        print(f"\n📂 OPENING DATA ROOM BATCH {i+1}...")
+
+        current_agent_id = self._assign_agent(i, slot)
+        if current_agent_id is None:
+            return None
+
+        # 4. Prepare Context
+        if self.map_reduce:
+            context_input = self._map_context(i, docs)
+        else:
+            # Shallow: the register is a shared immutable version, only task_state gets a new key
+            context_input = self.current_context.model_copy(
+                update={"task_state": {**self.current_context.task_state, "new_documents": docs}}
+            )
+        # LLM calls past max_shift_duration_hours are cancelled
+        shift_deadline = time.monotonic() + self.settings.max_shift_duration_seconds
+        return current_agent_id, context_input, shift_deadline
+
+    # --- MAP-REDUCE ---
+    def _map_context(self, i: int, docs: str) -> ContextPackage:
+        """
+        Map input for batch i: the documents and nothing else. Built from the
+        batch alone, so it is the same whenever (and in whatever order) the
+        shift runs.
+        """
+        return ContextPackage(
+            shift_cycle=i,
+            previous_agent_id="System_Map",
+            task_state={"summary": "Map phase: analyze these documents on their own.", "new_documents": docs},
+            cumulative_risk_register=[],
+            decisions=[],
+            assumptions=[],
+            open_risks=[],
+            confidence_score=1.0,
+            complexity_rating="LOW",
+            intent_hash_reference=self.intent.intent_hash
+        )
+
+    def _map_shifts(self, max_shifts: int) -> int:
+        """Map runs cover the document batches only; the reduce replaces the closing review shift."""
+        return min(max_shifts, self.data_room.get_total_batches()) if self.map_reduce else max_shifts
+
+    def _reduce(self):
+        """
+        Reduce phase: consolidates the register the map shifts appended to
+        (hierarchical merge, dedup and re-grade, see consolidation.py) and
+        commits the result as its own shift, like an incremental sync.
+        """
+        if self.current_context.previous_agent_id == "System_Reduce":
+            return # Already consolidated (resumed after the reduce)
+
+        raw = self.current_context.cumulative_risk_register
+        register, stats = consolidate(raw)
+        print(f"\n🧮 REDUCE: {stats.summary()}")
+        self.state_manager.log_event("Orchestrator", "CONSOLIDATED", stats.summary())
+
+        self.current_context = ContextPackage(
+            shift_cycle=self.current_context.shift_cycle + 1,
+            previous_agent_id="System_Reduce",
+            task_state={"summary": f"Consolidation: {stats.summary()}", "consolidation": stats.model_dump()},
+            cumulative_risk_register=register,
+            decisions=[f"Merged {stats.merged} duplicate findings across batches; re-graded {stats.regraded}."],
+            assumptions=[],
+            open_risks=[],
+            confidence_score=1.0,
+            complexity_rating="LOW",
+            intent_hash_reference=self.intent.intent_hash
+        )
+        self.state_manager.save_context(self.current_context)
+        self.dedup.rebuild(register)
+        self._save_checkpoint(self.data_room.get_total_batches())
+        print(f"   📈 Risk Register Count: {len(register)}")
+
+    def _commit_shift(self, i: int, current_agent_id: str, next_context: ContextPackage) -> bool:
+        """
+        Commit point for batch i: book usage, merge into the register, supervisor
+        review, persist. Always called in batch order, so the register and the
+        shift numbering do not depend on which shift finished first.
+        """
+        ledger = self.ledgers[current_agent_id]
+        next_context.shift_cycle = self.current_context.shift_cycle + 1
+
+        # Spend is booked whether or not the shift is approved
+        ledger.record_usage(next_context.usage)
+        self.usage.add_all(next_context.usage)
+        if next_context.routing is not None:
+            self.state_manager.log_event(current_agent_id, "MODEL_ROUTING", next_context.routing.summary())
+        
+        # 6. ORCHESTRATOR MERGE LOGIC (With Deduplication)
+        new_risks_raw = next_context.task_state.get('identified_risks', [])
+        
+        # Convert to Objects
+        new_risks_objects = []
+        for r in new_risks_raw:
+            if isinstance(r, dict):
+                new_risks_objects.append(RiskFinding(**r))
+            else:
+                new_risks_objects.append(r)
+        
+        # Filter Duplicates (against the register, and within this shift's own findings).
+        # Map shifts only dedup within themselves; the reduce merges across batches.
+        unique_new_risks = []
+        shift_index = DedupIndex()
+        for risk in new_risks_objects:
+            against_register = not self.map_reduce and self._is_duplicate(risk, self.dedup)
+            if not against_register and not self._is_duplicate(risk, shift_index):
+                unique_new_risks.append(risk)
+                shift_index.add(risk)
+            else:
+                print(f"   ♻️  Filtered duplicate risk: {risk.category} - {risk.description[:20]}...")
+
+        # Append (a new register version sharing the committed one's chunks)
+        updated_register = self.current_context.cumulative_risk_register + unique_new_risks
+        next_context.cumulative_risk_register = updated_register
         
-        return False
+        # 7. Supervisor Review
+        supervisor = self.supervisor_map[current_agent_id]
+        approved = supervisor.evaluate_handoff(next_context)
+        
+        if approved:
+            self.current_context = next_context
+            if not self.map_reduce:
+                for risk in unique_new_risks:
+                    self.dedup.add(risk)
+            self.state_manager.save_context(next_context)
+            self.state_manager.save_ledger(ledger)
+            self.learner.run_learning_phase(current_agent_id, ledger, next_context)
+            print(f"   📈 Risk Register Count: {len(updated_register)} (+{len(unique_new_risks)} new)")
+        else:
+            print(f"   ⚠️ Shift {i+1} Failed.")
+            self.state_manager.save_ledger(ledger)
+        self._record_analyzed(i, approved, next_context.shift_cycle)
+        self._save_checkpoint(i + 1)
+        return approved
 
     def run_loop(self, max_shifts: int = 5):
+        if self.concurrency > 1:
+            return asyncio.run(self.arun_loop(max_shifts))
+
         print(f"🚀 SYSTEM START. Intent Hash: {self.intent.intent_hash[:8]}")
         
-        for i in range(max_shifts):
-            # 1. Get Documents
-            docs = self.data_room.get_batch_for_shift(i)
-            print(f"\n📂 OPENING DATA ROOM BATCH {i+1}...")
-            
-            # 2. Determine Agent
-            current_slot_base = self.agent_slots[i % 2]
-            current_agent_id = None
-            for aid in self.workers.keys():
-                if aid.startswith(current_slot_base.split("_v")[0]):
-                    current_agent_id = aid
-            
-            if not current_agent_id: break
-            ledger = self.ledgers[current_agent_id]
-            
-            # 3. Phoenix Protocol
-            if not ledger.is_active:
-                print(f"💀 DETECTED DEATH: {current_agent_id}")
-                new_worker, new_ledger, new_id = self.factory.create_replacement(current_agent_id, ledger, self.intent)
-                self.workers[new_id] = new_worker
-                del self.workers[current_agent_id]
-                self.ledgers[new_id] = new_ledger
-                self.supervisor_map[new_id] = SupervisorAgent(self.intent, new_ledger)
-                current_agent_id = new_id
-                ledger = new_ledger
-            
-            # 4. Prepare Context
-            worker = self.workers[current_agent_id]
-            context_input = self.current_context.model_copy(deep=True)
-            context_input.task_state['new_documents'] = docs
+        for i in range(self.start_batch, self._map_shifts(max_shifts)):
+            prepared = self._prepare_shift(i)
+            if prepared is None: break
+            current_agent_id, context_input, shift_deadline = prepared
             
             # 5. EXECUTE SHIFT
-            next_context = worker.run_shift(context_input)
-            
-            # 6. ORCHESTRATOR MERGE LOGIC (With Deduplication)
-            new_risks_raw = next_context.task_state.get('identified_risks', [])
-            
-            # Convert to Objects
-            new_risks_objects = []
-            for r in new_risks_raw:
-                if isinstance(r, dict):
-                    new_risks_objects.append(RiskFinding(**r))
-                else:
-                    new_risks_objects.append(r)
-            
-            # Filter Duplicates
-            unique_new_risks = []
-            for risk in new_risks_objects:
-                if not self._is_duplicate(risk, self.current_context.cumulative_risk_register):
-                    unique_new_risks.append(risk)
-                else:
-                    print(f"   ♻️  Filtered duplicate risk: {risk.category} - {risk.description[:20]}...")
-
-            # Append
-            updated_register = self.current_context.cumulative_risk_register + unique_new_risks
-            next_context.cumulative_risk_register = updated_register
-            
-            # 7. Supervisor Review
-            supervisor = self.supervisor_map[current_agent_id]
-            approved = supervisor.evaluate_handoff(next_context)
-            
-            if approved:
-                self.current_context = next_context
-                self.state_manager.save_context(next_context)
-                self.state_manager.save_ledger(ledger)
-                self.learner.run_learning_phase(current_agent_id, ledger, next_context)
-                print(f"   📈 Risk Register Count: {len(updated_register)} (+{len(unique_new_risks)} new)")
-            else:
-                print(f"   ⚠️ Shift {i+1} Failed.")
-                self.state_manager.save_ledger(ledger)
+            next_context = self.workers[current_agent_id].run_shift(context_input, deadline=shift_deadline)
+            # Drop our reference to the batch text; the page store can hand it out again
+            del context_input, prepared
+
+            self._commit_shift(i, current_agent_id, next_context)
             
-            print("   💤 Cooling down...")
-            time.sleep(5.0)
+            if self.cooldown_seconds > 0:
+                print("   💤 Cooling down...")
+                time.sleep(self.cooldown_seconds)
+
+        if self.map_reduce:
+            self._reduce()
+        self.state_manager.flush()
+
+    async def arun_loop(self, max_shifts: int = 5):
+        """
+        Concurrent run: up to `concurrency` shifts are in flight at once, paced
+        only by the shared rate limiter (no cooldown).
+
+        Batches form a queue that idle agent slots pull from: a slot is free
+        again as soon as its shift returns, so a slow (or freshly replaced)
+        agent never holds up the others. A batch goes to its round-robin slot
+        when that slot is idle, otherwise to the longest-idle one.
+
+        Shifts still commit one at a time in batch order. Batch i is dispatched
+        once batch i - concurrency commits and a slot is free; with at least as
+        many agents as `concurrency` that is right after the commit, so the
+        register it sees is the same on every run, however the LLM latencies fall.
+
+        In map-reduce mode shifts don't see the register, so a new batch starts
+        whenever fewer than `concurrency` are running (a slow one doesn't
+        block the window), and `_reduce` runs after the last commit.
+        """
+        print(f"🚀 SYSTEM START. Intent Hash: {self.intent.intent_hash[:8]} | {self.concurrency} shifts in flight | {len(self.agent_slots)} agents")
+        in_flight: Dict[int, Tuple[str, asyncio.Task]] = {}
+        idle: Dict[str, None] = dict.fromkeys(self.agent_slots) # Insertion-ordered: longest idle first
+        next_batch = self.start_batch
+        max_shifts = self._map_shifts(max_shifts)
+        window = self.concurrency * (MAP_COMMIT_WINDOW if self.map_reduce else 1) # Dispatched, not yet committed
+        running = 0
+        wake = asyncio.Event() # Set whenever a slot frees up
+
+        async def shift(slot: str, worker: BaseExecutor, context_input: ContextPackage, shift_deadline: float) -> ContextPackage:
+            nonlocal running
+            try:
+                return await worker.arun_shift(context_input, deadline=shift_deadline)
+            finally: # Free before the task is done, so a finished task never holds its slot
+                running -= 1
+                idle[slot] = None
+                wake.set()
+
+        def dispatch():
+            nonlocal next_batch, running
+            while next_batch < max_shifts and len(in_flight) < window and running < self.concurrency and idle:
+                slot = self._pick_slot(next_batch, idle)
+                prepared = self._prepare_shift(next_batch, slot)
+                if prepared is None:
+                    next_batch = max_shifts
+                    return
+                current_agent_id, context_input, shift_deadline = prepared
+                task = asyncio.ensure_future(shift(slot, self.workers[current_agent_id], context_input, shift_deadline))
+                in_flight[next_batch] = (current_agent_id, task)
+                running += 1
+                next_batch += 1
+
+        try:
+            dispatch()
+            for i in range(self.start_batch, max_shifts):
+                if i not in in_flight:
+                    break
+                current_agent_id, task = in_flight[i]
+                while not task.done():
+                    # Refill freed slots from here (not from a callback), so errors reach this loop
+                    await wake.wait()
+                    wake.clear()
+                    dispatch()
+                del in_flight[i]
+                self._commit_shift(i, current_agent_id, task.result())
+                dispatch()
+        finally:
+            for _, task in in_flight.values():
+                task.cancel()
+
+        if self.map_reduce:
+            self._reduce()
+        self.state_manager.flush()
 
     def print_final_stats(self):
         print("\n📊 FINAL SYSTEM STATS")
         print(f"   Total Risks Found: {len(self.current_context.cumulative_risk_register)}")
         for agent_id, ledger in self.ledgers.items():
             status = "ALIVE" if ledger.is_active else "DEAD"
-            print(f"   {agent_id} [{status}]: Success={ledger.success_points} | Errors={ledger.error_points} | Brownies={ledger.brownie_points}")
\ No newline at end of file
+            print(f"   {agent_id} [{status}]: Success={ledger.success_points} | Errors={ledger.error_points} | Brownies={ledger.brownie_points}")
+            print(f"      💸 {ledger.usage.summary()}")
+        print(f"   💰 Engagement LLM usage: {self.usage.summary()}")
+        if self.router is not None:
+            for client in self.router.tiers:
+                print(f"   ⏱️  {client.model_name} latency: {client.latency.summary()}")
+        self.state_manager.log_event("Orchestrator", "USAGE", self.usage.summary())
+        self.state_manager.flush()
\ No newline at end of file
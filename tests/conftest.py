@@ -0,0 +1,67 @@
+import os
+import pytest
+from core.intent.intent_schema import IntentPackage
+from core.llm.rate_limiter import RateLimiter
+from core.simulation.batch_packer import BatchPacker
+from orchestrator.shift_scheduler import ShiftScheduler
+from test_data_room import _write_pdf
+
+
+@pytest.fixture
+def mock_llm(monkeypatch):
+    """
+    Offline LLM for scheduler tests: mock provider, no escalation, no response
+    cache, and a rate budget the tests never hit. Returns a setter for the
+    mock's latency (0 ms by default).
+    """
+    def configure(latency_ms=0, jitter_ms=0):
+        monkeypatch.setenv("MOCK_LLM_LATENCY_MS", str(latency_ms))
+        monkeypatch.setenv("MOCK_LLM_JITTER_MS", str(jitter_ms))
+
+    monkeypatch.setenv("LLM_PROVIDER", "mock")
+    monkeypatch.setenv("LLM_STRONG_MODEL", "")
+    monkeypatch.setenv("LLM_CACHE_MODE", "off")
+    monkeypatch.setattr(RateLimiter, "_shared", RateLimiter(requests_per_minute=6000))
+    configure()
+    return configure
+
+
+@pytest.fixture
+def data_room(tmp_path, monkeypatch):
+    """
+    Factory: data_room(docs, workdir=None, folder="client_data_room", clause=None)
+    writes `docs` one-page PDFs (clause(n) or a termination clause) into
+    `folder`, makes `workdir` (default tmp_path) the working directory and
+    returns it.
+    """
+    def make(docs, workdir=None, folder="client_data_room", clause=None):
+        workdir = workdir or tmp_path
+        os.makedirs(os.path.join(workdir, folder), exist_ok=True)
+        monkeypatch.chdir(workdir)
+        for n in range(docs):
+            text = clause(n) if clause else f"Supplier {n} may terminate the contract on 30 days notice."
+            _write_pdf(os.path.join(folder, f"doc_{n}.pdf"), [text])
+        return workdir
+    return make
+
+
+@pytest.fixture
+def make_intent():
+    """Factory: a signed IntentPackage for `prompt`."""
+    def make(prompt="Audit the data room"):
+        intent = IntentPackage(original_prompt=prompt, constraints=[], prohibited_actions=[], success_definition="Done")
+        intent.sign()
+        return intent
+    return make
+
+
+@pytest.fixture
+def make_scheduler(make_intent):
+    """Factory: a ShiftScheduler over the working directory's data room, no cooldown, re-planned to one document per shift."""
+    def make(one_doc_per_shift=True, **kwargs):
+        scheduler = ShiftScheduler(make_intent(), cooldown_seconds=0, **kwargs)
+        if one_doc_per_shift:
+            scheduler.data_room.packer = BatchPacker(token_budget=60)
+            scheduler.data_room.plan_batches()
+        return scheduler
+    return make
@@ -1,21 +1,19 @@
 import json
-import glob
 import os
+from core.audit.persistence import StateManager
 
 def inspect_risks():
     print("🕵️ INSPECTING DUE DILIGENCE REPORT...\n")
     
-    # Find all context files
-    files = glob.glob("storage/contexts/*.json")
-    files.sort()
+    # Rebuild every saved shift
+    contexts = list(StateManager("storage").iter_contexts())
     
-    if not files:
+    if not contexts:
         print("❌ No files found. Did you run main.py?")
         return
 
-    for filepath in files:
-        with open(filepath, "r") as f:
-            data = json.load(f)
+    for _, ctx in contexts:
+        data = json.loads(ctx.model_dump_json())
             
         shift = data.get("shift_cycle")
         agent = data.get("previous_agent_id")
@@ -1,18 +1,12 @@
-import os
 import json
-import glob
+from core.audit.persistence import StateManager
 
 def inspect_artifacts():
     print("🕵️ INSPECTING AGENT WORK PRODUCTS...\n")
     
-    # Find all context files
-    files = glob.glob("storage/contexts/*.json")
-    # Sort by shift number (filename format: shift_XXXX_...)
-    files.sort()
-    
-    for filepath in files:
-        with open(filepath, "r") as f:
-            data = json.load(f)
+    # Rebuild every saved shift, in shift order
+    for _, ctx in StateManager("storage").iter_contexts():
+        data = json.loads(ctx.model_dump_json())
             
         shift = data.get("shift_cycle")
         agent = data.get("previous_agent_id")
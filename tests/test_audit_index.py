@@ -0,0 +1,141 @@
+import json
+import os
+import pytest
+from datetime import datetime, timedelta
+from core.audit import audit_index
+from core.audit.audit_index import AuditIndex, segment_paths
+from core.audit.audit_writer import AuditWriter
+from core.audit.persistence import StateManager
+
+EVENTS = 20_000
+SOURCES = ["Orchestrator", "Agent_1", "Agent_2", "Agent_3"]
+T0 = datetime(2026, 3, 2, 13, 0)
+
+
+def _event(n):
+    # One event every 0.5s; Agent_2 only logs between 14:00 and 14:30
+    ts = T0 + timedelta(seconds=n / 2)
+    source = SOURCES[n % 4] if not (n % 4 == 2 and not 7200 <= n < 10800) else "Orchestrator"
+    return {"timestamp": ts.isoformat(), "source": source, "event": "E", "details": f"event {n}"}
+
+
+def _write_log(path, **kwargs):
+    writer = AuditWriter(path, fsync="none", batch_size=500, flush_interval=60, **kwargs)
+    for n in range(EVENTS):
+        writer.write(_event(n))
+    writer.close()
+
+
+def test_query_seeks_to_the_range(tmp_path, monkeypatch):
+    print("🗂️ Testing Sparse Audit Index...")
+    path = str(tmp_path / "audit_log.jsonl")
+    _write_log(path, max_segment_bytes=256 * 1024)
+    index = AuditIndex(path)
+    events = [_event(n) for n in range(EVENTS)]
+
+    # 1. Range + source query matches a full scan, reading only the blocks that can match
+    total_blocks = sum(len(index.blocks(s)) for s in segment_paths(path))
+    reads, bisected = [], []
+    real_read_block, real_bisect = audit_index._read_block, audit_index._bisect_lines
+    monkeypatch.setattr(audit_index, "_read_block", lambda segment, block: reads.append(block) or real_read_block(segment, block))
+    monkeypatch.setattr(audit_index, "_bisect_lines", lambda f, pred: bisected.append(f.name) or real_bisect(f, pred))
+    monkeypatch.setattr(AuditIndex, "_read_entries", lambda *args: pytest.fail("read a whole index"))
+    start, end = datetime(2026, 3, 2, 14, 0), datetime(2026, 3, 2, 14, 10)
+    found = index.query(source="Agent_2", start=start, end=end)
+    expected = [e for e in events if e["source"] == "Agent_2" and start.isoformat() <= e["timestamp"] <= end.isoformat()]
+    assert found == expected and len(found) == 300
+    assert len(reads) <= 12 and len(reads) * 5 < total_blocks # 1200 events in range -> a handful of blocks
+    assert len(bisected) <= 2 < len(segment_paths(path)) # Other segments skipped on their first/last entries
+    print(f"✅ PASS: {len(found)} events for Agent_2 14:00-14:10 from {len(reads)} of {total_blocks} blocks, "
+          f"{len(bisected)} of {len(segment_paths(path))} segments searched.")
+
+    # 2. Count and tail come from the last index entry: no scan, no full index read
+    def no_scan(*args):
+        raise AssertionError("scanned")
+
+    monkeypatch.setattr(audit_index, "_scan", no_scan)
+    monkeypatch.setattr(AuditIndex, "_read_entries", no_scan)
+    reads.clear()
+    assert index.count() == EVENTS
+    assert index.tail(3) == events[-3:] and len(reads) == 1
+    print(f"✅ PASS: count={EVENTS} and tail from one block, across {len(segment_paths(path))} segments.")
+
+
+def test_out_of_order_and_old_indexes(tmp_path):
+    print("🔀 Testing Range Queries on Out-of-Order Timestamps...")
+    path = str(tmp_path / "audit_log.jsonl")
+    writer = AuditWriter(path, fsync="none", batch_size=100, flush_interval=60, max_segment_bytes=64 * 1024)
+    events = []
+    for n in range(EVENTS // 4):
+        event = _event(n)
+        if n % 997 == 0 and n: # A straggler logged minutes late
+            event["timestamp"] = (T0 + timedelta(seconds=n / 2 - 600)).isoformat()
+        events.append(event)
+        writer.write(event)
+    writer.close()
+
+    def check(index):
+        for start, end in (("2026-03-02T13:05", "2026-03-02T13:07"), ("2026-03-02T13:20", None), (None, "2026-03-02T13:01"),
+                           ("2026-03-02T13:15:10", "2026-03-02T13:15:20"), ("2026-03-02T15:00", None)):
+            expected = [e for e in events if (start is None or e["timestamp"] >= start) and (end is None or e["timestamp"] <= end)]
+            assert index.query(start=start, end=end) == expected
+    check(AuditIndex(path))
+
+    # Indexes written before "hi"/"late" existed are still read correctly (by a scan)
+    for segment in segment_paths(path):
+        with open(segment + ".idx") as f:
+            entries = [json.loads(line) for line in f]
+        with open(segment + ".idx", "w") as f:
+            f.write("".join(json.dumps({k: v for k, v in e.items() if k not in ("hi", "late")}) + "\n" for e in entries))
+    check(AuditIndex(path))
+    print("✅ PASS: Late events and old indexes give the same answers as a full scan.")
+
+
+def test_unindexed_lines_and_torn_index(tmp_path):
+    print("🩹 Testing Index Catch-Up...")
+    path = str(tmp_path / "audit_log.jsonl")
+    with open(path, "w") as f: # A log written before the index existed
+        f.write("".join(json.dumps(_event(n)) + "\n" for n in range(1000)))
+    index = AuditIndex(path)
+    assert not os.path.exists(path + ".idx")
+    assert index.count() == 1000 and index.query(source="Agent_1", limit=2) == [_event(1), _event(5)]
+
+    # The next writer indexes the old lines; a torn index line is cut off and rebuilt
+    writer = AuditWriter(path, fsync="none")
+    writer.write(_event(1000))
+    writer.flush()
+    assert os.path.exists(path + ".idx") and index.count() == 1001
+    with open(path + ".idx", "a") as f:
+        f.write('{"offset": 12')
+    with open(path, "a") as f: # ...and a line the index never saw
+        f.write(json.dumps(_event(1001)) + "\n")
+    assert index.count() == 1002 and index.tail(2) == [_event(1000), _event(1001)]
+    writer.write(_event(1002))
+    writer.close()
+    assert index._last_entry(path)["seq"] + index._last_entry(path)["count"] == 1003
+    assert [e["details"] for e in index.query()] == [f"event {n}" for n in range(1003)]
+    print("✅ PASS: Pre-index logs, lagging and torn indexes are caught up.")
+
+
+def test_state_manager_audit_query(tmp_path):
+    print("🔎 Testing Audit Queries on Both Backends...")
+    for backend in ("files", "sqlite"):
+        state = StateManager(str(tmp_path / backend), backend=backend)
+        for n in range(40):
+            state.log_event(f"Agent_{n % 2 + 1}", "E", f"event {n}")
+        stamps = [e["timestamp"] for e in state.audit_query()]
+        assert len(stamps) == 40 == state.audit_count() and stamps == sorted(stamps)
+        window = state.audit_query(source="Agent_2", start=stamps[10], end=stamps[20])
+        assert [e["details"] for e in window] == [f"event {n}" for n in range(1, 40, 2) if stamps[10] <= stamps[n] <= stamps[20]]
+        assert [e["details"] for e in state.audit_query(source="Agent_1", limit=2)] == ["event 0", "event 2"]
+        assert state.audit_tail(1)[0]["details"] == "event 39"
+    print("✅ PASS: Same answers from the sparse index and SQLite.")
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as mp:
+        test_query_seeks_to_the_range(pathlib.Path(tmp), mp)
+    for test in (test_out_of_order_and_old_indexes, test_unindexed_lines_and_torn_index, test_state_manager_audit_query):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(pathlib.Path(tmp))
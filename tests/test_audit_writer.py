@@ -0,0 +1,120 @@
+import json
+import multiprocessing
+import os
+import time
+import pytest
+from core.audit import audit_writer
+from core.audit.audit_writer import AuditWriter, segment_paths
+from core.audit.persistence import StateManager
+
+EVENTS = 1000
+PROCESSES = 4
+
+
+def _event(n, source="Test"):
+    return {"timestamp": f"2026-01-01T00:00:{n:06d}", "source": source, "event": "E", "details": f"event {n}"}
+
+
+def _read_all(path):
+    lines = []
+    for segment in segment_paths(path):
+        with open(segment) as f:
+            lines += [json.loads(line) for line in f]
+    return lines
+
+
+def _count_calls(monkeypatch, name):
+    calls = []
+    real = getattr(os, name)
+    monkeypatch.setattr(os, name, lambda *args: calls.append(1) or real(*args))
+    return calls
+
+
+def test_batching_and_fsync_policies(tmp_path, monkeypatch):
+    print("🧾 Testing Buffered Audit Writer...")
+    writes = _count_calls(monkeypatch, "write")
+    fsyncs = _count_calls(monkeypatch, "fsync")
+
+    # 1. Size threshold: one write (and one fsync) per batch, not per event
+    writer = AuditWriter(str(tmp_path / "batch.jsonl"), fsync="batch", batch_size=100, flush_interval=60)
+    for n in range(EVENTS):
+        writer.write(_event(n))
+    writer.flush()
+    assert [e["details"] for e in _read_all(writer.path)] == [f"event {n}" for n in range(EVENTS)]
+    assert len(writes) <= EVENTS // 100 + 1 and len(fsyncs) == len(writes)
+    print(f"✅ PASS: {EVENTS} events in {len(writes)} writes.")
+
+    # 2. Time threshold: a partial batch is written without an explicit flush
+    writer = AuditWriter(str(tmp_path / "interval.jsonl"), fsync="none", batch_size=10_000, flush_interval=0.05)
+    fsyncs.clear()
+    for n in range(3):
+        writer.write(_event(n))
+    deadline = time.monotonic() + 5
+    while len(_read_all(writer.path)) < 3 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert len(_read_all(writer.path)) == 3 and not fsyncs
+    print("✅ PASS: Partial batches flush on the interval; fsync=none never syncs.")
+
+    # 3. Per-event policy is durable before write() returns
+    writer = AuditWriter(str(tmp_path / "event.jsonl"), fsync="event")
+    for n in range(5):
+        writer.write(_event(n))
+        assert len(_read_all(writer.path)) == n + 1
+    assert len(fsyncs) == 5 and writer._thread is None
+    with pytest.raises(ValueError):
+        AuditWriter(str(tmp_path / "bad.jsonl"), fsync="sometimes")
+    print("✅ PASS: fsync=event writes and syncs every event synchronously.")
+
+
+def test_rotation_keeps_every_line(tmp_path):
+    print("🔁 Testing Audit Segment Rotation...")
+    path = str(tmp_path / "audit_log.jsonl")
+    writer = AuditWriter(path, batch_size=10, flush_interval=60, max_segment_bytes=4000)
+    for n in range(EVENTS):
+        writer.write(_event(n))
+    writer.close()
+
+    segments = segment_paths(path)
+    assert len(segments) > 10 and segments[-1] == path
+    assert all(os.path.getsize(s) <= 4000 for s in segments)
+    assert [e["details"] for e in _read_all(path)] == [f"event {n}" for n in range(EVENTS)]
+
+    state = StateManager(str(tmp_path)) # Readers see every segment
+    assert state.audit_count() == EVENTS
+    assert [e["details"] for e in state.audit_tail(50)] == [f"event {n}" for n in range(EVENTS - 50, EVENTS)]
+    print(f"✅ PASS: {EVENTS} events across {len(segments)} segments, none lost or reordered.")
+
+
+def _writer_process(path, source):
+    writer = AuditWriter(path, batch_size=37, flush_interval=0.01, max_segment_bytes=20_000)
+    for n in range(EVENTS):
+        writer.write(_event(n, source))
+    writer.close()
+
+
+@pytest.mark.skipif(audit_writer.fcntl is None, reason="needs fcntl")
+def test_many_writer_processes(tmp_path):
+    print("👥 Testing Concurrent Writer Processes...")
+    path = str(tmp_path / "audit_log.jsonl")
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_writer_process, args=(path, f"P{p}")) for p in range(PROCESSES)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+        assert p.exitcode == 0
+
+    events = _read_all(path) # Every line parses: no torn or interleaved writes
+    assert len(events) == PROCESSES * EVENTS
+    for p in range(PROCESSES):
+        assert [e["details"] for e in events if e["source"] == f"P{p}"] == [f"event {n}" for n in range(EVENTS)]
+    print(f"✅ PASS: {PROCESSES} processes, {len(events)} events over {len(segment_paths(path))} segments.")
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as mp:
+        test_batching_and_fsync_policies(pathlib.Path(tmp), mp)
+    for test in (test_rotation_keeps_every_line, test_many_writer_processes):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(pathlib.Path(tmp))
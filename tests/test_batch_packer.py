@@ -0,0 +1,39 @@
+from core.simulation.batch_packer import BatchPacker
+from core.llm.token_estimator import estimate_tokens
+
+
+def test_packing_follows_content_size():
+    print("📦 Testing Batch Packer...")
+    packer = BatchPacker(token_budget=1000, doc_overhead=0)
+
+    # 1. Many small documents share shifts
+    ndas = [[100] for _ in range(30)]
+    batches = packer.pack(ndas)
+    assert len(batches) == 3
+    assert all(b.tokens <= 1000 for b in batches)
+    assert [s.doc_index for b in batches for s in b.segments] == list(range(30))
+    print(f"✅ PASS: 30 one-page documents packed into {len(batches)} shifts.")
+
+    # 2. An oversized document is split at page boundaries
+    credit_agreement = [300] * 10
+    batches = packer.pack([credit_agreement, [200]])
+    parts = [(s.doc_index, s.first_page, s.last_page) for b in batches for s in b.segments]
+    assert parts == [(0, 1, 3), (0, 4, 6), (0, 7, 9), (0, 10, 10), (1, 1, 1)]
+    assert len(batches) == 4 # The tail of the big document shares a batch with the small one
+    print("✅ PASS: Oversized document split at page boundaries.")
+
+    # 3. Subsets keep their order
+    batches = packer.pack(ndas, doc_indices=[5, 9])
+    assert [s.doc_index for s in batches[0].segments] == [5, 9]
+    print("✅ PASS: Packing a subset of documents.")
+
+
+def test_token_estimator():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Revenue: $15,000,000.") >= 5
+    assert estimate_tokens("x" * 400) == 100
+
+
+if __name__ == "__main__":
+    test_packing_follows_content_size()
+    test_token_estimator()
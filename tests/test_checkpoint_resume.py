@@ -0,0 +1,76 @@
+import os
+import pytest
+from core.audit.persistence import StateManager
+
+DOCS = 6
+CRASH_AT_COMMIT = 3
+
+
+class Crash(Exception):
+    pass
+
+
+def _scheduler(workdir, data_room, make_scheduler, resume=False):
+    data_room(DOCS, workdir)
+    scheduler = make_scheduler(one_doc_per_shift=not resume, resume=resume)
+    if not resume:
+        scheduler.ledgers["Agent_1"].is_active = False # Force a Phoenix replacement on the first shift
+    return scheduler
+
+
+def _dump(scheduler):
+    return [r.model_dump() for r in scheduler.current_context.cumulative_risk_register]
+
+
+def test_resume_after_crash_matches_uninterrupted_run(tmp_path, monkeypatch, mock_llm, data_room, make_scheduler):
+    print("⏯️ Testing Checkpoint / Resume...")
+    baseline = _scheduler(tmp_path / "baseline", data_room, make_scheduler)
+    baseline.run_loop(max_shifts=DOCS)
+
+    # 1. Crash after the context of a shift is written but before its checkpoint
+    crashed = _scheduler(tmp_path / "crash", data_room, make_scheduler)
+    real_save = StateManager.save_checkpoint
+    commits = []
+
+    def save_checkpoint(self, checkpoint):
+        commits.append(checkpoint["next_batch"])
+        if len(commits) == CRASH_AT_COMMIT:
+            raise Crash()
+        real_save(self, checkpoint)
+
+    monkeypatch.setattr(StateManager, "save_checkpoint", save_checkpoint)
+    with pytest.raises(Crash):
+        crashed.run_loop(max_shifts=DOCS)
+    monkeypatch.setattr(StateManager, "save_checkpoint", real_save)
+    assert len(StateManager("storage").context_names()) == CRASH_AT_COMMIT
+    # Only the cursor, roster and ledger balances are rewritten per commit; the plan is on disk once
+    checkpoint = StateManager("storage").load_checkpoint()
+    assert "batches" not in checkpoint and os.path.exists(os.path.join("storage", "batch_plan.json"))
+    assert all("history" not in ledger for ledger in checkpoint["ledgers"].values())
+    print("✅ PASS: Crash left an uncheckpointed shift on disk.")
+
+    # 2. Resume: roster, ledgers and cursor come back from the checkpoint
+    resumed = _scheduler(tmp_path / "crash", data_room, make_scheduler, resume=True)
+    assert resumed.start_batch == CRASH_AT_COMMIT - 1
+    assert resumed.current_context.shift_cycle == CRASH_AT_COMMIT - 1
+    assert len(StateManager("storage").context_names()) == CRASH_AT_COMMIT - 1
+    assert "Agent_1_v2" in resumed.workers and "Agent_1" not in resumed.workers
+    assert "predecessor" in resumed.workers["Agent_1_v2"].inherited_lessons
+    assert not resumed.ledgers["Agent_1"].is_active
+    print(f"✅ PASS: Resumed at batch {resumed.start_batch + 1} with agents {list(resumed.workers)}.")
+
+    # 3. Finishing the run gives the same register and numbering as never crashing
+    resumed.run_loop(max_shifts=DOCS)
+    assert resumed.current_context.shift_cycle == baseline.current_context.shift_cycle
+    assert _dump(resumed) == _dump(baseline) and len(_dump(resumed)) > 0
+    history = lambda s: {aid: [e.event_type for e in ledger.history] for aid, ledger in s.ledgers.items()}
+    assert history(resumed) == history(baseline)
+    contexts = StateManager("storage").context_names()
+    assert [int(name[6:10]) for name in contexts] == list(range(1, DOCS + 1))
+    assert not [name for name in os.listdir("storage") if name.endswith(".tmp")]
+    print(f"✅ PASS: Resumed run matches the uninterrupted one ({len(_dump(resumed))} findings).")
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-s", "-q"]))
@@ -0,0 +1,104 @@
+from difflib import SequenceMatcher
+from core.intent.intent_schema import IntentPackage
+from core.context.context_package import ContextPackage, ComplexityLevel, Citation
+from core.ledger.ledger_store import AgentLedger
+from core.security import citation_verifier
+from core.security.citation_verifier import CitationIndex, FUZZY_MAX_CANDIDATES
+from agents.supervisor.agent_3 import SupervisorAgent
+
+PAGES = {
+    (0, 1): "\n--- Page 1 ---\nSection 12.4 (Poison Pill): In the event of a Change of Control, the Com-\npany must pay Vendor Omega a one-time liquidation fee of $10,000,000.\n",
+    (0, 2): "\n--- Page 2 ---\nStandard terms apply.\n",
+    (1, 1): "\n--- Page 1 ---\nThe Neural Engine algorithm remains the personal property of the Employee.\n",
+}
+
+
+def _index():
+    return CitationIndex(lambda d, p: PAGES[(d, p)], ["omega_contract.pdf", "cto_agreement.pdf"], [2, 1])
+
+
+def test_citation_matching():
+    print("🔎 Testing Citation Verification...")
+    index = _index()
+
+    exact = index.verify("omega_contract.pdf", 1, "must pay Vendor Omega a one-time liquidation fee")
+    assert exact.status == "EXACT"
+    drift = index.verify("Omega_Contract", 1, "the Company must pay  Vendor\nOmega")
+    assert drift.status in ("EXACT", "FUZZY")
+    trimmed = index.verify("omega_contract.pdf", 1, "Section 12.4 (Poison Pill) ... liquidation fee of $10,000,000")
+    assert trimmed.status == "EXACT"
+    typo = index.verify("omega_contract.pdf", 1, "one-time liquidation fee of $10,000,000 payable")
+    assert typo.status == "FAILED"
+    near = index.verify("cto_agreement.pdf", 1, "The Neural Engine algorithm remains the personal propery of the Employee")
+    assert near.status == "FUZZY"
+    print("✅ PASS: Exact, whitespace/hyphenation drift and near-verbatim quotes accepted.")
+
+    assert index.verify("omega_contract.pdf", 2, "liquidation fee").status == "FAILED"
+    assert index.verify("omega_contract.pdf", 9, "liquidation fee").reason == "Page 9 does not exist"
+    assert index.verify("ghost.pdf", 1, "liquidation fee").reason == "Unknown document"
+    print("✅ PASS: Wrong page, missing page and unknown document rejected.")
+
+    for junk in ("-- ** --", "!!! ... ???", "a ... e", "fee"):
+        assert index.verify("omega_contract.pdf", 1, junk).status == "FAILED"
+    print("✅ PASS: Punctuation-only and too-short quotes rejected.")
+
+
+def test_bulk_verification_is_bounded(monkeypatch):
+    print("🔢 Testing Bulk Verification Cost...")
+    clause = "The Neural Engine algorithm remains the personal property of the Employee. "
+    loads, compared = [], []
+    index = CitationIndex(lambda d, p: loads.append((d, p)) or clause * 200, ["cto_agreement.pdf"], [1])
+
+    class CountingMatcher(SequenceMatcher):
+        def __init__(self, *args, **kwargs):
+            compared.append(1)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(citation_verifier, "SequenceMatcher", CountingMatcher)
+
+    # Both quotes share anchors with all 200 copies of the clause; only the near one is real
+    near = Citation(document_name="cto_agreement.pdf", page_number=1,
+                    verbatim_quote="The Neural Engine algorithm remains the personal propery of the Employee")
+    forged = Citation(document_name="cto_agreement.pdf", page_number=1,
+                      verbatim_quote="The Neural Engine algorithm belongs to the Company, not the Employee")
+    report = index.verify_all([near, forged] * 250)
+    assert [c.status for c in report.checks[:2]] == ["FUZZY", "FAILED"] and len(report.failed) == 250
+
+    # One page load, and a fixed number of fuzzy comparisons per citation however often the anchors repeat
+    assert loads == [(0, 1)]
+    assert len(compared) <= 500 * FUZZY_MAX_CANDIDATES
+    compared.clear()
+    index.verify_all([forged])
+    assert len(compared) == FUZZY_MAX_CANDIDATES
+    print(f"✅ PASS: {report.summary()}, at most {FUZZY_MAX_CANDIDATES} comparisons per citation.")
+
+
+def test_supervisor_rejects_hallucinated_quote():
+    intent = IntentPackage(original_prompt="DD", constraints=[], prohibited_actions=[], success_definition="Done")
+    intent.sign()
+    ledger = AgentLedger(agent_id="Worker_1")
+    supervisor = SupervisorAgent(intent, ledger, _index())
+
+    def shift(quote):
+        return ContextPackage(
+            shift_cycle=1, previous_agent_id="Worker_1",
+            task_state={"identified_risks": [{
+                "category": "Legal", "severity": "HIGH", "description": "Poison pill",
+                "evidence": [{"document_name": "omega_contract.pdf", "page_number": 1, "verbatim_quote": quote}]
+            }]},
+            decisions=[], assumptions=[], open_risks=[],
+            complexity_rating=ComplexityLevel.MEDIUM, confidence_score=0.9, intent_hash_reference=intent.intent_hash
+        )
+
+    assert supervisor.evaluate_handoff(shift("pay Vendor Omega a one-time liquidation fee")) is True
+    assert supervisor.evaluate_handoff(shift("Vendor Omega may terminate for convenience")) is False
+    assert ledger.penalty_points == 1
+    print("✅ PASS: Supervisor rejected the hallucinated quote.")
+
+
+if __name__ == "__main__":
+    import pytest
+    test_citation_matching()
+    with pytest.MonkeyPatch.context() as mp:
+        test_bulk_verification_is_bounded(mp)
+    test_supervisor_rejects_hallucinated_quote()
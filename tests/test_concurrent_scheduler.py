@@ -0,0 +1,52 @@
+from agents.executor.base_executor import BaseExecutor
+from core.audit.persistence import StateManager
+
+DOCS = 8
+LATENCY_MS = 50
+
+
+def _run(workdir, data_room, make_scheduler):
+    data_room(DOCS, workdir)
+    scheduler = make_scheduler(concurrency=4)
+    assert scheduler.data_room.get_total_batches() == DOCS
+    scheduler.run_loop(max_shifts=DOCS)
+    return scheduler
+
+
+def test_concurrent_run_overlaps_and_is_deterministic(tmp_path, monkeypatch, mock_llm, data_room, make_scheduler):
+    print("🏎️ Testing Concurrent Scheduler...")
+    mock_llm(latency_ms=LATENCY_MS, jitter_ms=50)
+
+    active, peaks = [0], []
+    real_arun_shift = BaseExecutor.arun_shift
+
+    async def arun_shift(self, ctx, deadline=None):
+        active[0] += 1
+        peaks.append(active[0])
+        try:
+            return await real_arun_shift(self, ctx, deadline)
+        finally:
+            active[0] -= 1
+
+    monkeypatch.setattr(BaseExecutor, "arun_shift", arun_shift)
+    first = _run(tmp_path / "a", data_room, make_scheduler)
+    second = _run(tmp_path / "b", data_room, make_scheduler)
+
+    # Four shifts awaited the LLM at once (a serial run never has more than one)
+    assert max(peaks) == 4 and len(peaks) == 2 * DOCS
+    print(f"✅ PASS: {DOCS} shifts with up to {max(peaks)} in flight.")
+
+    # Committed in batch order with contiguous shift numbers
+    assert first.current_context.shift_cycle == DOCS
+    contexts = StateManager(str(tmp_path / "a" / "storage")).context_names()
+    assert [int(name[6:10]) for name in contexts] == list(range(1, DOCS + 1))
+
+    # Same register on every run, whatever order the LLM answers came back in
+    dump = lambda s: [r.model_dump() for r in s.current_context.cumulative_risk_register]
+    assert dump(first) == dump(second) and len(dump(first)) > 0
+    print(f"✅ PASS: Deterministic commits ({len(dump(first))} findings, identical across runs).")
+
+
+if __name__ == "__main__":
+    import sys, pytest
+    sys.exit(pytest.main([__file__, "-s", "-q"]))
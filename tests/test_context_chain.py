@@ -0,0 +1,114 @@
+import json
+import os
+from core.audit.context_chain import ContextChain
+from core.audit.persistence import StateManager
+from core.context.context_package import ContextPackage, RiskFinding, Citation
+from core.context.risk_register import RiskRegister
+
+SHIFTS = 40
+INTERVAL = 8
+
+
+def _risk(n):
+    return RiskFinding(category="Legal", severity="HIGH", description=f"Finding {n} about a change of control clause",
+                       evidence=[Citation(document_name=f"doc_{n}.pdf", page_number=1, verbatim_quote=f"quote {n}")])
+
+
+def _shifts():
+    """SHIFTS contexts, each adding three findings to the previous register (as the scheduler does)."""
+    register = RiskRegister()
+    contexts = []
+    for cycle in range(1, SHIFTS + 1):
+        register = register + [_risk(cycle * 10 + k) for k in range(3)]
+        contexts.append(ContextPackage(
+            shift_cycle=cycle, previous_agent_id=f"Agent_{cycle % 2 + 1}", task_state={"summary": f"Shift {cycle}"},
+            cumulative_risk_register=register, decisions=[f"d{cycle}"], assumptions=[], open_risks=[],
+            confidence_score=0.9, complexity_rating="LOW", intent_hash_reference="h"))
+    return contexts
+
+
+def _name(ctx):
+    return f"shift_{ctx.shift_cycle:04d}_{ctx.package_id[:8]}.json"
+
+
+def test_chain_round_trip(tmp_path):
+    print("🔗 Testing Delta-Encoded Context Chain...")
+    contexts = _shifts()
+    for compress in (False, True):
+        chain = ContextChain(str(tmp_path / f"chain_{compress}"), keyframe_interval=INTERVAL, compress=compress)
+        for ctx in contexts:
+            chain.save(_name(ctx), ctx)
+
+        # 1. Keyframe every INTERVAL shifts, deltas in between
+        kinds = [chain._read(name)["kind"] for name in chain.names()]
+        assert kinds == (["keyframe"] + ["delta"] * (INTERVAL - 1)) * (SHIFTS // INTERVAL)
+
+        # 2. Any shift reads back exactly, from a fresh reader, touching at most INTERVAL files
+        reader = ContextChain(chain.chain_dir)
+        reads = []
+        real_read = reader._read
+        reader._read = lambda name: reads.append(name) or real_read(name)
+        for ctx in (contexts[0], contexts[INTERVAL - 1], contexts[-1], contexts[SHIFTS // 2 + 3]):
+            reads.clear()
+            assert reader.load(_name(ctx)).model_dump() == ctx.model_dump()
+            assert len(reads) <= INTERVAL
+        print(f"✅ PASS: Shifts rebuild exactly (compress={compress}).")
+
+    # 3. Much smaller than full snapshots
+    plain = tmp_path / "chain_False"
+    chain_bytes = sum(os.path.getsize(plain / n) for n in os.listdir(plain))
+    snapshot_bytes = sum(len(ctx.model_dump_json(indent=2)) for ctx in contexts)
+    packed_bytes = sum(os.path.getsize(tmp_path / "chain_True" / n) for n in os.listdir(tmp_path / "chain_True"))
+    assert chain_bytes * 4 < snapshot_bytes and packed_bytes < chain_bytes
+    print(f"✅ PASS: {snapshot_bytes:,} bytes of snapshots -> {chain_bytes:,} chained, {packed_bytes:,} compressed.")
+
+
+def test_rewritten_register_is_a_keyframe_and_export(tmp_path):
+    print("📤 Testing Keyframes on Rewrite and Export...")
+    contexts = _shifts()[:5]
+    chain = ContextChain(str(tmp_path / "chain"), keyframe_interval=INTERVAL)
+    for ctx in contexts:
+        chain.save(_name(ctx), ctx)
+
+    # A retired/consolidated register is not an extension of its parent
+    pruned = contexts[-1].model_copy(update={"shift_cycle": 6, "cumulative_risk_register": list(contexts[-1].cumulative_risk_register)[3:]})
+    pruned = ContextPackage(**pruned.model_dump())
+    chain.save(_name(pruned), pruned)
+    assert chain._read(_name(pruned))["kind"] == "keyframe"
+
+    written = chain.export(str(tmp_path / "contexts"))
+    assert written == chain.names() and len(written) == 6
+    with open(tmp_path / "contexts" / written[3]) as f:
+        assert json.load(f) == json.loads(contexts[3].model_dump_json())
+    assert chain.export(str(tmp_path / "latest"), latest_only=True) == [_name(pruned)]
+    print("✅ PASS: Rewrites start a keyframe; export writes full snapshots.")
+
+
+def test_upgrade_from_snapshot_layout(tmp_path):
+    print("📦 Testing Upgrade of Pre-Chain Storage...")
+    contexts = _shifts()[:6]
+    # The old layout: one full snapshot per shift in storage/contexts/
+    os.makedirs(tmp_path / "contexts")
+    for ctx in contexts:
+        with open(tmp_path / "contexts" / _name(ctx), "w") as f:
+            f.write(ctx.model_dump_json(indent=2))
+
+    state = StateManager(str(tmp_path))
+    assert state.context_names() == [_name(ctx) for ctx in contexts]
+    assert state.load_context(_name(contexts[2])).model_dump() == contexts[2].model_dump() # A checkpoint's context_file
+    latest = state.load_latest_context()
+    assert latest.model_dump() == contexts[-1].model_dump()
+
+    # The next shift extends the imported register as a delta; a reopen does not import twice
+    following = latest.model_copy(update={"shift_cycle": 7, "cumulative_risk_register": latest.cumulative_risk_register + [_risk(999)]})
+    state.save_context(following)
+    assert state.chain._read(_name(following))["kind"] == "delta"
+    assert StateManager(str(tmp_path), backend="sqlite").context_names() == [_name(ctx) for ctx in contexts + [following]]
+    print(f"✅ PASS: {len(contexts)} snapshots imported; the run carries on from shift {latest.shift_cycle}.")
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    for test in (test_chain_round_trip, test_rewritten_register_is_a_keyframe_and_export, test_upgrade_from_snapshot_layout):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(pathlib.Path(tmp))
@@ -0,0 +1,169 @@
+import os
+import tempfile
+from concurrent.futures import Future
+from core.simulation.real_data_room import RealDataRoom, _windowed
+from core.simulation.parse_cache import ParseCache
+
+
+def _grid(rows):
+    """Content stream for a ruled table: one cell per string, 100x20pt cells."""
+    ops = []
+    for r, row in enumerate(rows):
+        for c, cell in enumerate(row):
+            ops.append(f"BT /F1 10 Tf {76 + c * 100} {606 - r * 20} Td ({cell}) Tj ET")
+    top, bottom, right = 620, 620 - 20 * len(rows), 72 + 100 * len(rows[0])
+    ops += [f"72 {620 - r * 20} m {right} {620 - r * 20} l S" for r in range(len(rows) + 1)]
+    ops += [f"{72 + c * 100} {top} m {72 + c * 100} {bottom} l S" for c in range(len(rows[0]) + 1)]
+    return " ".join(ops)
+
+
+def _write_pdf(path, pages, tables=None):
+    """
+    Writes a bare-bones PDF with one line of Helvetica text per entry in `pages`.
+    `tables` maps a page index to rows of cells drawn as a ruled table.
+    """
+    tables = tables or {}
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for n, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        if n in tables:
+            stream += " " + _grid(tables[n])
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {content_id} 0 R /Resources << /Font << /F1 3 0 R >> >> >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for num, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def _make_room(folder):
+    _write_pdf(os.path.join(folder, "b_lease.pdf"), ["Lease term expires 2026."])
+    _write_pdf(os.path.join(folder, "a_credit.pdf"), [f"Credit page {n}" for n in range(1, 8)])
+
+
+def test_parallel_matches_serial():
+    print("📂 Testing Parallel Ingestion...")
+    with tempfile.TemporaryDirectory() as folder:
+        _make_room(folder)
+        serial = RealDataRoom(folder, workers=1)
+        parallel = RealDataRoom(folder, workers=2, pages_per_task=3)
+
+        assert serial.get_total_docs() == 2
+        assert serial.documents == parallel.documents
+        print("✅ PASS: Process pool output is identical to in-process parsing.")
+
+        doc = parallel.get_batch_for_shift(0)
+        assert doc.startswith("[DOCUMENT START: a_credit.pdf]")
+        assert "--- Page 7 ---\nCredit page 7" in doc
+        assert doc.index("--- Page 3 ---") < doc.index("--- Page 4 ---")
+        assert set(parallel.load_timings) == {"a_credit.pdf", "b_lease.pdf"}
+        print("✅ PASS: Alphabetical order and page order preserved across page ranges.")
+
+        assert parallel.get_page(0, 3) == "\n--- Page 3 ---\nCredit page 3\n"
+        assert parallel.documents.page_count(1) == 1
+        assert 2 not in parallel.documents
+        print("✅ PASS: Single pages are served from the memory-mapped page store.")
+
+
+def test_submit_window_is_bounded():
+    submitted = []
+
+    class _Pool:
+        def submit(self, fn, *args):
+            submitted.append(args)
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+    consumed = 0
+    for future in _windowed(_Pool(), lambda n: n * n, ((n,) for n in range(50)), window=4):
+        assert len(submitted) - consumed <= 4 # Never more than the window ahead of the reader
+        assert future.result() == consumed ** 2
+        consumed += 1
+    assert consumed == len(submitted) == 50
+    print("✅ PASS: Page-range tasks are submitted a window at a time, results in order.")
+
+
+def test_batches_split_large_documents():
+    print("📦 Testing Token-Budgeted Batches...")
+    with tempfile.TemporaryDirectory() as folder:
+        _make_room(folder)
+        packed = RealDataRoom(folder, workers=1)
+        assert packed.get_total_batches() == 1
+        assert "[DOCUMENT START: b_lease.pdf]" in packed.get_batch_for_shift(0)
+
+        split = RealDataRoom(folder, workers=1, token_budget=60)
+        assert split.get_total_batches() > 1
+        first = split.get_batch_for_shift(0)
+        assert "[PART: Pages 1-" in first and "--- Page 1 ---" in first
+        assert "--- Page 7 ---" not in first
+        assert "NO NEW DOCUMENTS" in split.get_batch_for_shift(split.get_total_batches())
+        print(f"✅ PASS: Small budget split the 7-page document into {split.get_total_batches()} shifts.")
+
+
+def test_tiered_table_extraction():
+    print("🗂️ Testing Tiered Extraction...")
+    with tempfile.TemporaryDirectory() as folder:
+        rows = [["Customer", "Revenue"], ["Acme", "40%"], ["Globex", "12%"]]
+        _write_pdf(os.path.join(folder, "financials.pdf"), ["Notes", "Customer schedule", "More notes"], tables={1: rows})
+        room = RealDataRoom(folder, workers=1)
+
+        assert room.extraction_stats["pages_plain"] == 2
+        assert room.extraction_stats["pages_tabular"] == 1
+        assert room.extraction_stats["tables_found"] == 1
+        assert "| Customer | Revenue |\n| --- | --- |\n| Acme | 40% |" in room.get_page(0, 2)
+        assert "[DETECTED TABLES]" not in room.get_page(0, 1)
+        print("✅ PASS: Only the ruled page went through table extraction.")
+
+
+def test_table_to_markdown():
+    assert RealDataRoom._table_to_markdown([["A", None], ["1", "2"]]) == "\n\n| A |  |\n| --- | --- |\n| 1 | 2 |\n\n"
+    assert RealDataRoom._table_to_markdown([["only header"]]) == ""
+
+
+def test_parse_cache_warm_restart():
+    print("📦 Testing Parse Cache...")
+    with tempfile.TemporaryDirectory() as folder, tempfile.TemporaryDirectory() as cache_dir:
+        _make_room(folder)
+        cold = RealDataRoom(folder, workers=1, cache=ParseCache(cache_dir))
+        warm_cache = ParseCache(cache_dir)
+        warm = RealDataRoom(folder, workers=1, cache=warm_cache)
+
+        assert warm_cache.hits == 2 and warm_cache.misses == 0
+        assert warm.documents == cold.documents
+        print("✅ PASS: Warm restart served every document from the cache.")
+
+        # Changing the bytes changes the content hash -> miss
+        _write_pdf(os.path.join(folder, "b_lease.pdf"), ["Lease term expires 2031."])
+        edited_cache = ParseCache(cache_dir)
+        edited = RealDataRoom(folder, workers=1, cache=edited_cache)
+        assert edited_cache.hits == 1 and edited_cache.misses == 1
+        assert "2031" in edited.documents[1]
+        print("✅ PASS: Edited PDF was re-parsed.")
+
+        assert edited_cache.stats()["entries"] == 3
+        edited_cache.prune(max_bytes=0)
+        assert edited_cache.stats()["entries"] == 0
+        print("✅ PASS: Prune evicts down to the size bound.")
+
+
+if __name__ == "__main__":
+    test_parallel_matches_serial()
+    test_submit_window_is_bounded()
+    test_batches_split_large_documents()
+    test_tiered_table_extraction()
+    test_table_to_markdown()
+    test_parse_cache_warm_restart()
@@ -0,0 +1,105 @@
+import time
+import asyncio
+import tempfile
+import pytest
+from pydantic import BaseModel
+from core.llm.llm_client import LLMClient, DeadlineExceeded
+from core.llm.rate_limiter import RateLimiter
+from core.llm.response_cache import ResponseCache
+from core.llm.providers import LLMProvider, ProviderResponse
+from core.llm.latency_tracker import LatencyTracker
+from core.llm.token_estimator import estimate_tokens
+from core.llm.usage import estimate_cost
+from core.config.settings import load_system_settings, _parse_flat_yaml
+
+
+class _Answer(BaseModel):
+    verdict: str
+
+
+class _Scripted(LLMProvider):
+    """Call i sleeps delays[i] seconds (the last delay repeats). Records cancellations."""
+    def __init__(self, delays):
+        self.delays = delays
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate(self, model, system_prompt, user_prompt, schema):
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return ProviderResponse(text='{"verdict": "ok"}', prompt_tokens=10, response_tokens=5)
+
+
+def _client(provider, **kwargs):
+    return LLMClient(limiter=RateLimiter(requests_per_minute=6000), cache=ResponseCache(mode="off"), provider=provider, **kwargs)
+
+
+def test_call_deadline_cancels():
+    print("⌛ Testing Deadlines...")
+    provider = _Scripted([30])
+    client = _client(provider, call_timeout_seconds=0.3)
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        client.get_structured_completion("sys", "user", _Answer)
+    assert time.monotonic() - started < 2
+    time.sleep(0.05)
+    assert provider.cancelled == 1
+    print("✅ PASS: Call deadline cancels the in-flight request.")
+
+    # A caller's (shift) deadline is tighter than the client's own
+    client = _client(_Scripted([30]), call_timeout_seconds=60)
+    with pytest.raises(DeadlineExceeded):
+        client.get_structured_completion_with_usage("sys", "user", _Answer, deadline=time.monotonic() + 0.2)
+    print("✅ PASS: Shift deadline propagates to the call.")
+
+
+def test_stuck_attempt_is_retried():
+    provider = _Scripted([30, 0])
+    client = _client(provider, attempt_timeout_seconds=0.2)
+    answer, usage = client.get_structured_completion_with_usage("sys", "user", _Answer)
+    assert answer.verdict == "ok"
+    assert usage.timed_out_attempts == 1 and usage.retries == 1
+    print("✅ PASS: A stuck request is cancelled and retried.")
+
+
+def test_hedged_request_wins():
+    tracker = LatencyTracker(min_samples=5, min_hedge_seconds=0)
+    for _ in range(5):
+        tracker.record(0.05)
+    provider = _Scripted([30, 0.01])
+    client = _client(provider, hedge=True, latency=tracker)
+
+    started = time.monotonic()
+    answer, usage = client.get_structured_completion_with_usage("sys", "user", _Answer)
+    assert answer.verdict == "ok" and usage.hedges == 1
+    # Billed for the winner's reported tokens plus the duplicate's estimated prompt
+    assert usage.prompt_tokens == 10 + estimate_tokens("sys") + estimate_tokens("user") and usage.response_tokens == 5
+    assert abs(usage.cost_usd - estimate_cost(client.model_name, usage.prompt_tokens, 5)) < 1e-12
+    assert time.monotonic() - started < 2
+    time.sleep(0.05)
+    assert provider.cancelled == 1 # The slow original was cancelled
+    assert tracker.count == 6
+    print(f"✅ PASS: Hedge fired after p95 ({tracker.summary()}).")
+
+
+def test_system_settings():
+    settings = load_system_settings()
+    assert settings.max_shift_duration_seconds == settings.max_shift_duration_hours * 3600
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml") as f:
+        f.write("max_shift_duration_hours: 2 # short shifts\nllm_hedge_requests: false\n")
+        f.flush()
+        assert load_system_settings(f.name).max_shift_duration_hours == 2
+        with open(f.name) as g:
+            assert _parse_flat_yaml(g.read()) == {"max_shift_duration_hours": "2", "llm_hedge_requests": False}
+
+
+if __name__ == "__main__":
+    test_call_deadline_cancels()
+    test_stuck_attempt_is_retried()
+    test_hedged_request_wins()
+    test_system_settings()
@@ -0,0 +1,72 @@
+import random
+from core.context.context_package import RiskFinding, Citation
+from core.context.dedup_index import DedupIndex
+
+_VOCAB = ("lease warranty escrow indemnity pension deficit covenant breach licence exclusivity supplier customer "
+          "receivable impairment litigation audit retention severance patent trademark royalty tax penalty "
+          "environmental permit zoning insurance claim guarantee debt refinancing liquidity churn").split()
+
+
+def _risk(description, category="Legal", doc="contract.pdf", page=1):
+    return RiskFinding(category=category, severity="HIGH", description=description,
+                       evidence=[Citation(document_name=doc, page_number=page, verbatim_quote="...")])
+
+
+def test_near_duplicates():
+    print("♻️ Testing Dedup Index...")
+    index = DedupIndex()
+    index.add(_risk("The company must pay Vendor Omega a $10,000,000 liquidation fee on a change of control.", doc="omega.pdf", page=4))
+    index.add(_risk("The Neural Engine algorithm is owned personally by the CTO, not the company.", category="IP", doc="cto.pdf"))
+
+    reworded = _risk("On a change of control the company owes Vendor Omega a liquidation fee of $10,000,000.", doc="other.pdf", page=9)
+    assert index.find_duplicate(reworded) == 0
+    print("✅ PASS: Reworded duplicate caught.")
+
+    same_opening = _risk("The company must pay Vendor Omega monthly storage charges under the logistics agreement.", doc="other.pdf", page=2)
+    assert index.find_duplicate(same_opening) is None
+    print("✅ PASS: Unrelated risk sharing an opening phrase kept.")
+
+    same_page = _risk("Change of control triggers a liquidation fee owed to Omega.", doc="Omega.pdf", page=4)
+    assert index.find_duplicate(same_page) == 0
+    other_category = _risk("On a change of control the company owes Vendor Omega a liquidation fee of $10,000,000.", category="Financial")
+    assert index.find_duplicate(other_category) is None
+    print("✅ PASS: Same cited page lowers the bar; categories never mix.")
+
+
+class _CountingList(list):
+    """Signature store that counts how many stored findings a lookup compares against."""
+    reads = 0
+
+    def __getitem__(self, idx):
+        self.reads += 1
+        return super().__getitem__(idx)
+
+
+def test_lookup_cost_is_flat():
+    rng = random.Random(0)
+    index = DedupIndex()
+    index._signatures = _CountingList()
+    compared = {}
+    for n in range(10_000):
+        risk = _risk(" ".join(rng.sample(_VOCAB, 8)) + f" item{n}", category=rng.choice(["Legal", "Financial", "HR"]),
+                     doc=f"doc_{n % 500}.pdf", page=n % 40)
+        index.add(risk)
+        if n + 1 in (1_000, 10_000):
+            probes = [_risk(" ".join(rng.sample(_VOCAB, 8)) + " probe", doc="new.pdf") for _ in range(200)]
+            index._signatures.reads = 0
+            per_lookup = []
+            for probe in probes:
+                before = index._signatures.reads
+                index.find_duplicate(probe)
+                per_lookup.append(index._signatures.reads - before)
+            compared[n + 1] = per_lookup
+    # Only bucket-mates are compared, capped at max_candidates, however big the register grows
+    assert max(compared[1_000] + compared[10_000]) <= index.max_candidates
+    assert len(index) == 10_000
+    mean = lambda xs: sum(xs) / len(xs)
+    print(f"✅ PASS: {mean(compared[1_000]):.1f} vs {mean(compared[10_000]):.1f} findings compared per lookup at 1k vs 10k (cap {index.max_candidates}).")
+
+
+if __name__ == "__main__":
+    test_near_duplicates()
+    test_lookup_cost_is_flat()
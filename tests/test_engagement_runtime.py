@@ -0,0 +1,152 @@
+import asyncio
+import json
+import os
+import pytest
+from agents.executor.base_executor import BaseExecutor
+from core.simulation.real_data_room import RealDataRoom
+from core.audit.persistence import StateManager
+from orchestrator.shift_scheduler import ShiftScheduler
+from orchestrator.engagement_runtime import Engagement, EngagementRuntime, load_engagements
+
+
+@pytest.fixture
+def engagement(data_room, make_intent, monkeypatch):
+    """Factory: an engagement with `docs` one-page PDFs in <name>/data_room, planned one document per shift."""
+    real_init = RealDataRoom.__init__
+    monkeypatch.setattr(RealDataRoom, "__init__", lambda self, *a, **kw: real_init(self, *a, **{**kw, "token_budget": 60}))
+
+    def make(name, docs, weight=1.0, **kwargs):
+        data_room(docs, folder=os.path.join(name, "data_room"), clause=lambda n: f"{name} supplier {n} may terminate the contract on 30 days notice.")
+        return Engagement(name=name, intent=make_intent(f"Audit {name}"), data_room=os.path.join(name, "data_room"),
+                          storage=os.path.join(name, "storage"), weight=weight, **kwargs)
+    return make
+
+
+def test_small_deal_is_not_starved(monkeypatch, mock_llm, engagement):
+    print("🏢 Testing Multi-Engagement Runtime...")
+    mock_llm(latency_ms=20)
+
+    commits = []
+    real_commit = ShiftScheduler._commit_shift
+
+    def commit_shift(self, i, agent_id, next_context):
+        commits.append(os.path.basename(os.path.dirname(self.state_manager.root_dir)))
+        return real_commit(self, i, agent_id, next_context)
+
+    monkeypatch.setattr(ShiftScheduler, "_commit_shift", commit_shift)
+
+    # One document per shift, so the big deal has 12 batches and the small one 2
+    runtime = EngagementRuntime([engagement("big", 12), engagement("small", 2)], workers=2)
+    assert [run.max_shifts for run in runtime.runs] == [13, 3]
+    runtime.run()
+
+    # 1. Everything committed, each deal in its own storage root
+    assert commits.count("big") == 13 and commits.count("small") == 3
+    for name, shifts in (("big", 13), ("small", 3)):
+        assert len(StateManager(os.path.join(name, "storage")).context_names()) == shifts
+    print(f"✅ PASS: Both deals completed in separate storage roots ({len(commits)} commits).")
+
+    # 2. Fair share: the small deal finishes long before the big one
+    last_small = max(n for n, name in enumerate(commits) if name == "small")
+    assert last_small < 8
+    print(f"✅ PASS: Small deal finished at commit {last_small + 1} of {len(commits)}.")
+
+
+def test_weights_split_the_pool(monkeypatch, mock_llm, engagement):
+    print("⚖️ Testing Weighted Fair Scheduling...")
+
+    order = []
+    real_prepare = ShiftScheduler._prepare_shift
+
+    def prepare_shift(self, i, slot=None):
+        order.append(self.intent.original_prompt.split()[-1])
+        return real_prepare(self, i, slot)
+
+    monkeypatch.setattr(ShiftScheduler, "_prepare_shift", prepare_shift)
+    EngagementRuntime([engagement("heavy", 6, weight=3.0), engagement("light", 6)], workers=1).run()
+
+    assert order[:8].count("heavy") == 6 and order[:8].count("light") == 2
+    assert len(order) == 14
+    print(f"✅ PASS: Weight 3:1 gave dispatch order {order[:8]}...")
+
+
+def test_one_shift_per_executor(monkeypatch, mock_llm, engagement):
+    print("🪑 Testing Runtime Agent Slots...")
+    mock_llm(latency_ms=20)
+
+    busy, overlaps = set(), []
+    real_arun_shift = BaseExecutor.arun_shift
+
+    async def arun_shift(self, ctx, deadline=None):
+        overlaps.append(self.agent_id in busy)
+        busy.add(self.agent_id)
+        try:
+            await asyncio.sleep(0.02)
+            return await real_arun_shift(self, ctx, deadline)
+        finally:
+            busy.discard(self.agent_id)
+
+    monkeypatch.setattr(BaseExecutor, "arun_shift", arun_shift)
+
+    # Fewer agents than the deal's window: shifts wait for a free executor instead of doubling up
+    runtime = EngagementRuntime([engagement("solo", 4, concurrency=3, agents=2)], workers=4)
+    runtime.run()
+    assert len(overlaps) == 5 and not any(overlaps)
+    assert runtime.runs[0].committed == 5
+    print("✅ PASS: 3 shifts in the window, 2 agents, never two shifts on one executor.")
+
+
+
+def test_map_reduce_engagement(monkeypatch, mock_llm, engagement):
+    print("🗺️ Testing Map-Reduce Engagement...")
+    registers_seen = []
+    real_arun_shift = BaseExecutor.arun_shift
+
+    async def arun_shift(self, ctx, deadline=None):
+        registers_seen.append(len(ctx.cumulative_risk_register))
+        return await real_arun_shift(self, ctx, deadline)
+
+    monkeypatch.setattr(BaseExecutor, "arun_shift", arun_shift)
+    runtime = EngagementRuntime([engagement("mapped", 4, map_reduce=True), engagement("serial", 2)], workers=2)
+    assert [run.max_shifts for run in runtime.runs] == [4, 3]
+    assert [run.window for run in runtime.runs] == [8, 2]
+    runtime.run()
+
+    # Map shifts never see the register; the reduce is committed after the last of them
+    mapped = runtime.runs[0].scheduler
+    assert registers_seen.count(0) >= 4
+    assert mapped.current_context.previous_agent_id == "System_Reduce" and mapped.current_context.shift_cycle == 5
+    assert runtime.runs[1].scheduler.current_context.previous_agent_id != "System_Reduce"
+    print(f"✅ PASS: {mapped.current_context.task_state['summary']}")
+
+
+
+def test_storage_roots_are_checked(tmp_path, monkeypatch):
+    print("🧹 Testing Engagement Storage Checks...")
+    monkeypatch.chdir(tmp_path)
+    intent = {"original_prompt": "Audit", "success_definition": "Done"}
+
+    def load(*pairs):
+        with open("engagements.json", "w") as f:
+            json.dump([{"name": f"deal_{n}", "data_room": room, "storage": storage, "intent": intent}
+                       for n, (room, storage) in enumerate(pairs)], f)
+        return load_engagements("engagements.json")
+
+    assert len(load(("a/data_room", "a/storage"), ("b/data_room", "b/storage"))) == 2
+    # Wiped before a fresh run: never shared, never the data room, above it or inside it
+    bad = [
+        [("a/data_room", "a/storage"), ("b/data_room", "a/../a/storage/")],
+        [("deal", "deal")],
+        [("deal/data_room", "deal")],
+        [("deal", "deal/storage")],
+        [("a/data_room", "a/storage"), ("b/data_room", "a/data_room/storage")],
+    ]
+    for pairs in bad:
+        with pytest.raises(ValueError):
+            load(*pairs)
+    print(f"✅ PASS: {len(bad)} overlapping storage layouts rejected.")
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-s", "-q"]))
@@ -0,0 +1,77 @@
+import os
+import sys
+from types import SimpleNamespace
+import main
+from core.context.context_package import RiskFinding, Citation
+from orchestrator.incremental_sync import plan_sync, retire_findings
+from orchestrator.shift_scheduler import ShiftScheduler
+
+
+class _FakeDataRoom:
+    def __init__(self, files):
+        names = list(files)
+        self.documents = SimpleNamespace(filename=lambda i: names[i])
+        self.doc_hashes = {i: files[name] for i, name in enumerate(names)}
+
+    def get_total_docs(self):
+        return len(self.doc_hashes)
+
+
+def _risk(doc, description):
+    return RiskFinding(
+        category="Legal", severity="HIGH", description=description,
+        evidence=[Citation(document_name=doc, page_number=1, verbatim_quote="...")]
+    )
+
+
+def test_incremental_sync_plan():
+    print("🔄 Testing Incremental Sync...")
+    manifest = {"documents": {
+        "a_lease.pdf": {"sha256": "aaa"},
+        "b_msa.pdf": {"sha256": "bbb"},
+        "c_nda.pdf": {"sha256": "ccc"},
+    }}
+    room = _FakeDataRoom({"a_lease.pdf": "aaa", "b_msa.pdf": "b2b", "d_loan.pdf": "ddd"})
+
+    plan = plan_sync(manifest, room)
+    assert plan.added == ["d_loan.pdf"]
+    assert plan.modified == ["b_msa.pdf"]
+    assert plan.deleted == ["c_nda.pdf"]
+    assert plan.unchanged == ["a_lease.pdf"]
+    assert plan.doc_indices == [1, 2]
+    print(f"✅ PASS: {plan.summary()}")
+
+    register = [
+        _risk("a_lease.pdf", "Lease expires"),
+        _risk("B_MSA", "Change of control payout"),
+        _risk("client_data_room/c_nda.pdf", "Non-solicit missing"),
+    ]
+    kept, retired = retire_findings(register, plan.stale_documents)
+    assert [r.description for r in kept] == ["Lease expires"]
+    assert len(retired) == 2
+    print("✅ PASS: Findings citing replaced or deleted documents were retired.")
+
+
+
+def test_deletion_only_sync_is_reported(monkeypatch, capsys, mock_llm, data_room):
+    print("🗄️ Testing Deletion-Only Sync...")
+    data_room(3)
+    ShiftScheduler(main.default_intent(), cooldown_seconds=0).run_loop(max_shifts=2)
+    monkeypatch.setattr(sys, "argv", ["main.py", "--incremental"])
+
+    # Nothing changed: nothing to report
+    main.main()
+    assert "Data room unchanged" in capsys.readouterr().out
+
+    # A deleted document retires its findings in a System_Sync shift, which is not "unchanged"
+    os.remove(os.path.join("client_data_room", "doc_1.pdf"))
+    main.main()
+    out = capsys.readouterr().out
+    assert "Data room unchanged" not in out
+    assert "findings; no new documents to analyze (+0 new | ~0 changed | -1 deleted" in out
+    print("✅ PASS: Deletion-only sync reports the retired findings.")
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-s", "-q"]))
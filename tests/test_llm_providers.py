@@ -0,0 +1,104 @@
+import asyncio
+import pytest
+from core.intent.intent_schema import IntentPackage
+from core.context.context_package import ContextPackage, ComplexityLevel, Citation
+from core.llm.llm_client import LLMClient
+from core.llm.rate_limiter import RateLimiter
+from core.llm.response_cache import ResponseCache
+from core.llm import providers
+from core.llm.providers import LLMProvider, MockProvider, ProviderError
+from core.security.citation_verifier import CitationIndex
+from agents.executor.base_executor import BaseExecutor, AgentOutput
+
+PAGES = {
+    (0, 1): "Section 12.4 (Poison Pill): In the event of a Change of Control, the Company must pay Vendor Omega a one-time liquidation fee of $10,000,000.",
+    (0, 2): "Either party may terminate this agreement with ninety days written notice to the other party.",
+    (1, 1): "The Neural Engine algorithm remains the personal property of the Employee and is licensed to the Company.",
+}
+NEW_DOCUMENTS = (
+    "[DOCUMENT START: omega_contract.pdf]\n"
+    f"\n--- Page 1 ---\n{PAGES[(0, 1)]}\n\n--- Page 2 ---\n{PAGES[(0, 2)]}\n"
+    "\n[DOCUMENT END: omega_contract.pdf]\n\n"
+    "[DOCUMENT START: cto_agreement.pdf]\n"
+    f"\n--- Page 1 ---\n{PAGES[(1, 1)]}\n"
+    "\n[DOCUMENT END: cto_agreement.pdf]"
+)
+
+
+def _client(provider):
+    return LLMClient(limiter=RateLimiter(requests_per_minute=6000), cache=ResponseCache(mode="off"), provider=provider)
+
+
+def test_mock_answers_are_valid_and_grounded():
+    print("🧪 Testing Mock LLM Provider...")
+    provider = MockProvider(latency_seconds=0, risks_per_response=4)
+    output = _client(provider).get_structured_completion("sys", NEW_DOCUMENTS, AgentOutput)
+
+    assert isinstance(output, AgentOutput)
+    assert len(output.task_state.identified_risks) == 4
+    assert output.confidence_score == 0.9
+    index = CitationIndex(lambda d, p: PAGES[(d, p)], ["omega_contract.pdf", "cto_agreement.pdf"], [2, 1])
+    citations = [Citation(**ev.model_dump()) for r in output.task_state.identified_risks for ev in r.evidence]
+    assert citations and index.verify_all(citations).all_verified
+    print("✅ PASS: Schema-valid output, citations pass verification.")
+
+    again = _client(MockProvider(latency_seconds=0, risks_per_response=4)).get_structured_completion("sys", NEW_DOCUMENTS, AgentOutput)
+    assert again == output
+    print("✅ PASS: Same prompt and seed, same answer.")
+
+
+def test_mock_error_injection(monkeypatch):
+    limiter = RateLimiter(requests_per_minute=6000)
+    monkeypatch.setattr(limiter, "on_throttle", lambda base_pause: 0.0)
+    client = LLMClient(limiter=limiter, cache=ResponseCache(mode="off"), provider=MockProvider(latency_seconds=0, rate_503=1.0))
+    with pytest.raises(ProviderError):
+        client.get_structured_completion("sys", NEW_DOCUMENTS, AgentOutput)
+    assert client.provider.calls == 5 # Retried like a real overload
+
+    flaky = MockProvider(latency_seconds=0, rate_429=0.3, seed=1)
+    client = LLMClient(limiter=limiter, cache=ResponseCache(mode="off"), provider=flaky)
+
+    async def many():
+        return await asyncio.gather(*[client.aget_structured_completion("sys", f"{NEW_DOCUMENTS}\n#{i}", AgentOutput) for i in range(20)])
+    assert len(asyncio.run(many())) == 20
+    assert flaky.calls > 20 and not flaky._attempts # Answered prompts are forgotten
+    print(f"✅ PASS: Injected 429/503s retried ({flaky.calls} calls for 20 answers).")
+
+    monkeypatch.setattr(providers, "MAX_TRACKED_PROMPTS", 3)
+    failing = MockProvider(latency_seconds=0, rate_503=1.0)
+    for i in range(10):
+        with pytest.raises(ProviderError):
+            asyncio.run(failing.generate("m", "sys", f"prompt {i}", {}))
+    assert len(failing._attempts) == 3 # Attempt counters stay bounded
+
+
+def test_provider_interface():
+    with pytest.raises(TypeError): # generate() is abstract
+        LLMProvider()
+
+    class Silent(LLMProvider):
+        pass
+    with pytest.raises(TypeError):
+        Silent()
+    print("✅ PASS: Providers must implement generate().")
+
+
+def test_executor_runs_offline():
+    intent = IntentPackage(original_prompt="Audit the data room", constraints=[], prohibited_actions=[], success_definition="Done")
+    intent.sign()
+    worker = BaseExecutor("Agent_1", intent, llm=_client(MockProvider(latency_seconds=0)))
+    ctx = ContextPackage(
+        shift_cycle=0, previous_agent_id="Orchestrator", task_state={"new_documents": NEW_DOCUMENTS},
+        decisions=[], assumptions=[], open_risks=[], confidence_score=1.0,
+        complexity_rating=ComplexityLevel.LOW, intent_hash_reference=intent.intent_hash
+    )
+    result = worker.run_shift(ctx)
+    assert result.confidence_score == 0.9
+    assert len(result.task_state["identified_risks"]) == 3
+    print("✅ PASS: Executor completes a shift with no API key.")
+
+
+if __name__ == "__main__":
+    test_mock_answers_are_valid_and_grounded()
+    test_provider_interface()
+    test_executor_runs_offline()
@@ -0,0 +1,73 @@
+import json
+from core.llm.llm_client import LLMClient
+from core.llm.rate_limiter import RateLimiter
+from core.llm.response_cache import ResponseCache
+from core.llm.providers import LLMProvider, ProviderResponse
+from core.llm.model_router import ModelRouter
+from core.security.citation_verifier import CitationIndex
+from agents.executor.base_executor import AgentOutput
+
+PAGE = "The landlord may terminate the lease on 30 days notice."
+
+
+class _Scripted(LLMProvider):
+    """Answers with a fixed AgentOutput per model."""
+    def __init__(self, answers):
+        self.answers = answers
+        self.models = []
+
+    async def generate(self, model, system_prompt, user_prompt, schema):
+        self.models.append(model)
+        return ProviderResponse(text=json.dumps(self.answers[model]), prompt_tokens=100, response_tokens=50)
+
+
+def _answer(confidence=0.9, complexity="LOW", quote="may terminate the lease"):
+    risk = {"category": "Legal", "severity": "HIGH", "description": "Termination right.",
+            "evidence": [{"document_name": "lease.pdf", "page_number": 1, "verbatim_quote": quote}]}
+    return {"task_state": {"summary": "ok", "identified_risks": [risk]}, "decisions": ["d"], "assumptions": [],
+            "open_risks": [], "confidence_score": confidence, "complexity_rating": complexity}
+
+
+def _router(fast_answer):
+    provider = _Scripted({"fast": fast_answer, "strong": _answer(confidence=0.97)})
+    make = lambda model: LLMClient(model, limiter=RateLimiter(requests_per_minute=6000), cache=ResponseCache(mode="off"), provider=provider)
+    index = CitationIndex(lambda d, p: PAGE, ["lease.pdf"], [1])
+    return ModelRouter(make("fast"), make("strong"), citation_index=index, strictness=0.8), provider
+
+
+def test_cascade_escalates_only_on_signals():
+    print("🔀 Testing Model Cascade...")
+    router, provider = _router(_answer())
+    output, calls, decision = router.complete("sys", "user", AgentOutput)
+    assert provider.models == ["fast"] and not decision.escalated
+    assert output.confidence_score == 0.9 and len(calls) == 1
+    print(f"✅ PASS: Boilerplate stays on the fast model: {decision.summary()}")
+
+    cases = [
+        (_answer(complexity="HIGH"), "complexity HIGH"),
+        (_answer(confidence=0.6), "confidence 0.60 < 0.80"),
+        (_answer(quote="may sell the building"), "1 unverified citations"),
+    ]
+    for fast_answer, reason in cases:
+        router, provider = _router(fast_answer)
+        output, calls, decision = router.complete("sys", "user", AgentOutput)
+        assert provider.models == ["fast", "strong"]
+        assert decision.reasons == [reason] and decision.final_model == "strong"
+        assert output.confidence_score == 0.97
+        assert [c.model for c in calls] == ["fast", "strong"]
+        print(f"✅ PASS: Escalated: {decision.summary()}")
+
+
+def test_failed_escalation_keeps_fast_answer():
+    router, provider = _router(_answer(complexity="HIGH"))
+    del provider.answers["strong"] # Strong model errors out
+    output, calls, decision = router.complete("sys", "user", AgentOutput)
+    assert output.confidence_score == 0.9 and decision.final_model == "fast"
+    assert decision.escalation_error
+    assert [c.model for c in calls] == ["fast", "strong"] and calls[1].wall_seconds > 0 # Failed call still booked
+    print("✅ PASS: A failing strong model never loses the fast answer.")
+
+
+if __name__ == "__main__":
+    test_cascade_escalates_only_on_signals()
+    test_failed_escalation_keeps_fast_answer()
@@ -0,0 +1,60 @@
+import asyncio
+from types import SimpleNamespace
+from pydantic import BaseModel
+from core.llm.rate_limiter import RateLimiter
+from core.llm.llm_client import LLMClient
+from core.llm.providers import GeminiProvider
+
+
+class _Answer(BaseModel):
+    verdict: str
+
+
+class _FlakyModels:
+    """Fails with a 429 the first time, then answers."""
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content(self, model, contents, config):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("429 RESOURCE_EXHAUSTED")
+        return SimpleNamespace(parsed=None, text='{"verdict": "ok"}')
+
+
+def test_token_bucket_pacing():
+    print("⏱️ Testing Rate Limiter...")
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000, burst_seconds=10)
+
+    # Burst capacity: 10 requests / 1,000 tokens go out immediately
+    assert all(limiter.reserve(100) == 0 for _ in range(10))
+    # The next one has to wait for ~100 tokens at 100 tokens/s
+    assert 0.9 < limiter.reserve(100) < 1.1
+    print("✅ PASS: Budget paces callers instead of letting them burst.")
+
+    limiter.on_throttle(base_pause=2.0)
+    assert limiter.rate_scale == 0.5
+    assert limiter.reserve(1) >= 1.9
+    limiter.on_success()
+    assert limiter.rate_scale == 0.55
+    print("✅ PASS: A 429 halves the rate and pauses the budget.")
+
+
+def test_client_retries_through_limiter(monkeypatch):
+    limiter = RateLimiter()
+    models = _FlakyModels()
+    client = LLMClient(limiter=limiter, provider=GeminiProvider(client=SimpleNamespace(aio=SimpleNamespace(models=models))))
+    monkeypatch.setattr(limiter, "on_throttle", lambda base_pause: 0.0)
+
+    answer = client.get_structured_completion("sys", "user", _Answer)
+    assert answer.verdict == "ok"
+    assert models.calls == 2
+
+    async def many():
+        return await asyncio.gather(*[client.aget_structured_completion("sys", "user", _Answer) for _ in range(5)])
+    assert [a.verdict for a in asyncio.run(many())] == ["ok"] * 5
+    print("✅ PASS: Sync wrapper and async API share one client and budget.")
+
+
+if __name__ == "__main__":
+    test_token_bucket_pacing()
@@ -0,0 +1,63 @@
+from core.context.context_package import RiskFinding
+from core.context.register_digest import RegisterDigest
+from core.llm.token_estimator import estimate_tokens
+
+
+def _risk(category, severity, description):
+    return RiskFinding(category=category, severity=severity, description=description, evidence=[])
+
+
+def _register(n):
+    topics = ["lease renewal", "environmental permit", "pension deficit", "customer concentration", "tax audit"]
+    return [
+        _risk(["Legal", "Financial", "Operational"][i % 3], ["HIGH", "MEDIUM", "LOW"][i % 3],
+              f"Finding {i}: exposure around {topics[i % len(topics)]} in subsidiary unit{i}.")
+        for i in range(n)
+    ]
+
+
+def test_small_register_passes_through():
+    print("🗂️ Testing Register Digest...")
+    digest = RegisterDigest(token_cap=4000)
+    register = _register(5)
+    text = digest.render(register, "anything")
+    assert text == "\n".join(f"- [{r.severity}] {r.category}: {r.description}" for r in register)
+    assert digest.render([], "anything") == "None."
+    print("✅ PASS: Small register sent whole.")
+
+
+def test_large_register_is_capped_and_relevant():
+    digest = RegisterDigest(token_cap=1000)
+    register = _register(500)
+    new_docs = "The landlord has not confirmed the lease renewal for the Austin site (unit137)."
+    text = digest.render(register, new_docs)
+
+    assert estimate_tokens(text) <= 1000
+    assert "Finding 137:" in text # Best match: shares both the topic and the unit
+    assert "lease renewal" in text
+    assert "Other prior findings, not shown" in text
+    assert "- Legal:" in text and "HIGH" in text
+    print(f"✅ PASS: 500 findings digested to ~{estimate_tokens(text)} tokens.")
+
+
+def test_digest_follows_register_changes():
+    digest = RegisterDigest(token_cap=400)
+    register = _register(200)
+    digest.render(register, "pension deficit")
+
+    # Appended findings are indexed incrementally
+    register.append(_risk("Legal", "HIGH", "Undisclosed litigation over the zeppelin fleet."))
+    assert "zeppelin" in digest.render(register, "zeppelin fleet litigation")
+
+    # A rewritten register (e.g. findings retired by a sync) triggers a rebuild
+    rewritten = register[50:]
+    text = digest.render(rewritten, "tax audit unit10")
+    assert "Finding 10:" not in text
+    assert f"of {len(rewritten)} prior findings" in text
+    print("✅ PASS: Digest tracks appended and rewritten registers.")
+
+
+if __name__ == "__main__":
+    test_small_register_passes_through()
+    test_large_register_is_capped_and_relevant()
+    test_digest_follows_register_changes()
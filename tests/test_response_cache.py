@@ -0,0 +1,50 @@
+import tempfile
+import pytest
+from types import SimpleNamespace
+from pydantic import BaseModel
+from core.llm.llm_client import LLMClient
+from core.llm.providers import GeminiProvider
+from core.llm.response_cache import ResponseCache, CacheMissError
+
+
+class _Answer(BaseModel):
+    verdict: str
+
+
+class _CountingModels:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content(self, model, contents, config):
+        self.calls += 1
+        return SimpleNamespace(parsed=None, text='{"verdict": "' + contents + '"}')
+
+
+def test_record_then_replay(monkeypatch):
+    print("📼 Testing LLM Response Cache...")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        models = _CountingModels()
+        provider = GeminiProvider(client=SimpleNamespace(aio=SimpleNamespace(models=models)))
+        recorder = LLMClient(cache=ResponseCache(cache_dir, mode="read_write"), provider=provider)
+
+        assert recorder.get_structured_completion("sys", "first", _Answer).verdict == "first"
+        assert recorder.get_structured_completion("sys", "first", _Answer).verdict == "first"
+        assert models.calls == 1
+        print("✅ PASS: Second identical request served from disk.")
+
+        # Replay needs no key and no network
+        monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+        replayer = LLMClient(cache=ResponseCache(cache_dir, mode="replay"))
+        assert replayer.provider is None
+        assert replayer.get_structured_completion("sys", "first", _Answer).verdict == "first"
+        with pytest.raises(CacheMissError):
+            replayer.get_structured_completion("sys", "never recorded", _Answer)
+        print("✅ PASS: Replay serves recordings and fails loudly on a miss.")
+
+
+def test_key_covers_schema():
+    a = ResponseCache.make_key("m", "sys", "user", {"type": "object"})
+    b = ResponseCache.make_key("m", "sys", "user", {"type": "array"})
+    assert a != b
+    with pytest.raises(ValueError):
+        ResponseCache(mode="sometimes")
@@ -0,0 +1,73 @@
+import copy
+from core.context.context_package import ContextPackage, RiskFinding, Citation
+from core.context.risk_register import RiskRegister, CHUNK_SIZE
+
+
+def _risk(n):
+    return RiskFinding(category="Legal", severity="HIGH", description=f"Finding {n}",
+                       evidence=[Citation(document_name=f"doc_{n}.pdf", page_number=1, verbatim_quote=f"quote {n}")])
+
+
+def _context(register):
+    return ContextPackage(shift_cycle=1, previous_agent_id="Agent_1", task_state={}, cumulative_risk_register=register,
+                          decisions=[], assumptions=[], open_risks=[], confidence_score=1.0,
+                          complexity_rating="LOW", intent_hash_reference="h")
+
+
+def test_versions_share_structure():
+    print("🧱 Testing Persistent Risk Register...")
+    findings = [_risk(n) for n in range(CHUNK_SIZE * 3 + 10)]
+    base = RiskRegister(findings[:CHUNK_SIZE * 2 + 5])
+    grown = base + findings[CHUNK_SIZE * 2 + 5:]
+
+    # 1. Old version untouched, new version complete, in order
+    assert len(base) == CHUNK_SIZE * 2 + 5 and len(grown) == len(findings)
+    assert list(grown) == findings and grown == findings
+    assert grown[CHUNK_SIZE] is findings[CHUNK_SIZE] and grown[-1] is findings[-1]
+    assert grown[3:6] == findings[3:6]
+    assert grown.shares_chunks_with(base) == 2
+    print("✅ PASS: Appending shares every full chunk and leaves the old version intact.")
+
+    # 2. Branching from an old version (a rejected shift) doesn't disturb the other branch
+    branch = base + [_risk(-1)]
+    assert len(branch) == len(base) + 1 and branch[-1].description == "Finding -1"
+    assert grown[len(base)] is findings[len(base)]
+    print("✅ PASS: Branches are independent.")
+
+
+def test_contexts_reference_without_copying():
+    print("🔗 Testing Context Hand-off...")
+    register = RiskRegister(_risk(n) for n in range(10))
+    ctx = _context(register)
+    assert ctx.cumulative_risk_register is register # No re-validation of the findings
+    assert ctx.model_copy(deep=True).cumulative_risk_register is register
+    assert copy.deepcopy(register) is register
+
+    # JSON on disk is still a plain list of findings
+    data = ctx.model_dump()
+    assert isinstance(data["cumulative_risk_register"], list) and data["cumulative_risk_register"][0]["description"] == "Finding 0"
+    loaded = ContextPackage.model_validate_json(ctx.model_dump_json())
+    assert isinstance(loaded.cumulative_risk_register, RiskRegister) and loaded.cumulative_risk_register == register
+    print("✅ PASS: Contexts share the register version; JSON round-trips as a list.")
+
+
+def test_append_cost_does_not_grow_with_register():
+    print("🧮 Testing Append Cost...")
+    batch = [_risk(n) for n in range(20)]
+    register = RiskRegister(batch * (100_000 // len(batch)))
+
+    for _ in range(200):
+        grown = register + batch
+        # Every full chunk of the old version is reused by identity...
+        shared = grown.shares_chunks_with(register)
+        assert shared == len(register) // CHUNK_SIZE and grown.extends(register)
+        # ...so all the append builds is the old tail plus the new findings
+        rebuilt = len(grown) - shared * CHUNK_SIZE
+        assert rebuilt < CHUNK_SIZE + len(batch)
+        register = grown
+    print(f"✅ PASS: 200 appends at ~100k findings reused every full chunk ({register!r}).")
+
+if __name__ == "__main__":
+    test_versions_share_structure()
+    test_contexts_reference_without_copying()
+    test_append_cost_does_not_grow_with_register()
@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+from core.audit.persistence import StateManager
+from core.audit.sqlite_store import SQLiteStore
+from core.config.settings import SystemSettings
+from core.context.context_package import ContextPackage, RiskFinding, Citation
+from core.context.risk_register import RiskRegister
+from core.ledger.ledger_store import AgentLedger
+from orchestrator import shift_scheduler
+
+SHIFTS = 10
+REWRITE_AT = 6
+
+
+def _risk(n):
+    return RiskFinding(category="Legal" if n % 2 else "Financial", severity="HIGH" if n % 3 == 0 else "LOW",
+                       description=f"Finding {n}",
+                       evidence=[Citation(document_name=f"doc_{n % 4}.pdf", page_number=n % 5 + 1, verbatim_quote=f"quote {n}")])
+
+
+def _shifts():
+    """Each shift adds two findings; shift REWRITE_AT drops the first three (as a retirement would)."""
+    register = RiskRegister()
+    contexts = []
+    for cycle in range(1, SHIFTS + 1):
+        register = register + [_risk(cycle * 10), _risk(cycle * 10 + 1)]
+        if cycle == REWRITE_AT:
+            register = RiskRegister(list(register)[3:])
+        contexts.append(ContextPackage(
+            shift_cycle=cycle, previous_agent_id=f"Agent_{cycle % 2 + 1}", task_state={"summary": f"Shift {cycle}"},
+            cumulative_risk_register=register, decisions=[], assumptions=[], open_risks=[],
+            confidence_score=0.9, complexity_rating="LOW", intent_hash_reference="h"))
+    return contexts
+
+
+def test_store_round_trip_and_queries(tmp_path):
+    print("🗄️ Testing SQLite State Backend...")
+    contexts = _shifts()
+    store = SQLiteStore(str(tmp_path / "state.db"))
+    for ctx in contexts:
+        store.save_context(f"shift_{ctx.shift_cycle:04d}", ctx)
+
+    # 1. Every shift rebuilds exactly, registers stored once per version
+    for ctx in contexts:
+        assert store.load_context(f"shift_{ctx.shift_cycle:04d}").model_dump() == ctx.model_dump()
+    rows = store._query("SELECT COUNT(*) FROM findings")[0][0]
+    assert rows == 2 * (REWRITE_AT - 1) + (2 * REWRITE_AT - 3) + 2 * (SHIFTS - REWRITE_AT)
+    print(f"✅ PASS: {SHIFTS} shifts rebuild exactly from {rows} finding rows.")
+
+    # 2. Indexed queries agree with a scan of the latest register
+    latest = list(contexts[-1].cumulative_risk_register)
+    assert store.find_findings(severity="HIGH") == [r for r in latest if r.severity == "HIGH"]
+    assert store.find_findings(document="doc_2.pdf", page=1) == [
+        r for r in latest if any(ev.document_name == "doc_2.pdf" and ev.page_number == 1 for ev in r.evidence)]
+    assert store.find_findings(category="Legal", shift_cycle=3) == [r for r in contexts[2].cumulative_risk_register if r.category == "Legal"]
+    assert store.find_findings(agent="Agent_1") == [r for r in latest if int(r.description.split()[1]) // 10 % 2 == 0]
+    assert store.count_by_severity() == {s: sum(r.severity == s for r in latest) for s in {r.severity for r in latest}}
+    plans = {column: " ".join(row[3] for row in store._query(f"EXPLAIN QUERY PLAN {sql}")) for column, sql in (
+        ("severity", "SELECT * FROM findings WHERE severity = 'HIGH'"),
+        ("agent", "SELECT * FROM findings WHERE agent_id = 'Agent_1'"),
+        ("document", "SELECT * FROM citations WHERE document_name = 'doc_1.pdf' AND page_number = 2"),
+        ("page", "SELECT * FROM citations WHERE page_number = 2"))}
+    assert all("USING INDEX" in plan for plan in plans.values()), plans
+    print("✅ PASS: Queries by severity, category, document, page and agent use indexes.")
+
+    # 3. WAL: a second connection reads while a write transaction is open
+    assert store._query("PRAGMA journal_mode")[0][0] == "wal"
+    store._conn.execute("BEGIN IMMEDIATE")
+    store._conn.execute("DELETE FROM shifts")
+    reader = sqlite3.connect(str(tmp_path / "state.db"))
+    assert reader.execute("SELECT COUNT(*) FROM shifts").fetchone()[0] == SHIFTS
+    store._conn.rollback()
+    reader.close()
+    print("✅ PASS: Readers are not blocked by the writer.")
+
+    # 4. Rolling back to a checkpoint restores the register it had
+    assert store.discard_after(REWRITE_AT - 1) == [f"shift_{c:04d}" for c in range(REWRITE_AT, SHIFTS + 1)]
+    assert store.find_findings() == list(contexts[REWRITE_AT - 2].cumulative_risk_register)
+    store.load_context(store.context_names()[-1])
+    store.save_context(f"shift_{REWRITE_AT:04d}", contexts[REWRITE_AT - 1])
+    assert store.find_findings() == list(contexts[REWRITE_AT - 1].cumulative_risk_register)
+
+    ledger = AgentLedger(agent_id="Agent_1")
+    for n in range(4):
+        ledger.record_penalty_point(f"p{n}", "s")
+    store.save_ledger(ledger)
+    rolled_back = AgentLedger(**ledger.model_dump())
+    rolled_back.history = rolled_back.history[:2]
+    store.save_ledger(rolled_back)
+    assert store.load_ledger("Agent_1") == rolled_back and store.load_ledger("Agent_9") is None
+    print("✅ PASS: Discarded shifts and rolled-back ledgers leave no trace.")
+
+    # 5. The audit count is the last id of the append-only log: a seek, not a table scan
+    assert store.audit_count() == 0
+    for n in range(3):
+        store.log_event({"timestamp": f"2025-01-01T00:00:0{n}", "source": "Agent_1", "event": "E", "details": str(n)})
+    assert store.audit_count() == 3 == len(store.audit_events())
+    plan = " ".join(row[3] for row in store._query("EXPLAIN QUERY PLAN SELECT MAX(id) FROM audit_events"))
+    assert "SCAN" not in plan, plan
+    print("✅ PASS: Audit events counted without scanning the log.")
+
+
+def test_scheduler_on_sqlite_backend(monkeypatch, mock_llm, data_room, make_scheduler):
+    print("🗄️ Testing Scheduler on the SQLite Backend...")
+    data_room(4)
+
+    registers = {}
+    for backend in ("files", "sqlite"):
+        monkeypatch.setattr(shift_scheduler, "load_system_settings", lambda: SystemSettings(state_backend=backend))
+        make_scheduler(storage_root=f"storage_{backend}").run_loop(max_shifts=4)
+        state = StateManager(f"storage_{backend}") # Reopened: the backend is read from disk
+        assert state.backend == backend
+        registers[backend] = [r.model_dump() for r in state.load_latest_context().cumulative_risk_register]
+        assert len(state.shift_summaries()) == 4 and state.audit_count() > 0
+        assert state.active_agents() == ["Agent_1", "Agent_2"]
+
+    assert registers["sqlite"] == registers["files"] and registers["sqlite"]
+    assert not {"chain", "ledgers", "audit_log.jsonl"} & set(os.listdir("storage_sqlite"))
+    print(f"✅ PASS: Same register on both backends ({len(registers['sqlite'])} findings).")
+
+    # JSON layout as an export
+    state = StateManager("storage_sqlite")
+    names = state.export_contexts()
+    with open(os.path.join("storage_sqlite", "contexts", names[-1])) as f:
+        assert json.load(f)["cumulative_risk_register"] == registers["sqlite"]
+    assert sorted(os.listdir("storage_sqlite/ledgers")) == ["Agent_1.json", "Agent_2.json"]
+    with open("storage_sqlite/audit_log.jsonl") as f:
+        assert sum(1 for _ in f) == state.audit_count()
+    print("✅ PASS: Export writes contexts, ledgers and the audit log as JSON.")
+
+
+def test_active_agents_and_legacy_layout(tmp_path):
+    for backend in ("files", "sqlite"):
+        state = StateManager(str(tmp_path / backend), backend=backend)
+        state.save_ledger(AgentLedger(agent_id="Agent_1", is_active=False)) # Replaced by Agent_1_v2
+        state.save_ledger(AgentLedger(agent_id="Agent_1_v2"))
+        state.save_ledger(AgentLedger(agent_id="Agent_2"))
+        assert state.active_agents() == ["Agent_1_v2", "Agent_2"]
+
+    # Storage from before the context chain (snapshots, ledgers, audit log) stays on the file backend
+    legacy = tmp_path / "legacy"
+    os.makedirs(legacy / "ledgers")
+    with open(legacy / "audit_log.jsonl", "w") as f:
+        f.write(json.dumps({"timestamp": "2026-01-01T00:00:00", "source": "Orchestrator", "event": "E", "details": "old"}) + "\n")
+    state = StateManager(str(legacy), backend="sqlite")
+    assert state.backend == "files" and state.audit_count() == 1 and not os.path.exists(legacy / "state.db")
+    print("✅ PASS: Active agents from the ledgers; legacy storage keeps the file backend.")
+
+
+if __name__ == "__main__":
+    import sys, pytest
+    sys.exit(pytest.main([__file__, "-s", "-q"]))
@@ -0,0 +1,73 @@
+import tempfile
+from core.llm.llm_client import LLMClient
+from core.llm.rate_limiter import RateLimiter
+from core.llm.response_cache import ResponseCache
+from core.llm.providers import MockProvider
+from core.llm.usage import UsageSummary, estimate_cost
+from core.ledger.ledger_store import AgentLedger
+from core.intent.intent_schema import IntentPackage
+from core.context.context_package import ContextPackage, ComplexityLevel
+from agents.executor.base_executor import AgentOutput, BaseExecutor
+
+PROMPT = "[DOCUMENT START: lease.pdf]\n\n--- Page 1 ---\nThe landlord may terminate the lease on 30 days notice.\n\n[DOCUMENT END: lease.pdf]"
+
+
+def test_call_usage_is_recorded(monkeypatch):
+    print("💸 Testing Usage Accounting...")
+    limiter = RateLimiter(requests_per_minute=6000)
+    monkeypatch.setattr(limiter, "on_throttle", lambda base_pause: 0.0)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        provider = MockProvider(latency_seconds=0, rate_503=0.5, seed=3)
+        client = LLMClient(limiter=limiter, cache=ResponseCache(cache_dir, mode="read_write"), provider=provider)
+        _, usage = client.get_structured_completion_with_usage("sys", PROMPT, AgentOutput)
+
+        assert usage.prompt_tokens > 0 and usage.response_tokens > 0
+        assert usage.retries == provider.calls - 1
+        assert usage.cost_usd == estimate_cost(client.model_name, usage.prompt_tokens, usage.response_tokens)
+        assert usage.wall_seconds >= usage.backoff_seconds >= 0
+        print(f"✅ PASS: {usage.prompt_tokens} in / {usage.response_tokens} out, {usage.retries} retries, ${usage.cost_usd:.6f}")
+
+        _, cached = client.get_structured_completion_with_usage("sys", PROMPT, AgentOutput)
+        assert cached.cached and cached.cost_usd == 0
+        print("✅ PASS: Cache hits are booked as free calls.")
+
+    # Per agent (ledger) and per engagement totals
+    ledger = AgentLedger(agent_id="Agent_1")
+    ledger.record_usage([usage, cached])
+    engagement = UsageSummary()
+    engagement.add_all([usage, cached, usage])
+    assert ledger.usage.calls == 2 and ledger.usage.cached_calls == 1
+    assert engagement.prompt_tokens == 2 * usage.prompt_tokens
+    assert AgentLedger.model_validate_json(ledger.model_dump_json()).usage == ledger.usage
+    print(f"✅ PASS: {engagement.summary()}")
+
+
+def test_failed_call_usage_is_booked(monkeypatch):
+    limiter = RateLimiter(requests_per_minute=6000)
+    monkeypatch.setattr(limiter, "on_throttle", lambda base_pause: 0.0)
+    client = LLMClient(limiter=limiter, cache=ResponseCache(mode="off"), provider=MockProvider(latency_seconds=0, rate_503=1.0))
+    intent = IntentPackage(original_prompt="Audit the data room", constraints=[], prohibited_actions=[], success_definition="Done")
+    intent.sign()
+    ctx = ContextPackage(
+        shift_cycle=0, previous_agent_id="Orchestrator", task_state={"new_documents": PROMPT},
+        decisions=[], assumptions=[], open_risks=[], confidence_score=1.0,
+        complexity_rating=ComplexityLevel.LOW, intent_hash_reference=intent.intent_hash
+    )
+    result = BaseExecutor("Agent_1", intent, llm=client).run_shift(ctx)
+
+    # Every attempt failed: the shift falls back, but the retries it paid for are still booked
+    assert result.task_state == {"summary": "Fallback"}
+    assert len(result.usage) == 1 and result.usage[0].retries == client.provider.calls - 1 == 4
+    assert result.usage[0].wall_seconds > 0
+    ledger = AgentLedger(agent_id="Agent_1")
+    ledger.record_usage(result.usage)
+    assert ledger.usage.calls == 1 and ledger.usage.retries == 4
+    print("✅ PASS: A failed call's retries are booked on the fallback context.")
+
+
+if __name__ == "__main__":
+    import pytest
+    with pytest.MonkeyPatch.context() as mp:
+        test_call_usage_is_recorded(mp)
+        test_failed_call_usage_is_booked(mp)
@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from agents.executor.base_executor import BaseExecutor
+from core.audit.persistence import StateManager
+from orchestrator.shift_scheduler import ShiftScheduler
+
+DOCS = 8
+SLOW_SECONDS = 0.6
+
+
+def _committed_by():
+    state = StateManager("storage")
+    return [state.load_context(name).previous_agent_id for name in state.context_names()]
+
+
+def test_slow_agent_does_not_stall_the_others(monkeypatch, mock_llm, data_room, make_scheduler):
+    print("🥷 Testing Work-Stealing Batch Queue...")
+    mock_llm(latency_ms=50)
+    events = []
+    real_arun_shift = BaseExecutor.arun_shift
+
+    async def arun_shift(self, ctx, deadline=None):
+        events.append(("start", self.agent_id))
+        if self.agent_id == "Agent_1":
+            await asyncio.sleep(SLOW_SECONDS)
+        result = await real_arun_shift(self, ctx, deadline)
+        events.append(("end", self.agent_id))
+        return result
+
+    monkeypatch.setattr(BaseExecutor, "arun_shift", arun_shift)
+
+    data_room(DOCS)
+    make_scheduler(concurrency=4, agents=2).run_loop(max_shifts=DOCS)
+
+    agents = _committed_by()
+    assert len(agents) == DOCS
+    # Round-robin would give Agent_1 half the batches
+    assert agents.count("Agent_2") > agents.count("Agent_1")
+    # While Agent_1's first (slow) shift was in flight, Agent_2 finished several batches
+    during = events[events.index(("start", "Agent_1")):events.index(("end", "Agent_1"))]
+    assert during.count(("end", "Agent_2")) >= 2
+    print(f"✅ PASS: Agent_2 pulled {agents.count('Agent_2')} of {DOCS} batches, {during.count(('end', 'Agent_2'))} while Agent_1 was slow.")
+
+
+def test_dispatch_errors_reach_the_loop(monkeypatch, mock_llm, data_room, make_scheduler):
+    data_room(DOCS)
+    scheduler = make_scheduler(concurrency=2, agents=2)
+    real_prepare = ShiftScheduler._prepare_shift
+
+    def prepare_shift(self, i, slot=None):
+        if i == 4:
+            raise RuntimeError("data room went away")
+        return real_prepare(self, i, slot)
+
+    monkeypatch.setattr(ShiftScheduler, "_prepare_shift", prepare_shift)
+    # Batch 4 is dispatched when a slot frees up: the error stops the run instead of vanishing in a callback
+    with pytest.raises(RuntimeError, match="data room went away"):
+        scheduler.run_loop(max_shifts=DOCS)
+    scheduler.state_manager.flush()
+    assert len(_committed_by()) < DOCS
+    print("✅ PASS: A dispatch error stops the run loudly.")
+
+
+def test_n_agents_and_phoenix_slot(mock_llm, data_room, make_scheduler):
+    print("🪑 Testing Configurable Agent Slots...")
+    data_room(DOCS)
+    scheduler = make_scheduler(agents=4)
+    assert scheduler.agent_slots == ["Agent_1", "Agent_2", "Agent_3", "Agent_4"]
+    assert set(scheduler.workers) == set(scheduler.ledgers) == set(scheduler.supervisor_map) == set(scheduler.agent_slots)
+
+    scheduler.ledgers["Agent_3"].is_active = False
+    scheduler.run_loop(max_shifts=DOCS)
+
+    # The replacement takes over the seat; the round-robin carries on around it
+    assert scheduler.slot_agents["Agent_3"] == "Agent_3_v2"
+    assert "Agent_3" not in scheduler.workers and "Agent_3_v2" in scheduler.supervisor_map
+    assert _committed_by() == ["Agent_1", "Agent_2", "Agent_3_v2", "Agent_4"] * 2
+    print("✅ PASS: 4 agents in round-robin, Agent_3 replaced in its own slot.")
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-s", "-q"]))